@@ -0,0 +1,77 @@
+import ast
+import configparser
+import sys
+import threading
+import time
+from random import Random
+
+from src.Graph import Graph
+from src.solvers.astar_solver import astar_search, astar_search_deepcopy
+
+# Set params
+setup_file = '../test_vectors/setup.ini'
+grid_size = 100  # 100 x 100 = 10k nodes
+grid_spacing = 10
+number_of_queries = 10
+
+
+def create_setup_graph():
+    setup = configparser.ConfigParser()
+    setup.read(setup_file)
+    graph = Graph()
+    node_names = ast.literal_eval(setup['LAYOUT']['node_names'])
+    graph.create_nodes(ast.literal_eval(setup['LAYOUT']['node_locations']), node_names)
+    graph.create_edges(node_names, ast.literal_eval(setup['LAYOUT']['node_neighbors']))
+    return graph
+
+
+def create_grid_graph(size, spacing):
+    node_locations = []
+    node_names = []
+    node_neighbors = []
+    for i in range(size):
+        for j in range(size):
+            node_locations.append((i * spacing, j * spacing))
+            node_names.append("pos_" + str(i) + "_" + str(j))
+            neighbors = []
+            for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                if 0 <= i + di < size and 0 <= j + dj < size:
+                    neighbors.append("pos_" + str(i + di) + "_" + str(j + dj))
+            node_neighbors.append(neighbors)
+    graph = Graph()
+    graph.create_nodes(node_locations, node_names)
+    graph.create_edges(node_names, node_neighbors)
+    return graph
+
+
+def benchmark(name, graph, queries, solver):
+    start = time.perf_counter()
+    distances = [solver(graph, a, b)[1] for a, b in queries]
+    duration = time.perf_counter() - start
+    print("\t" + name + ": " + str(round(1000 * duration / len(queries), 3)) + " ms per query")
+    return distances
+
+
+def main():
+    for layout_name, layout in (("setup.ini layout", create_setup_graph()),
+                                ("Grid layout (" + str(grid_size * grid_size) + " nodes)",
+                                 create_grid_graph(grid_size, grid_spacing))):
+
+        # Random queries, identical for both solvers
+        random = Random(0)
+        queries = [(random.choice(layout.node_names), random.choice(layout.node_names))
+                   for _ in range(number_of_queries)]
+
+        # Compare
+        print("\n" + layout_name + ":")
+        heap_distances = benchmark("Heap Astar", layout, queries, astar_search)
+        deepcopy_distances = benchmark("Deepcopy Astar", layout, queries, astar_search_deepcopy)
+        print("\tSame distances: " + str(all(abs(a - b) < 1e-6 for a, b in zip(heap_distances, deepcopy_distances))))
+
+
+# Deepcopying a large connected graph recurses through every node and edge, so run with a big stack
+sys.setrecursionlimit(1000000)
+threading.stack_size(512 * 1024 * 1024)
+thread = threading.Thread(target=main)
+thread.start()
+thread.join()
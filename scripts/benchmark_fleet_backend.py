@@ -0,0 +1,52 @@
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src.Simulation import Simulation
+
+# Set params
+setup_file = '../test_vectors/setup.ini'
+numbers_of_robots = [250, 1000, 2000]
+number_of_orders = 2000
+order_interval = 1  # Seconds between two orders
+motion_mode = 'event'
+log_ = True  # The logger samples the whole fleet every second
+
+
+def create_orders(simulation, seed=0):
+    # One order per interval at a random task location
+    rng = np.random.default_rng(seed)
+    return [(i * order_interval, i + 1, int(rng.integers(1, 4)),
+             simulation.task_locations[rng.integers(len(simulation.task_locations))])
+            for i in range(number_of_orders)]
+
+
+def benchmark(simulation, orders, number_of_robots, fleet_backend):
+    random.seed(0)
+    np.random.seed(0)
+    with tempfile.TemporaryDirectory() as log_dir:
+        start = time.perf_counter()
+        result = simulation.start_simulation(orders, number_of_robots, render_=False, log_=log_, print_=False,
+                                             motion_mode=motion_mode, fleet_backend=fleet_backend, log_dir=log_dir,
+                                             text_logs_=False)
+        duration = time.perf_counter() - start
+    print("\t" + fleet_backend + ": " + str(round(duration, 2)) + " s wall time, simulation time " +
+          str(result.simulation_time) + ", travel cost " + str(round(result.travel_cost, 2)))
+    return duration
+
+
+def main():
+    simulation = Simulation(setup_file)
+    orders = create_orders(simulation)
+    for number_of_robots in numbers_of_robots:
+
+        # Compare
+        print("\n" + str(number_of_robots) + " robots, " + str(number_of_orders) + " orders:")
+        objects_duration = benchmark(simulation, orders, number_of_robots, 'objects')
+        arrays_duration = benchmark(simulation, orders, number_of_robots, 'arrays')
+        print("\tSpeedup of arrays: " + str(round(objects_duration / arrays_duration, 2)))
+
+
+main()
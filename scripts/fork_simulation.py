@@ -0,0 +1,27 @@
+from src.Simulation import Simulation
+
+# Set params
+setup_file = '../test_vectors/setup.ini'
+orders_file = '../test_vectors/orders.txt'
+number_of_robots = 3
+warm_up_time = 100  # Seconds simulated once before forking
+snapshot_file = '../logfiles/snapshot.pkl'
+motion_mode = 'event'
+variants = [{'num_robots': 2}, {'num_robots': 3}, {'num_robots': 4}]  # Arguments of restore_simulation per variant
+
+# Create simulator
+sim = Simulation(setup_file)
+
+# Warm up and take a snapshot
+snapshot = sim.start_simulation(orders_file, number_of_robots, render_=False, log_=False, print_=False,
+                                motion_mode=motion_mode, snapshot_time=warm_up_time)
+snapshot.save(snapshot_file)
+
+# Fork the variants from the warm state
+results = sim.fork_simulation(snapshot, variants, render_=False, log_=False, print_=False)
+
+# Print output
+print("\nSnapshot at " + str(snapshot.time) + " seconds, saved in '" + snapshot_file + "'")
+for variant, result in zip(variants, results):
+    print("\t" + str(variant) + ": simulation time " + str(result.simulation_time) + " seconds, travel cost " +
+          str(result.travel_cost) + " seconds, tasks done " + str(result.tasks_done))
@@ -6,6 +6,8 @@ order_list_file = '../test_vectors/orders.txt'
 
 # Number of tasks
 num_tasks = 10
+seed = None  # Random seed, None for a new situation every time
+arrival_process = 'uniform'  # 'uniform', 'poisson', 'bursty' or 'ramp'
 
 # Generate situation
-generate_situation(num_tasks, setup_file, order_list_file)
+generate_situation(num_tasks, setup_file, order_list_file, seed, arrival_process)
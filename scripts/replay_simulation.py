@@ -0,0 +1,14 @@
+from src.RendererOffline import RendererOffline
+from src.Simulation import Simulation
+
+# Set params
+setup_file = '../test_vectors/setup.ini'
+trace_dir = '../logfiles/trace'  # Recorded by a simulation with log_=True
+speed = 10  # Simulated seconds per second
+
+# Layout of the recorded simulation
+sim = Simulation(setup_file)
+
+# Replay
+renderer = RendererOffline(trace_dir, sim.graph, speed)
+renderer.show()
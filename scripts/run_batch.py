@@ -0,0 +1,53 @@
+import argparse
+
+from src.BatchRunner import BatchRunner
+
+# Set params
+setup_file = '../test_vectors/setup.ini'
+orders_files = ['../test_vectors/orders.txt']
+numbers_of_robots = [1, 2, 3]
+fleet_managers = ['closest']
+seeds = [0]
+output_file = '../logfiles/batch_results.csv'
+log_dir = None  # None keeps every run in memory, otherwise each run logs to its own subdirectory
+motion_mode = 'event'
+fleet_backend = 'objects'
+
+
+def main():
+
+    # Command line overrides, orders are files or numbers of orders to generate for each seed
+    parser = argparse.ArgumentParser(description="Run a grid of simulations over all cores")
+    parser.add_argument('--orders', nargs='+', default=orders_files)
+    parser.add_argument('--robots', nargs='+', type=int, default=numbers_of_robots)
+    parser.add_argument('--fleet-managers', nargs='+', default=fleet_managers)
+    parser.add_argument('--seeds', nargs='+', type=int, default=seeds)
+    parser.add_argument('--output', default=output_file, help="CSV (streamed) or NPZ file")
+    parser.add_argument('--log-dir', default=log_dir)
+    parser.add_argument('--processes', type=int, default=None, help="Defaults to the number of cores")
+    parser.add_argument('--motion-mode', default=motion_mode)
+    parser.add_argument('--fleet-backend', default=fleet_backend)
+    args = parser.parse_args()
+    orders = [int(orders) if orders.isdigit() else orders for orders in args.orders]
+
+    # Create batch runner
+    batch_runner = BatchRunner(setup_file, args.log_dir, args.motion_mode, args.fleet_backend)
+
+    # Run all combinations
+    runs = batch_runner.create_runs(orders, args.robots, args.fleet_managers, args.seeds)
+    results = batch_runner.run(runs, args.output, args.processes)
+
+    # Print output
+    print("\nBatch ended: " + str(len(results)) + " runs written to '" + args.output + "'")
+    for result in results:
+        if result['error']:
+            print("\tRun " + str(result['run']) + " failed: " + result['error'])
+            continue
+        print("\tRun " + str(result['run']) + ": " + str(result['robots']) + " robots, " + str(result['orders']) +
+              ", seed " + str(result['seed']) + " -> simulation time " + str(result['simulation_time']) +
+              ", travel cost " + str(result['travel_cost']))
+
+
+# Worker processes import this script, with the spawn or forkserver start method, and must not run the batch
+if __name__ == '__main__':
+    main()
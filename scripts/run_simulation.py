@@ -5,16 +5,24 @@ setup_file = '../test_vectors/setup.ini'
 orders_file = '../test_vectors/orders.txt'
 number_of_robots = 3
 render_ = False
+render_mode = 'inline'  # 'inline' draws inside the simulation loop, 'process' in a separate process dropping frames
+real_time_factor = None  # Simulated seconds per wall-clock second, None runs as fast as possible
 log_ = True
 print_ = True
+motion_mode = 'event'  # 'interpolated' moves in 10 steps per edge, 'event' in one timed event per edge
 
 # Create simulator
 sim = Simulation(setup_file)
 
 # Start simulation
-sim_time, travel_cost, charging_cost, congestions = sim.start_simulation(orders_file, number_of_robots,
-                                                                         render_=render_, print_=print_, log_=log_)
+result = sim.start_simulation(orders_file, number_of_robots, render_=render_, print_=print_, log_=log_,
+                              motion_mode=motion_mode, render_mode=render_mode, real_time_factor=real_time_factor)
 
 # Print output
 print("\nSimulation ended: ")
-print("\tSimulation time: " + str(sim_time) + ' seconds')
+print("\tSimulation time: " + str(result.simulation_time) + ' seconds')
+print("\tTravel cost: " + str(result.travel_cost) + ' seconds')
+print("\tCharging cost: " + str(result.charging_cost) + ' seconds')
+print("\tCongestions: " + str(result.congestions))
+print("\tTasks done: " + str(result.tasks_done))
+print("\tIdle time: " + str(result.idle_time) + ' seconds')
@@ -0,0 +1,152 @@
+import contextlib
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import traceback
+
+import numpy as np
+
+from src.Simulation import Simulation
+from src.utils.situation_generator import generate_situation
+
+# Simulations per setup file, the layout is built once per worker process
+simulations = dict()
+
+
+def run_single(settings, run):
+    """
+        Input:
+            - Settings shared by all runs (setup file, log directory, motion mode, fleet backend)
+            - Run of the parameter grid (run, orders, robots, fleet_manager, seed)
+        Output:
+            - Run extended with the simulation summary and the wall time in seconds, a run that raised gets NaN
+              results and the error, so one failing run does not abort the batch
+    """
+    start = time.perf_counter()
+    try:
+        return simulate(settings, run)
+    except Exception as error:
+        result = dict(run)
+        result.update({column: float('nan') for column in BatchRunner.columns if column not in result})
+        result.update({'wall_time': time.perf_counter() - start,
+                       'error': type(error).__name__ + ': ' + str(error).replace('\n', ' ')})
+        traceback.print_exc()
+        return result
+
+
+def simulate(settings, run):
+    # One run of run_single, which handles its errors
+
+    # Init
+    if settings['setup_file'] not in simulations:
+        simulations[settings['setup_file']] = Simulation(settings['setup_file'])
+    simulation = simulations[settings['setup_file']]
+    random.seed(run['seed'])
+    np.random.seed(run['seed'])
+
+    # Every run logs to its own directory, or only keeps its results in memory
+    log_dir = None
+    if settings['log_dir'] is not None:
+        log_dir = os.path.join(settings['log_dir'], 'run_' + str(run['run']).zfill(4))
+        os.makedirs(log_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as run_dir:
+
+        # A number of orders is generated for the seed of the run
+        orders_file = run['orders']
+        if isinstance(orders_file, int):
+            orders_file = os.path.join(run_dir, 'orders.txt')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_situation(run['orders'], settings['setup_file'], orders_file, run['seed'])
+
+        # Simulate
+        start = time.perf_counter()
+        simulation_result = simulation.start_simulation(
+            orders_file, run['robots'], render_=False, log_=log_dir is not None, print_=False,
+            motion_mode=settings['motion_mode'], fleet_backend=settings['fleet_backend'],
+            fleet_manager=run['fleet_manager'], log_dir=log_dir)
+        wall_time = time.perf_counter() - start
+
+    result = dict(run)
+    result.update({'simulation_time': simulation_result.simulation_time,
+                   'travel_cost': simulation_result.travel_cost, 'charging_cost': simulation_result.charging_cost,
+                   'congestions': simulation_result.congestions, 'tasks_done': simulation_result.tasks_done,
+                   'lead_time': simulation_result.lead_time,
+                   'idle_time': simulation_result.idle_time, 'decision_time': simulation_result.decision_time,
+                   'messages': simulation_result.messages, 'wall_time': wall_time, 'error': ''})
+    return result
+
+
+def run_star(arguments):
+    return run_single(*arguments)
+
+
+class BatchRunner:
+    """
+            A class running a parameter grid of simulations over a process pool. Runs log to their own directory or
+            keep their results in memory, results are streamed into one table.
+    """
+
+    columns = ('run', 'orders', 'robots', 'fleet_manager', 'seed', 'simulation_time', 'travel_cost', 'charging_cost',
+               'congestions', 'tasks_done', 'lead_time', 'idle_time', 'decision_time', 'messages',
+               'wall_time', 'error')
+
+    def __init__(self, setup_file_path, log_dir=None, motion_mode='event', fleet_backend='objects'):
+        self.settings = {'setup_file': setup_file_path, 'log_dir': log_dir, 'motion_mode': motion_mode,
+                         'fleet_backend': fleet_backend}
+
+    @staticmethod
+    def create_runs(orders, robots, fleet_managers=('closest',), seeds=(0,)):
+        """
+            Input:
+                - Orders files, or numbers of orders to generate per seed
+                - Numbers of robots
+                - Names of the fleet managers
+                - Random seeds
+            Output:
+                - One run per combination of the parameters
+        """
+        return [{'run': i, 'orders': orders_file, 'robots': number_of_robots, 'fleet_manager': fleet_manager,
+                 'seed': seed}
+                for i, (orders_file, number_of_robots, fleet_manager, seed)
+                in enumerate(itertools.product(orders, robots, fleet_managers, seeds))]
+
+    def run(self, runs, output_file, processes=None):
+        """
+            Input:
+                - Runs to simulate
+                - CSV file the results are streamed to, or NPZ file written when all runs are done
+                - Number of worker processes (all cores by default)
+            Output:
+                - Results of all runs, in run order
+        """
+
+        # Init
+        results = []
+        stream = output_file.endswith('.csv')
+        file = open(output_file, 'w', newline='') if stream else None
+        writer = csv.DictWriter(file, self.columns) if stream else None
+        if stream:
+            writer.writeheader()
+
+        # Fan out, results come back as soon as a run is done
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(run_star, [(self.settings, run) for run in runs]):
+                results.append(result)
+                if stream:
+                    writer.writerow(result)
+                    file.flush()
+
+        # Aggregated table
+        results.sort(key=lambda result: result['run'])
+        if stream:
+            file.close()
+        else:
+            np.savez(output_file, **{column: np.array([result[column] for result in results])
+                                     for column in self.columns})
+        return results
@@ -1,13 +1,48 @@
 import math
+from collections import OrderedDict
 
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from src.solvers.dijkstra_solver import all_pairs_next_hops, many_source_distances, multi_source_distances, \
+    single_source_distances
+
 
 class Graph:
 
+    # Above this number of nodes no all-pairs table is kept, its memory grows with the square of the nodes and
+    # building it with a search per node takes under two seconds at 1000 nodes
+    max_path_table_nodes = 1000
+
+    # Without the table, this number of single-source distance rows is cached, the least recently used is dropped
+    source_cache_size = 256
+
     def __init__(self):
         self.__nodes = dict()
         self.__edges = dict()
 
+        # Integer node ids
+        self.__node_index = dict()
+        self.__node_names = []
+
+        # Compressed sparse row view, rebuilt lazily after the layout changed
+        self.__csr_outdated = True
+        self.__indptr = None
+        self.__indices = None
+        self.__weights = None
+        self.__positions = None
+
+        # All-pairs shortest path table
+        self.__distances = None
+        self.__next_hop = None
+
+        # Spatial index over the node positions
+        self.__spatial_grid = None
+
+        # Cached single-source distances per source node id, in order of use
+        self.__source_distances = OrderedDict()
+
     @property
     def nodes(self):
         return self.__nodes
@@ -16,16 +51,49 @@ class Graph:
     def edges(self):
         return self.__edges
 
+    @property
+    def node_index(self):
+        return self.__node_index
+
+    @property
+    def node_names(self):
+        return self.__node_names
+
+    @property
+    def indptr(self):
+        # The outgoing edges of node i are indices[indptr[i]:indptr[i + 1]]
+        self.__update_csr()
+        return self.__indptr
+
+    @property
+    def indices(self):
+        self.__update_csr()
+        return self.__indices
+
+    @property
+    def weights(self):
+        self.__update_csr()
+        return self.__weights
+
+    @property
+    def positions(self):
+        self.__update_csr()
+        return self.__positions
+
     def add_node(self, node_location, node_name):
         if node_name not in self.__nodes.keys():
             node = Node(node_location, node_name)
             self.__nodes[node_name] = node
+            self.__node_index[node_name] = len(self.__node_names)
+            self.__node_names.append(node_name)
+            self.__layout_changed()
 
     def add_edge(self, start_node, end_node, length):
         edge = Edge(start_node, end_node, length)
         start_node.add_edge(edge)
         start_node.add_neighbor(end_node.name)
         self.__edges[start_node.name, end_node.name] = edge
+        self.__layout_changed()
 
     def create_nodes(self, node_locations, node_names):
         for i in range(len(node_locations)):
@@ -38,6 +106,153 @@ class Graph:
                 end_node = self.__nodes[node_neighbors[i][j]]
                 length = self.__euclidean_distance(start_node.pos, end_node.pos)
                 self.add_edge(start_node, end_node, length)
+        self.__update_csr()
+        if len(self.__node_names) <= self.max_path_table_nodes:
+            self.compute_path_table()
+
+    def compute_path_table(self):
+        # All-pairs distances and next hops, one search per target over the reversed edges
+        self.__distances, self.__next_hop = all_pairs_next_hops(*self.reversed_csr())
+
+    def has_path_table(self):
+        # (Re)build the table lazily after the layout changed, unless the layout is too large for it
+        if self.__distances is None and 0 < len(self.__node_names) <= self.max_path_table_nodes:
+            self.compute_path_table()
+        return self.__distances is not None
+
+    def shortest_path(self, start_name, end_name):
+        """
+            Input:
+                - Start node name
+                - End node name
+            Output:
+                - Shortest path names and total distance in meters, looked up in the all-pairs table
+                - None, None if the end node is unreachable
+        """
+
+        # Walk the next hops
+        start = self.__node_index[start_name]
+        end = self.__node_index[end_name]
+        if self.__next_hop[start, end] < 0:
+            return None, None
+        path = [start_name]
+        current = start
+        while current != end:
+            current = self.__next_hop[current, end]
+            path.append(self.__node_names[current])
+
+        # Sum the edges from end to start, in the same order as the Astar solver
+        distance = 0
+        for i in range(len(path) - 1, 0, -1):
+            distance += self.__edges[path[i - 1], path[i]].length
+        return path, distance
+
+    def distances_from(self, source_name):
+        # Distances from one node to all nodes, from the all-pairs table or a cached Dijkstra search
+        source = self.__node_index[source_name]
+        if self.has_path_table():
+            return self.__distances[source]
+        if source in self.__source_distances:
+            self.__source_distances.move_to_end(source)
+            return self.__source_distances[source]
+        distances = single_source_distances(self.indptr, self.indices, self.weights, source)
+        self.__cache_source_distances(source, distances)
+        return distances
+
+    def distances_to(self, target_names):
+        """
+            Input:
+                - List of target node names
+            Output:
+                - Shortest distance in meters from every node to its closest target (inf if none is reachable)
+                - Id of that closest target per node (-1 if none is reachable)
+        """
+
+        # Reversed edges, so one search from all targets at once gives the distances towards them
+        return multi_source_distances(*self.reversed_csr(), [self.__node_index[name] for name in target_names])
+
+    def cost_matrix(self, sources, targets, speed=None):
+        """
+            Input:
+                - List of source node names
+                - List of target node names
+                - Speed in m/s to return travel times instead of distances (optional)
+            Output:
+                - Matrix of shortest path distances (or travel times) with a row per source and a column per
+                  target, inf where a target is unreachable
+        """
+
+        # Gathered from the all-pairs table at once, otherwise from one distance row per distinct source
+        target_ids = np.array([self.__node_index[name] for name in targets], dtype=np.int64)
+        if self.has_path_table():
+            source_ids = np.array([self.__node_index[name] for name in sources], dtype=np.int64)
+            matrix = self.__distances[source_ids[:, None], target_ids]
+            return matrix / speed if speed is not None else matrix
+
+        # Sources that are not cached are searched together
+        source_ids = [self.__node_index[name] for name in sources]
+        rows = {source: self.__source_distances[source] for source in source_ids if source in self.__source_distances}
+        for source in rows:
+            self.__source_distances.move_to_end(source)
+        missing = list(dict.fromkeys(source for source in source_ids if source not in rows))
+        if missing:
+            distances = many_source_distances(self.indptr, self.indices, self.weights, missing)
+            for source, row in zip(missing, distances):
+                rows[source] = row
+                self.__cache_source_distances(source, row.copy())
+        matrix = np.array([rows[source][target_ids] for source in source_ids]).reshape(len(sources), len(targets))
+        if speed is not None:
+            matrix /= speed
+        return matrix
+
+    def nearest_node(self, x, y):
+        # Same result as a brute-force scan over all nodes, ties resolve to the node added first
+        if self.__spatial_grid is None:
+            self.__spatial_grid = SpatialGrid(self.positions)
+        return self.__node_names[self.__spatial_grid.nearest(x, y)]
+
+    def edge_sources(self):
+        # Start node id of every edge in the compressed sparse row view
+        return np.repeat(np.arange(len(self.__node_names), dtype=np.int32), np.diff(self.indptr))
+
+    def reversed_csr(self):
+        # Compressed sparse row arrays of the graph with every edge reversed (indptr, indices, weights)
+        order = np.argsort(self.indices, kind='stable')
+        reversed_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=len(self.__node_names)))))
+        return reversed_indptr, self.edge_sources()[order], self.weights[order]
+
+    def __cache_source_distances(self, source, distances):
+        self.__source_distances[source] = distances
+        if len(self.__source_distances) > self.source_cache_size:
+            self.__source_distances.popitem(last=False)
+
+    def __layout_changed(self):
+        self.__csr_outdated = True
+        self.__spatial_grid = None
+        self.__source_distances = OrderedDict()
+        self.__distances = None
+        self.__next_hop = None
+
+    def __update_csr(self):
+        if not self.__csr_outdated:
+            return
+
+        # Outgoing edges per node in node id order
+        indptr = [0]
+        indices = []
+        weights = []
+        for name in self.__node_names:
+            for edge in self.__nodes[name].edges:
+                indices.append(self.__node_index[edge.end_node.name])
+                weights.append(edge.length)
+            indptr.append(len(indices))
+
+        self.__indptr = np.array(indptr, dtype=np.int64)
+        self.__indices = np.array(indices, dtype=np.int32)
+        self.__weights = np.array(weights, dtype=float)
+        self.__positions = np.array([self.__nodes[name].pos for name in self.__node_names],
+                                    dtype=float).reshape(-1, 2)
+        self.__csr_outdated = False
 
     def reset_edge_pheromone(self, level=0.01):
         for edge in self.__edges.values():
@@ -72,16 +287,17 @@ class Graph:
         ax.set_xlabel('x-coordinate (m)')
         ax.set_ylabel('y-coordinate (m)')
 
-        for node in self.__nodes.values():
-            ax.plot(node.pos[0], node.pos[1], 'b.', ms=6)
-            ax.text(node.pos[0] + 1.5, node.pos[1] + 1.5, node.name)
-        for edge in self.__edges.values():
-            arrow_x = (edge.start_node.pos[0] + edge.end_node.pos[0]) / 2
-            arrow_y = (edge.start_node.pos[1] + edge.end_node.pos[1]) / 2
-            delta_x = (edge.end_node.pos[0] - edge.start_node.pos[0]) * 0.01
-            delta_y = (edge.end_node.pos[1] - edge.start_node.pos[1]) * 0.01
-            ax.plot([edge.start_node.pos[0], edge.end_node.pos[0]], [edge.start_node.pos[1], edge.end_node.pos[1]],
-                    'b-', lw=0.5)
+        # Nodes
+        positions = self.positions
+        ax.plot(positions[:, 0], positions[:, 1], 'b.', ms=6)
+        for name, pos in zip(self.__node_names, positions):
+            ax.text(pos[0] + 1.5, pos[1] + 1.5, name)
+
+        # Edges
+        starts = positions[self.edge_sources()]
+        ends = positions[self.indices]
+        ax.add_collection(LineCollection(np.stack((starts, ends), axis=1), colors='b', linewidths=0.5))
+        for (arrow_x, arrow_y), (delta_x, delta_y) in zip((starts + ends) / 2, (ends - starts) * 0.01):
             ax.arrow(arrow_x, arrow_y, delta_x, delta_y, length_includes_head=True, head_width=2, head_length=2)
 
         # To annotate nodes or paths
@@ -89,17 +305,14 @@ class Graph:
             node_name = node[0]
             marker = node[1]
             marker_size = node[2]
-            ax.plot(self.nodes[node_name].pos[0], self.nodes[node_name].pos[1], marker, ms=marker_size)
+            pos = positions[self.__node_index[node_name]]
+            ax.plot(pos[0], pos[1], marker, ms=marker_size)
         for path in paths:
             nodes_names = path[0]
             marker = path[1]
             marker_size = path[2]
-            for i in range(len(nodes_names) - 1):
-                ax.plot(self.nodes[nodes_names[i]].pos[0], self.nodes[nodes_names[i]].pos[1], marker, ms=marker_size)
-                ax.plot([self.nodes[nodes_names[i]].pos[0], self.nodes[nodes_names[i + 1]].pos[0]],
-                        [self.nodes[nodes_names[i]].pos[1], self.nodes[nodes_names[i + 1]].pos[1]], marker,
-                        lw=marker_size)
-            ax.plot(self.nodes[nodes_names[-1]].pos[0], self.nodes[nodes_names[-1]].pos[1], marker, ms=marker_size)
+            path_positions = positions[[self.__node_index[name] for name in nodes_names]]
+            ax.plot(path_positions[:, 0], path_positions[:, 1], marker, ms=marker_size, lw=marker_size)
 
     @staticmethod
     def __euclidean_distance(a, b):
@@ -129,6 +342,8 @@ class Graph:
 
 class Node:
 
+    __slots__ = ('pos', 'name', 'edges', 'neighbors', 'g', 'h', 'parent')
+
     def __init__(self, node_location, node_name):
         self.pos = node_location
         self.name = node_name
@@ -147,10 +362,11 @@ class Node:
         return self.name + ': ' + str(self.pos)
 
     def __hash__(self):
-        return hash(str(self))
+        # Node names are unique within a graph
+        return hash(self.name)
 
     def __eq__(self, other):
-        return self.name == other.name and self.pos == other.pos
+        return self is other or (self.name == other.name and self.pos == other.pos)
 
     def copy_node(self):
         node = Node(self.pos, self.name)
@@ -177,6 +393,8 @@ class Node:
 
 class Edge:
 
+    __slots__ = ('start_node', 'end_node', 'length', 'pheromone')
+
     def __init__(self, start_node, end_node, length, pheromone=0.1):
         self.start_node = start_node
         self.end_node = end_node
@@ -188,5 +406,74 @@ class Edge:
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self is other or (self.start_node == other.start_node and self.end_node == other.end_node and
+                                     self.length == other.length and self.pheromone == other.pheromone)
         return False
+
+
+class SpatialGrid:
+    """
+            A uniform grid hash over node positions for nearest node queries
+    """
+
+    def __init__(self, positions, nodes_per_cell=2):
+
+        # Positions
+        self.positions = positions.tolist()
+        self.x_min, self.y_min = positions.min(axis=0) if len(positions) else (0, 0)
+        x_max, y_max = positions.max(axis=0) if len(positions) else (0, 0)
+
+        # Cell size such that a cell holds a few nodes on average
+        area = (x_max - self.x_min) * (y_max - self.y_min)
+        if area > 0:
+            self.cell_size = math.sqrt(nodes_per_cell * area / len(positions))
+        else:
+            self.cell_size = max(x_max - self.x_min, y_max - self.y_min, 1) / max(len(positions), 1)
+        self.number_of_columns = int((x_max - self.x_min) // self.cell_size) + 1
+        self.number_of_rows = int((y_max - self.y_min) // self.cell_size) + 1
+
+        # Node ids per cell, in ascending order
+        self.cells = dict()
+        for node_id, (x, y) in enumerate(self.positions):
+            self.cells.setdefault(self.cell(x, y), []).append(node_id)
+
+    def cell(self, x, y):
+        return int((x - self.x_min) // self.cell_size), int((y - self.y_min) // self.cell_size)
+
+    def nearest(self, x, y):
+        if not self.positions:
+            return None
+
+        # Search rings of cells around the query cell
+        column, row = self.cell(x, y)
+        max_ring = max(abs(column), abs(column - self.number_of_columns + 1), abs(row),
+                       abs(row - self.number_of_rows + 1))
+        best_id = None
+        best_distance = math.inf
+        for ring in range(max_ring + 1):
+
+            # Nodes outside the searched rings are at least this far away
+            if best_distance < (ring - 1) * self.cell_size:
+                break
+
+            for cell in self.ring_cells(column, row, ring):
+                for node_id in self.cells.get(cell, ()):
+                    delta_x = x - self.positions[node_id][0]
+                    delta_y = y - self.positions[node_id][1]
+                    distance = math.sqrt(delta_x * delta_x + delta_y * delta_y)
+                    if distance < best_distance or (distance == best_distance and node_id < best_id):
+                        best_distance = distance
+                        best_id = node_id
+        return best_id
+
+    @staticmethod
+    def ring_cells(column, row, ring):
+        if ring == 0:
+            yield column, row
+            return
+        for i in range(-ring, ring + 1):
+            yield column + i, row - ring
+            yield column + i, row + ring
+        for j in range(-ring + 1, ring):
+            yield column - ring, row + j
+            yield column + ring, row + j
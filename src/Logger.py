@@ -1,17 +1,23 @@
-import logging
-import logging.handlers
-
-import numpy as np
+import os
 
 from src.agv.AGV_Comm import Comm
+from src.knowledgebase.FleetArrays import FleetArrays, INTEGER_BITS, ROBOT_COLUMNS, STATUS_CODES
+from src.Trace import *
 
 
 class Logger:
+    """
+            A class containing the logger, sampling the knowledge base every second into a binary trace. Only the
+            robots and tasks that changed since the previous sample are written, the text logs are exported from the
+            trace when the logger is closed.
+    """
 
-    def __init__(self, env, kb, print_):
+    def __init__(self, env, kb, print_, log_dir='../logfiles', text_logs_=True, keyframe_interval=60):
 
         # Attributes
         self.env = env
+        self.log_dir = log_dir
+        self.text_logs = text_logs_
 
         # Printing
         self.print = print_
@@ -21,6 +27,28 @@ class Logger:
         self.kb = kb
         self.comm = Comm(self.ip)
 
+        # Trace
+        self.graph = kb['graph']
+        self.trace_dir = os.path.join(log_dir, 'trace')
+        robot_ids = [robot.ID for robot in self.comm.sql_read(self.kb['global_robot_list'])]
+        self.trace = TraceWriter(self.trace_dir, robot_ids, self.graph.node_names)
+
+        # Every keyframe interval the full state is written, so a replay can seek without reading the whole trace
+        self.keyframe_interval = keyframe_interval
+        self.samples = 0
+
+        # Last written state
+        self.robot_states = dict()  # ID -> (record without time, path)
+        self.fleet_records = np.zeros(0, dtype=ROBOT_RECORD)  # Row of the fleet arrays -> last record
+        self.fleet_path_versions = np.zeros(0, dtype=np.int64)  # Row of the fleet arrays -> version of its path
+        self.logged_tasks = dict()  # (table, owner) -> arrivals of the tasks last written as present
+
+        # The task tables report the tasks put or removed, so a sample only writes those
+        self.kb['global_task_list'].track_changes()
+        self.kb['tasks_executing'].track_changes()
+        for ID in robot_ids:
+            self.kb['local_task_list_R' + str(ID)].track_changes()
+
         # Process
         self.logging = self.env.process(self.logging())
 
@@ -28,76 +56,114 @@ class Logger:
         self.my_print("Logger:                  Started")
 
     def logging(self):
-
-        # Create loggers
-        log_filename_1 = '../logfiles/global_task_list.txt'
-        log_filename_2 = '../logfiles/local_task_list.txt'
-        log_filename_3 = '../logfiles/tasks_executing.txt'
-        log_filename_4 = '../logfiles/global_robot_list.txt'
-
-        log1 = logging.getLogger('MyLogger1')
-        log1.setLevel(logging.DEBUG)
-        handler1 = logging.handlers.RotatingFileHandler(
-            log_filename_1, backupCount=1, mode='w')
-        log1.addHandler(handler1)
-
-        log2 = logging.getLogger('MyLogger2')
-        log2.setLevel(logging.DEBUG)
-        handler2 = logging.handlers.RotatingFileHandler(
-            log_filename_2, backupCount=1, mode='w')
-        log2.addHandler(handler2)
-
-        log3 = logging.getLogger('MyLogger3')
-        log3.setLevel(logging.DEBUG)
-        handler3 = logging.handlers.RotatingFileHandler(
-            log_filename_3, backupCount=1, mode='w')
-        log3.addHandler(handler3)
-
-        log4 = logging.getLogger('MyLogger4')
-        log4.setLevel(logging.DEBUG)
-        handler4 = logging.handlers.RotatingFileHandler(
-            log_filename_4, backupCount=1, mode='w')
-        log4.addHandler(handler4)
-
         while True:
             yield self.env.timeout(1)
-
-            # Global tasks list
-            global_task_list_string = ""
-            global_task_list = self.comm.sql_read(self.kb['global_task_list'])
-            for task in global_task_list:
-                global_task_list_string += task.to_log() + "|"
-
-            # Local task lists
-            local_task_list_string = ""
-            for key in self.kb.keys():
-                if "local_task_list_R" in key:
-                    local_task_list_string += "["
-                    local_task_list = self.comm.sql_read(self.kb[key])
-                    for task in local_task_list:
-                        local_task_list_string += str(task.to_log()) + ':'
-                    local_task_list_string = local_task_list_string
-                    local_task_list_string += "]|"
-
-            # Task executing
-            tasks_executing_string = ""
-            tasks_executing = self.comm.sql_read(self.kb['tasks_executing'])
-            for task in tasks_executing:
-                tasks_executing_string += task.to_log() + "|"
-
-            # Global robot list
-            global_robot_list_string = ""
-            global_robot_list = self.comm.sql_read(self.kb['global_robot_list'])
-            robots = np.copy(global_robot_list)
-            robots = sorted(robots, key=lambda robot_: robot_.ID)
-            for robot in robots:
-                global_robot_list_string += robot.to_log() + "|"
-
-            # Logging
-            log1.debug(str(self.env.now) + "|" + str(global_task_list_string))
-            log2.debug(str(self.env.now) + "|" + str(local_task_list_string))
-            log3.debug(str(self.env.now) + "|" + str(tasks_executing_string))
-            log4.debug(str(self.env.now) + "|" + str(global_robot_list_string))
+            self.log_state()
+
+    def log_state(self):
+        now = self.env.now
+        keyframe = self.samples % self.keyframe_interval == 0
+        if isinstance(self.kb['global_robot_list'], FleetArrays):
+            self.log_fleet_arrays(now, keyframe)
+        else:
+            self.log_robots(now, keyframe)
+        self.log_task_table(now, GLOBAL_TASK_LIST, 0, self.kb['global_task_list'], keyframe)
+        self.log_task_table(now, TASKS_EXECUTING, 0, self.kb['tasks_executing'], keyframe)
+        for ID in self.trace.meta['robot_ids']:
+            self.log_task_table(now, LOCAL_TASK_LIST, ID, self.kb['local_task_list_R' + str(ID)], keyframe)
+        self.trace.ticks.append((now, self.trace.robots.length, self.trace.tasks.length, keyframe))
+        self.samples += 1
+
+    def log_robots(self, now, keyframe):
+        if keyframe:
+            self.robot_states = dict()
+        for robot in self.comm.sql_read(self.kb['global_robot_list']):
+            previous_state, previous_path = self.robot_states.get(robot.ID, (None, None))
+
+            # Paths are only written when they changed
+            path = robot.path if robot.path else []
+            if path == previous_path:
+                path_start = previous_state[7]
+            else:
+                path_start = self.trace.paths.length
+                self.trace.paths.extend([self.graph.node_index[node] for node in path])
+
+            # Robot state
+            x, y = robot.location_at(now)
+            values = dict(x=x, y=y, battery_status=robot.battery_status, heading_direction=robot.heading_direction,
+                          travelled_time=robot.travelled_time, charged_time=robot.charged_time)
+            integers = sum(bit for field, bit in INTEGER_BITS.items() if isinstance(values[field], int))
+            state = (robot.ID, x, y, STATUS_CODES[robot.status], robot.battery_status, robot.heading_direction,
+                     self.graph.node_index[robot.robot_node], path_start, len(path), robot.travelled_time,
+                     robot.charged_time, robot.congestions, integers)
+            if state != previous_state:
+                self.trace.robots.append((now,) + state)
+                self.robot_states[robot.ID] = (state, list(path))
+
+    def log_fleet_arrays(self, now, keyframe):
+        # The state of all robots is read from the columns at once, only the rows that changed are written
+        fleet = self.kb['global_robot_list']
+        rows = fleet.sorted_rows()
+        records = np.zeros(len(rows), dtype=ROBOT_RECORD)
+        records['time'] = now
+        records['ID'] = fleet.ids[rows]
+        records['x'], records['y'] = fleet.locations_at(rows, now)
+        for field, name in dict(ROBOT_COLUMNS, status='status', node='node', integers='integers').items():
+            records[field] = getattr(fleet, name)[rows]
+        records['integers'][fleet.moving[rows]] &= ~np.uint8(INTEGER_BITS['x'] | INTEGER_BITS['y'])
+        path_versions = fleet.path_version[rows]
+
+        # Rows added since the previous sample have no record yet
+        if len(self.fleet_records) < fleet.size:
+            self.fleet_records = np.concatenate(
+                (self.fleet_records, np.zeros(fleet.size - len(self.fleet_records), dtype=ROBOT_RECORD)))
+            self.fleet_path_versions = np.concatenate(
+                (self.fleet_path_versions, np.full(fleet.size - len(self.fleet_path_versions), -1)))
+        if keyframe:
+            self.fleet_path_versions[:] = -1
+
+        # Paths are only written when they changed
+        previous_records = self.fleet_records[rows]
+        path_changed = path_versions != self.fleet_path_versions[rows]
+        records['path_start'] = previous_records['path_start']
+        records['path_length'] = previous_records['path_length']
+        for i in np.flatnonzero(path_changed).tolist():
+            path = fleet.path[rows[i]] or []
+            records['path_start'][i] = self.trace.paths.length
+            records['path_length'][i] = len(path)
+            self.trace.paths.extend([self.graph.node_index[node] for node in path])
+
+        # Robot states
+        changed = path_changed.copy()
+        for field in ROBOT_RECORD.names[1:]:
+            changed |= records[field] != previous_records[field]
+        self.trace.robots.extend(records[changed].tolist())
+        self.fleet_records[rows[changed]] = records[changed]
+        self.fleet_path_versions[rows] = path_versions
+
+    def log_task_table(self, now, table, owner, task_table, keyframe):
+        # Tasks are not changed while they are in a table, so only the tasks put or removed are written
+        changes = task_table.take_changes()
+        arrivals = task_table.entries.keys() | changes if keyframe else changes
+        logged = self.logged_tasks.setdefault((table, owner), set())
+        for arrival in sorted(arrivals):
+            entry = task_table.entries.get(arrival)
+            if entry is not None:
+                task = entry[1]
+                self.trace.tasks.append((now, table, owner, arrival, True, str(task.order_number).encode(),
+                                         self.graph.node_index[task.pos_A], task.priority,
+                                         -1 if task.robot is None else task.robot, task.picked))
+                logged.add(arrival)
+            elif arrival in logged:
+                # Tasks that left the table
+                self.trace.tasks.append((now, table, owner, arrival, False, b'', -1, 0, -1, False))
+                logged.discard(arrival)
+
+    def close(self):
+        # Flush the trace and export the text logs on top of it
+        self.trace.close()
+        if self.text_logs:
+            export_text_logs(self.trace_dir, self.log_dir)
 
     def my_print(self, msg):
         if self.print:
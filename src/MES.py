@@ -1,5 +1,6 @@
 from src.agv.AGV_Comm import Comm
 from src.datatypes.Task import Task
+from src.OrderSource import order_source
 
 
 class MES:
@@ -21,8 +22,10 @@ class MES:
         self.kb = kb  # Knowledge base
         self.comm = Comm(self.ip)
 
-        # List of orders to spawn
+        # Orders to spawn, read in chunks
         self.order_list = order_list
+        self.order_source = order_source(order_list)
+        self.orders_spawned = 0
 
         # Process
         self.main = self.env.process(self.main())
@@ -32,60 +35,40 @@ class MES:
 
     def main(self):
 
-        # Open file
-        file = open(self.order_list, "r")
-
-        # Read order
-        line = file.readline()
-        order = line.split(',')
-        prev_time = 0
-        while line != "":
-
-            # Calculate spawn time and wait for this time
-            execution_time = int(order[0])
-            timeout = execution_time - prev_time
-            prev_time = execution_time
-            yield self.env.timeout(timeout)
-
-            # Create new task
-            order_number = int(order[1])
-            priority = int(order[2])
-            pos_a = order[3]
-            new_task = Task(order_number, pos_a, priority)
-
-            # Put the new task in the global task list
-            self.comm.sql_write(self.kb['global_task_list'], new_task)
-            self.my_print('MES: New task ' + new_task.to_string() + ' arrived at ' + str(self.env.now))
-
-            # Read order
-            line = file.readline()
-            order = line.split(',')
-
-        # Close file
-        file.close()
-
-        # Wait till all tasks are executed
-        while True:
-
-            # Sample time
-            yield self.env.timeout(2)
-
-            # Check amount of tasks in local task list
-            amount_of_tasks_in_local_task_lists = 0
-            for key in self.kb.keys():
-                if 'local_task_list_R' in key:
-                    amount_of_tasks_in_local_task_lists += len(self.kb[key].items)
-
-            # Check amount of tasks in executing task list
-            amount_of_executing_tasks = len(self.kb['tasks_executing'].items)
-
-            # Check amount af tasks in global task list
-            amount_of_global_tasks = len(self.kb['global_task_list'].items)
-
-            # End criterium
-            if amount_of_executing_tasks == 0 and amount_of_tasks_in_local_task_lists == 0 \
-                    and amount_of_global_tasks == 0:
-                break
+        # Read orders chunk by chunk, a restored MES continues at the time of its snapshot
+        prev_time = self.env.now
+        for orders in self.order_source.chunks():
+            for execution_time, order_number, priority, pos_a in zip(orders['time'].tolist(),
+                                                                     orders['order_number'].tolist(),
+                                                                     orders['priority'].tolist(),
+                                                                     orders['pos_A'].astype(str).tolist()):
+
+                # Calculate spawn time and wait for this time
+                timeout = execution_time - prev_time
+                prev_time = execution_time
+                yield self.env.timeout(timeout)
+
+                # Create new task
+                new_task = Task(order_number, pos_a, priority)
+
+                # Put the new task in the global task list
+                self.comm.sql_write(self.kb['global_task_list'], new_task)
+                self.comm.sql_notify(self.kb['events'], 'task_arrival', new_task)
+                self.kb['metrics'].task_arrival(new_task)
+                self.my_print('MES: New task ' + new_task.to_string() + ' arrived at ' + str(self.env.now))
+                self.orders_spawned += 1
+
+        # Wait till every spawned order is executed, a task handed between the task lists is counted as well
+        while not self.all_tasks_executed():
+            yield self.comm.sql_wait(self.kb['events'], ['task_done'])
+
+    def remaining_orders(self):
+        # Orders that are not spawned yet
+        return self.order_source.remaining(self.orders_spawned)
+
+    def all_tasks_executed(self):
+        # End criterium, charging tasks are no orders
+        return self.kb['metrics'].orders_done == self.kb['metrics'].orders_spawned
 
     def my_print(self, msg):
         if self.print:
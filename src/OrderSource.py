@@ -0,0 +1,205 @@
+import itertools
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# One order, spawned by the MES at its arrival time
+ORDER = np.dtype([('time', 'i8'), ('order_number', 'i8'), ('priority', 'i4'), ('pos_A', 'S20')])
+
+
+def encode_positions(positions):
+    """
+        Input:
+            - Node names, str or bytes
+        Output:
+            - Node names as values of the pos_A field of ORDER, a name that does not fit raises a ValueError
+              instead of being truncated
+    """
+    positions = np.char.strip(np.array([position.encode() if isinstance(position, str) else position
+                                        for position in positions], dtype=bytes))
+    if positions.size and positions.itemsize > ORDER['pos_A'].itemsize:
+        longest = max(positions.tolist(), key=len).decode()
+        raise ValueError("Node name '" + longest + "' is longer than the " + str(ORDER['pos_A'].itemsize) +
+                         " bytes of the pos_A field of an order")
+    return positions.astype(ORDER['pos_A'])
+
+
+class OrderSource(ABC):
+    """
+            A class containing the base of an order source, the MES reads the orders as chunks of ORDER records sorted
+            on arrival time
+    """
+
+    @abstractmethod
+    def chunks(self):
+        pass
+
+    @abstractmethod
+    def remaining(self, count):
+        # Order source of the orders after the first count orders, for a snapshot of the MES
+        pass
+
+
+class CsvOrderSource(OrderSource):
+    """
+            A class containing the reader of an order file with one 'time,order_number,priority,pos_A,' line per
+            order, parsed in blocks of lines instead of line by line
+    """
+
+    def __init__(self, filename, block_size=1 << 20, start=0):
+        self.filename = filename
+        self.block_size = block_size  # Characters read at once
+        self.start = start  # Number of orders skipped
+
+    def chunks(self):
+        skip = self.start
+        for orders in self.parse_blocks():
+            if skip >= len(orders):
+                skip -= len(orders)
+                continue
+            yield orders[skip:]
+            skip = 0
+
+    def parse_blocks(self):
+        with open(self.filename, 'r') as file:
+            rest = ''
+            while True:
+                block = file.read(self.block_size)
+                if not block:
+                    break
+
+                # Only complete lines are parsed, the last partial line is kept for the next block
+                block = rest + block
+                end = block.rfind('\n') + 1
+                rest = block[end:]
+                if end:
+                    yield self.parse(block[:end])
+            if rest.strip():
+                yield self.parse(rest)
+
+    def remaining(self, count):
+        return CsvOrderSource(self.filename, self.block_size, self.start + count)
+
+    @staticmethod
+    def parse(text):
+        # The trailing comma of every line is dropped, then the fields of all lines are split at once
+        text = text.replace('\r', '').replace(',\n', '\n').strip()
+        while '\n\n' in text:
+            text = text.replace('\n\n', '\n')
+        fields = text.replace('\n', ',').split(',')
+        if len(fields) % 4:
+            raise ValueError("Order lines need four fields: time,order_number,priority,pos_A,")
+        orders = np.empty(len(fields) // 4, dtype=ORDER)
+        orders['time'] = list(map(int, fields[0::4]))
+        orders['order_number'] = list(map(int, fields[1::4]))
+        orders['priority'] = list(map(int, fields[2::4]))
+        orders['pos_A'] = encode_positions(fields[3::4])
+        return orders
+
+
+class ArrayOrderSource(OrderSource):
+    """
+            A class containing an order source over an array of ORDER records, read in slices
+    """
+
+    def __init__(self, orders, chunk_size=65536):
+        self.orders = orders
+        self.chunk_size = chunk_size
+
+    def chunks(self):
+        for start in range(0, len(self.orders), self.chunk_size):
+            yield self.orders[start:start + self.chunk_size]
+
+    def remaining(self, count):
+        return ArrayOrderSource(self.orders[count:], self.chunk_size)
+
+
+class BinaryOrderSource(ArrayOrderSource):
+    """
+            A class containing an order source over a .npy file of ORDER records, memory mapped so only the chunk
+            being spawned is read
+    """
+
+    def __init__(self, filename, chunk_size=65536, start=0):
+        self.filename = filename
+        self.start = start  # Number of orders skipped
+        super().__init__(self.load(), chunk_size)
+        if self.orders.dtype != ORDER:
+            raise ValueError("Order file '" + str(filename) + "' does not contain ORDER records")
+
+    def load(self):
+        return np.load(self.filename, mmap_mode='r')[self.start:]
+
+    def remaining(self, count):
+        return BinaryOrderSource(self.filename, self.chunk_size, self.start + count)
+
+    def __getstate__(self):
+        # A copy refers to the file instead of holding the orders
+        state = self.__dict__.copy()
+        del state['orders']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.orders = self.load()
+
+
+class IteratorOrderSource(OrderSource):
+    """
+            A class containing an order source over an iterable of (time, order_number, priority, pos_A) orders, so
+            generated orders do not have to be written to disk first
+    """
+
+    def __init__(self, orders, chunk_size=4096):
+        self.orders = orders
+        self.chunk_size = chunk_size
+
+    def chunks(self):
+        orders = iter(self.orders)
+        while True:
+            chunk = list(itertools.islice(orders, self.chunk_size))
+            if not chunk:
+                break
+            times, order_numbers, priorities, positions = zip(*chunk)
+            records = np.empty(len(chunk), dtype=ORDER)
+            records['time'] = times
+            records['order_number'] = order_numbers
+            records['priority'] = priorities
+            records['pos_A'] = encode_positions(positions)
+            yield records
+
+    def remaining(self, count):
+        # A one-shot iterator cannot be read again without losing the orders the MES still needs
+        if iter(self.orders) is self.orders:
+            raise ValueError("Orders from a one-shot iterator cannot be snapshot, pass a list or an array")
+        return IteratorOrderSource(list(itertools.islice(self.orders, count, None)), self.chunk_size)
+
+
+def order_source(order_list):
+    """
+        Input:
+            - Order source, .npy or text order file, array of ORDER records or iterable of orders
+        Output:
+            - Order source
+    """
+    if isinstance(order_list, OrderSource):
+        return order_list
+    if isinstance(order_list, np.ndarray):
+        return ArrayOrderSource(order_list)
+    if isinstance(order_list, str):
+        if order_list.endswith('.npy'):
+            return BinaryOrderSource(order_list)
+        return CsvOrderSource(order_list)
+    return IteratorOrderSource(order_list)
+
+
+def save_orders(order_list, filename):
+    """
+        Input:
+            - Orders in any form accepted by order_source
+            - Name of the .npy file to write
+        Output:
+            - None, the orders are written as ORDER records for a BinaryOrderSource
+    """
+    chunks = list(order_source(order_list).chunks())
+    np.save(filename, np.concatenate(chunks) if chunks else np.zeros(0, dtype=ORDER))
@@ -0,0 +1,133 @@
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.widgets import Button, Slider
+
+from src.Trace import *
+
+
+class RendererOffline:
+    """
+            A class containing the offline replay of a recorded trace. The trace is memory mapped and only the records
+            from the last keyframe up to the shown sample are read, so long runs can be scrubbed, seeked and played at
+            any speed without loading them.
+    """
+
+    def __init__(self, trace_dir, graph, speed=10, frame_interval=0.05):
+
+        # Trace
+        self.trace = TraceReader(trace_dir)
+        self.cursor = TraceCursor(self.trace)
+        self.times = self.trace.ticks['time']
+        self.graph = graph
+        self.node_positions = graph.positions[[graph.node_index[name] for name in self.trace.node_names]]
+
+        # Playback
+        self.speed = speed  # Simulated seconds per second
+        self.frame_interval = frame_interval  # Seconds between frames while playing
+        self.playing = False
+
+        # Static layout, drawn once
+        self.figure = plt.figure("agv Replay", figsize=(11, 7))
+        self.ax = self.figure.add_axes([0.08, 0.2, 0.88, 0.74])
+        self.graph.plot(self.ax)
+
+        # Persistent artists, updated in place every frame
+        number_of_robots = len(self.trace.robot_ids)
+        self.colors = plt.cm.rainbow(np.linspace(0, 1, number_of_robots))
+        self.path_lines = [self.ax.plot([], [], color=color, marker='.', ms=15, lw=3.5)[0] for color in self.colors]
+        self.task_markers = {table: self.ax.plot([], [], marker, ms=7)[0]
+                             for table, marker in ((GLOBAL_TASK_LIST, 'gs'), (TASKS_EXECUTING, 'rs'),
+                                                   (LOCAL_TASK_LIST, 'bs'))}
+        self.task_labels = []  # Pool of order number labels
+        self.robot_markers = self.ax.scatter(np.zeros(number_of_robots), np.zeros(number_of_robots), s=100,
+                                             c=self.colors, zorder=3)
+        self.robot_labels = [self.ax.text(0, 0, "") for _ in self.trace.robot_ids]
+
+        # Widgets
+        end_time = self.times[-1] if len(self.times) else 0
+        self.time_slider = Slider(self.figure.add_axes([0.12, 0.08, 0.6, 0.03]), 'Time (s)', 0, end_time,
+                                  valinit=0)
+        self.time_slider.on_changed(self.seek)
+        self.speed_slider = Slider(self.figure.add_axes([0.12, 0.03, 0.6, 0.03]), 'Speed', 0, 3,
+                                   valinit=math.log10(speed))
+        self.speed_slider.on_changed(self.set_speed)
+        self.play_button = Button(self.figure.add_axes([0.8, 0.03, 0.1, 0.08]), 'Play')
+        self.play_button.on_clicked(self.toggle_play)
+        self.timer = self.figure.canvas.new_timer(interval=int(1000 * frame_interval))
+        self.timer.add_callback(self.play_step)
+
+        # Initialize
+        self.set_speed(self.speed_slider.val)
+        self.seek(0)
+
+    def seek(self, time):
+        # Last sample at or before the time
+        if not len(self.times):
+            return
+        sample = max(int(np.searchsorted(self.times, time, side='right')) - 1, 0)
+        self.cursor.seek(sample)
+        self.draw_sample()
+
+    def set_speed(self, value):
+        # The speed slider is logarithmic, from 1 to 1000 times real time
+        self.speed = 10 ** value
+        self.speed_slider.valtext.set_text(str(round(self.speed, 1)) + "x")
+
+    def toggle_play(self, _=None):
+        self.playing = not self.playing
+        self.play_button.label.set_text('Pause' if self.playing else 'Play')
+        if self.playing:
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def play_step(self):
+        time = self.time_slider.val + self.speed * self.frame_interval
+        if len(self.times) == 0 or time >= self.times[-1]:
+            time = self.times[-1] if len(self.times) else 0
+            self.toggle_play()
+        self.time_slider.set_val(time)
+
+    def draw_sample(self):
+
+        # Robots
+        records = [self.cursor.robots[ID] for ID in self.trace.robot_ids]
+        robot_positions = np.array([[record['x'], record['y']] for record in records])
+        self.robot_markers.set_offsets(robot_positions)
+        for record, position, label, path_line in zip(records, robot_positions, self.robot_labels,
+                                                      self.path_lines):
+            label.set_position((position[0] + 0.5, position[1] + 1.5))
+            label.set_text("agv" + str(record['ID']) + " " + self.trace.statuses[record['status']] + " " +
+                           str(round(float(record['battery_status']), 1)) + "%")
+            path_positions = np.vstack((position, self.node_positions[self.trace.path_nodes(record)]))
+            path_line.set_data(path_positions[:, 0], path_positions[:, 1])
+
+        # Tasks
+        task_records = []
+        for table, marker in self.task_markers.items():
+            if table == LOCAL_TASK_LIST:
+                records = [record for ID in self.trace.robot_ids for record in self.cursor.tasks(table, ID)]
+            else:
+                records = self.cursor.tasks(table)
+            task_positions = self.node_positions[[record['node'] for record in records]].reshape(-1, 2)
+            marker.set_data(task_positions[:, 0], task_positions[:, 1])
+            task_records.extend(zip(records, task_positions))
+
+        # Task labels, reused from the pool
+        while len(self.task_labels) < len(task_records):
+            self.task_labels.append(self.ax.text(0, 0, ""))
+        for i, label in enumerate(self.task_labels):
+            label.set_visible(i < len(task_records))
+            if i < len(task_records):
+                record, position = task_records[i]
+                label.set_position((position[0] - 1, position[1] + 1.5))
+                label.set_text(record['order_number'].decode())
+
+        # Draw
+        self.ax.set_title("agv Replay at " + format_time(self.times[self.cursor.sample]) + " s")
+        self.figure.canvas.draw_idle()
+
+    def show(self):
+        plt.show()
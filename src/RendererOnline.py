@@ -3,11 +3,14 @@ import math
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
 
 
 class RendererOnline:
     """
-            A class containing the methods for an online rendering of the simulation.
+            A class containing the methods for an online rendering of the simulation. The layout and the monitor
+            history are drawn once into cached backgrounds, every second only the robots, paths, tasks and the newest
+            monitor segments are redrawn and blitted.
     """
 
     def __init__(self, env, kb, depot_locations, charge_locations, print_):
@@ -21,131 +24,206 @@ class RendererOnline:
         self.graph = kb['graph']
         self.global_robot_list = kb['global_robot_list']
         self.global_task_list = kb['global_task_list']
-        self.status_monitor = [[] for _ in kb['global_robot_list'].items]
-        self.battery_status_monitor = [[] for _ in kb['global_robot_list'].items]
         self.tasks_executing = kb['tasks_executing']
         self.depot_locations = depot_locations
         self.charge_locations = charge_locations
-        self.tasks_not_executing_monitor = []
-        self.colors = matplotlib.cm.rainbow(np.linspace(0, 1, len(kb['global_robot_list'].items)))
+        self.robot_ids = [robot.ID for robot in kb['global_robot_list'].items]
+        self.colors = matplotlib.cm.rainbow(np.linspace(0, 1, len(self.robot_ids)))
 
-        # Processes
-        self.render_scene = self.env.process(self.render_scene())
-        self.status_monitor_update = self.env.process(self.status_monitor_update())
-        self.battery_status_monitor_update = self.env.process(self.battery_status_monitor_update())
+        # Monitor history, one column per second, the monitors show a window that is doubled when full
+        number_agvs = len(self.robot_ids)
+        self.monitor_length = 0
+        self.status_monitor = np.zeros((number_agvs, 64))
+        self.battery_status_monitor = np.zeros((number_agvs, 64))
+        self.monitor_window = 64
 
         # Initiate plt
         plt.close("all")
         plt.rcParams['toolbar'] = 'None'
-        plt.figure("agv Simulator", figsize=(11, 6), facecolor='k', edgecolor='k', dpi=100)
-        plt.title("agv Simulator")
+        plt.style.use('dark_background')
+        self.figure = plt.figure("agv Simulator", figsize=(11, 6), facecolor='k', edgecolor='k', dpi=100)
+        self.canvas = self.figure.canvas
+
+        # Static layout
+        self.layout_ax = plt.subplot2grid((1, number_agvs + 3), (0, 0), colspan=3)
+        self.graph.plot(self.layout_ax)
+        self.layout_ax.set_title("agv Layout")
+
+        # Static monitors
+        self.status_axes = []
+        self.battery_axes = []
+        for i, ID in enumerate(self.robot_ids):
+            status_ax = plt.subplot2grid((2, number_agvs + 3), (0, i + 3))
+            status_ax.set_title("agv" + str(ID))
+            status_ax.set_xlabel("Simulation time (s)")
+            status_ax.set_ylabel("IDLE (0), BUSY (1)")
+            status_ax.set_ylim(-0.05, 1.05)
+            battery_ax = plt.subplot2grid((2, number_agvs + 3), (1, i + 3))
+            battery_ax.set_xlabel("Simulation time (s)")
+            battery_ax.set_ylabel("Battery level")
+            battery_ax.set_ylim(0, 100)
+            battery_ax.axhline(20, color='r')
+            for ax in (status_ax, battery_ax):
+                ax.set_xlim(0, self.monitor_window)
+            self.status_axes.append(status_ax)
+            self.battery_axes.append(battery_ax)
+        plt.subplots_adjust(wspace=1.5, hspace=0.4)
+
+        # Monitor history lines, only updated on a full redraw, and the newest segment of every monitor
+        self.status_lines = [ax.plot([], [], 'b')[0] for ax in self.status_axes]
+        self.battery_lines = [ax.plot([], [], 'b')[0] for ax in self.battery_axes]
+        self.status_segments = [ax.plot([], [], 'b', animated=True)[0] for ax in self.status_axes]
+        self.battery_segments = [ax.plot([], [], 'b', animated=True)[0] for ax in self.battery_axes]
+
+        # Moving artists of the layout, updated in place
+        ax = self.layout_ax
+        self.robot_markers = [ax.plot([], [], color=color, marker='o', ms=10, animated=True)[0]
+                              for color in self.colors]
+        self.heading_lines = [ax.plot([], [], color=color, lw=3, animated=True)[0] for color in self.colors]
+        self.robot_labels = [ax.text(0, 0, "agv" + str(ID), animated=True) for ID in self.robot_ids]
+        self.path_lines = [ax.plot([], [], color=color, marker='.', ms=15, lw=3.5, animated=True)[0]
+                           for color in self.colors]
+        self.total_path_lines = [ax.plot([], [], color=color, marker='.', ms=15, lw=1.5, animated=True)[0]
+                                 for color in self.colors]
+        self.assignment_lines = [ax.add_collection(LineCollection([], colors=[color], linewidths=0.5, animated=True))
+                                 for color in self.colors]
+        self.local_task_markers = [ax.plot([], [], 'bs', ms=7, animated=True)[0] for _ in self.robot_ids]
+        self.tasks_executing_markers = ax.plot([], [], 'rs', ms=7, animated=True)[0]
+        self.global_task_markers = ax.plot([], [], 'gs', ms=7, animated=True)[0]
+        self.task_labels = []  # Pool of order number labels
+
+        # Backgrounds are captured after every full draw
+        self.layout_background = None
+        self.monitor_backgrounds = []
+        self.canvas.mpl_connect('draw_event', self.capture_backgrounds)
+        self.canvas.mpl_connect('resize_event', self.update_monitor_lines)
+        plt.tight_layout()
+        self.canvas.draw()
+        plt.pause(0.0001)
+
+        # Processes
+        self.render_scene = self.env.process(self.render_scene())
+
+    def capture_backgrounds(self, _=None):
+        self.layout_background = self.canvas.copy_from_bbox(self.layout_ax.bbox)
+        self.monitor_backgrounds = [self.canvas.copy_from_bbox(ax.bbox) for ax in self.status_axes + self.battery_axes]
 
     def render_scene(self):
 
         while True:
 
             yield self.env.timeout(1)
-            number_agvs = len(self.global_robot_list.items)
-            ax = plt.subplot2grid((1, number_agvs + 3), (0, 0), colspan=3)
-            plt.subplots_adjust(wspace=1.5, hspace=0.4)
-            plt.title("agv Layout")
-            plt.style.use('dark_background')
-
-            # Plot Graph
-            self.graph.plot(ax)
-
-            # Plot AGVs
-            for robot in self.global_robot_list.items:
-                color = self.colors[robot.ID - 1]
-                plt.plot(robot.robot_location[0], robot.robot_location[1], color=color, marker='o', ms=10)
-                plt.arrow(robot.robot_location[0], robot.robot_location[1], math.cos(robot.heading_direction),
-                          math.sin(robot.heading_direction), width=0.3, color=color)
-                plt.text(robot.robot_location[0] + 0.5, robot.robot_location[1] + 1.5, str("agv" + str(robot.ID)))
-
-                # Plot path
-                if robot.path:
-                    node_pos = self.kb['graph'].nodes[robot.path[0]].pos
-                    plt.plot([robot.robot_location[0], node_pos[0]], [robot.robot_location[1], node_pos[1]],
-                             color=color, lw=3.5)
-                    for i in range(len(robot.path)):
-                        node_pos = self.kb['graph'].nodes[robot.path[i]].pos
-                        plt.plot(node_pos[0], node_pos[1], color=color, marker='.', ms=15)
-                        if i < len(robot.path) - 1:
-                            node_pos_ = self.kb['graph'].nodes[robot.path[i + 1]].pos
-                            plt.plot([node_pos[0], node_pos_[0]],
-                                     [node_pos[1], node_pos_[1]], color=color, lw=3.5)
-
-                # Plot total path
-                if robot.total_path:
-                    for i in range(len(robot.total_path)):
-                        node_pos = self.kb['graph'].nodes[robot.total_path[i]].pos
-                        plt.plot(node_pos[0], node_pos[1], color=color, marker='.', ms=15)
-                        if i < len(robot.total_path) - 1:
-                            node_pos_ = self.kb['graph'].nodes[robot.total_path[i + 1]].pos
-                            plt.plot([node_pos[0], node_pos_[0]],
-                                     [node_pos[1], node_pos_[1]], color=color, lw=1.5)
-
-                # Plot assigned tasks
-                for key in self.kb.keys():
-                    if key == 'local_task_list_R' + str(robot.ID):
-                        list_ = self.kb[key]
-                        for item in list_.items:
-                            node_pos = self.kb['graph'].nodes[item.pos_A].pos
-                            plt.plot(node_pos[0], node_pos[1], 'bs', ms=7)
-                            plt.text(node_pos[0] - 1, node_pos[1] + 1.5, str(item.order_number))
-                            plt.plot([robot.robot_location[0], node_pos[0]],
-                                     [robot.robot_location[1], node_pos[1]], color=color, lw=0.5)
-
-            # Plot tasks executing
-            for task in self.tasks_executing.items:
-                node_pos = self.kb['graph'].nodes[task.pos_A].pos
-                plt.plot(node_pos[0], node_pos[1], 'rs', ms=7)
-                plt.text(node_pos[0] - 1, node_pos[1] + 1.5, str(task.order_number))
-
-            # Plot tasks in global task list
-            for task in self.global_task_list.items:
-                node_pos = self.kb['graph'].nodes[task.pos_A].pos
-                plt.plot(node_pos[0], node_pos[1], 'gs', ms=7)
-                plt.text(node_pos[0] - 1, node_pos[1] + 1.5, str(task.order_number))
-
-            # Plot
-            plt.draw()
-            plt.pause(0.0001)
-            plt.clf()
-            plt.tight_layout()
-
-    def status_monitor_update(self):
-        while True:
-            yield self.env.timeout(1)
-            robots = self.global_robot_list.items
-            robots = sorted(robots, key=lambda robot: robot.ID)
-            for i in range(len(robots)):
-                self.status_monitor[i].append(robots[i].status == 'BUSY')
-                status_monitor_y = self.status_monitor[i]
-                status_monitor_x = np.arange(len(status_monitor_y))
-                number_agvs = len(self.global_robot_list.items)
-                plt.subplot2grid((2, number_agvs + 3), (0, robots[i].ID + 2))
-                plt.title("agv" + str(robots[i].ID))
-                plt.xlabel("Simulation time (s)")
-                plt.ylabel("IDLE (0), BUSY (1)")
-                plt.plot(status_monitor_x, status_monitor_y, 'b')
-
-    def battery_status_monitor_update(self):
-        while True:
-            yield self.env.timeout(1)
-            robots = self.global_robot_list.items
-            robots = sorted(robots, key=lambda robot: robot.ID)
-            for i in range(len(robots)):
-                self.battery_status_monitor[i].append(robots[i].battery_status)
-                battery_status_monitor_y = self.battery_status_monitor[i]
-                battery_status_monitor_x = np.arange(len(battery_status_monitor_y))
-                number_agvs = len(self.global_robot_list.items)
-                plt.subplot2grid((2, number_agvs + 3), (1, robots[i].ID + 2))
-                plt.xlabel("Simulation time (s)")
-                plt.ylabel("Battery level")
-                plt.ylim(0, 100)
-                plt.plot(battery_status_monitor_x, battery_status_monitor_y, 'b')
-                plt.plot(battery_status_monitor_x, np.repeat(20, len(battery_status_monitor_x)), 'r')
+            robots = [self.global_robot_list.get(ID) for ID in self.robot_ids]
+
+            # Monitors, a full redraw only when their window is full
+            self.monitor_update(robots)
+            if self.monitor_length > self.monitor_window:
+                self.extend_monitor_window()
+            else:
+                self.blit_monitor_segments()
+
+            # Layout
+            self.canvas.restore_region(self.layout_background)
+            for artist in self.update_layout_artists(robots):
+                self.layout_ax.draw_artist(artist)
+            self.canvas.blit(self.layout_ax.bbox)
+            self.canvas.flush_events()
+
+    def monitor_update(self, robots):
+        # Append one second of history, the buffers double when full
+        if self.monitor_length == self.status_monitor.shape[1]:
+            self.status_monitor = np.hstack((self.status_monitor, np.zeros_like(self.status_monitor)))
+            self.battery_status_monitor = np.hstack((self.battery_status_monitor,
+                                                     np.zeros_like(self.battery_status_monitor)))
+        for i, robot in enumerate(robots):
+            self.status_monitor[i, self.monitor_length] = robot.status == 'BUSY'
+            self.battery_status_monitor[i, self.monitor_length] = robot.battery_status
+        self.monitor_length += 1
+
+    def blit_monitor_segments(self):
+        # Draw the newest segment on top of the monitor background and keep it in the background
+        start = max(self.monitor_length - 2, 0)
+        x = np.arange(start, self.monitor_length)
+        axes = self.status_axes + self.battery_axes
+        segments = self.status_segments + self.battery_segments
+        histories = list(self.status_monitor) + list(self.battery_status_monitor)
+        for i, (ax, segment, history) in enumerate(zip(axes, segments, histories)):
+            self.canvas.restore_region(self.monitor_backgrounds[i])
+            segment.set_data(x, history[start:self.monitor_length])
+            ax.draw_artist(segment)
+            self.canvas.blit(ax.bbox)
+            self.monitor_backgrounds[i] = self.canvas.copy_from_bbox(ax.bbox)
+
+    def extend_monitor_window(self):
+        # Double the window and redraw the whole history once
+        self.monitor_window *= 2
+        for ax in self.status_axes + self.battery_axes:
+            ax.set_xlim(0, self.monitor_window)
+        self.update_monitor_lines()
+        self.canvas.draw()
+
+    def update_monitor_lines(self, _=None):
+        # The history lines are only drawn on a full redraw, the blitted segments are lost then
+        x = np.arange(self.monitor_length)
+        for i in range(len(self.robot_ids)):
+            self.status_lines[i].set_data(x, self.status_monitor[i, :self.monitor_length])
+            self.battery_lines[i].set_data(x, self.battery_status_monitor[i, :self.monitor_length])
+
+    def update_layout_artists(self, robots):
+        artists = []
+        task_labels = []
+
+        # AGVs
+        for i, robot in enumerate(robots):
+            robot_location = robot.location_at(self.env.now)
+            self.robot_markers[i].set_data([robot_location[0]], [robot_location[1]])
+            self.heading_lines[i].set_data([robot_location[0], robot_location[0] + math.cos(robot.heading_direction)],
+                                           [robot_location[1], robot_location[1] + math.sin(robot.heading_direction)])
+            self.robot_labels[i].set_position((robot_location[0] + 0.5, robot_location[1] + 1.5))
+
+            # Path
+            path_positions = self.node_positions(robot.path).reshape(-1, 2)
+            path_positions = np.vstack(([robot_location], path_positions)) if robot.path else path_positions
+            self.path_lines[i].set_data(path_positions[:, 0], path_positions[:, 1])
+
+            # Total path
+            total_path_positions = self.node_positions(robot.total_path).reshape(-1, 2)
+            self.total_path_lines[i].set_data(total_path_positions[:, 0], total_path_positions[:, 1])
+
+            # Assigned tasks
+            local_task_list = self.kb.get('local_task_list_R' + str(robot.ID))
+            local_tasks = local_task_list.items if local_task_list is not None else []
+            task_positions = self.node_positions([task.pos_A for task in local_tasks]).reshape(-1, 2)
+            self.local_task_markers[i].set_data(task_positions[:, 0], task_positions[:, 1])
+            self.assignment_lines[i].set_segments([[robot_location, node_pos] for node_pos in task_positions])
+            task_labels.extend(zip(local_tasks, task_positions))
+
+            artists += [self.total_path_lines[i], self.path_lines[i], self.assignment_lines[i],
+                        self.local_task_markers[i], self.robot_markers[i], self.heading_lines[i],
+                        self.robot_labels[i]]
+
+        # Tasks executing and tasks in global task list
+        for tasks, markers in ((self.tasks_executing.items, self.tasks_executing_markers),
+                               (self.global_task_list.items, self.global_task_markers)):
+            task_positions = self.node_positions([task.pos_A for task in tasks]).reshape(-1, 2)
+            markers.set_data(task_positions[:, 0], task_positions[:, 1])
+            task_labels.extend(zip(tasks, task_positions))
+            artists.append(markers)
+
+        # Task labels, reused from the pool
+        while len(self.task_labels) < len(task_labels):
+            self.task_labels.append(self.layout_ax.text(0, 0, "", animated=True))
+        for (task, node_pos), label in zip(task_labels, self.task_labels):
+            label.set_position((node_pos[0] - 1, node_pos[1] + 1.5))
+            label.set_text(str(task.order_number))
+            artists.append(label)
+
+        return artists
+
+    def node_positions(self, node_names):
+        if not node_names:
+            return np.zeros((0, 2))
+        return self.graph.positions[[self.graph.node_index[name] for name in node_names]]
 
     def my_print(self, msg):
         if self.print:
@@ -0,0 +1,179 @@
+import multiprocessing
+import queue
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from src.Trace import GLOBAL_TASK_LIST, LOCAL_TASK_LIST, TASKS_EXECUTING
+
+
+class RendererProcess:
+    """
+            A class containing a renderer decoupled from the simulation. Every second the simulation publishes a
+            lightweight snapshot to a bounded queue without waiting, a separate process draws the newest snapshot at a
+            fixed wall-clock frame rate. Snapshots published while the queue is full are dropped.
+    """
+
+    def __init__(self, env, kb, print_, frame_rate=20, queue_size=2):
+
+        # Printing
+        self.print = print_
+
+        # Attributes
+        self.env = env
+        self.kb = kb
+        self.graph = kb['graph']
+        self.global_robot_list = kb['global_robot_list']
+        self.robot_ids = [robot.ID for robot in kb['global_robot_list'].items]
+        self.dropped_frames = 0
+
+        # Render process, fed by a bounded queue
+        self.frames = multiprocessing.Queue(queue_size)
+        self.renderer = multiprocessing.Process(target=render_frames,
+                                                args=(self.frames, self.graph, self.robot_ids, frame_rate))
+        self.renderer.start()
+
+        # Process
+        self.publishing = self.env.process(self.publishing())
+
+        # Initialize
+        self.my_print("Renderer:                Started")
+
+    def publishing(self):
+        while True:
+            yield self.env.timeout(1)
+            self.publish()
+
+    def publish(self):
+        # Never wait for the renderer, a frame it cannot keep up with is dropped
+        if self.frames.full():
+            self.dropped_frames += 1
+            return
+        try:
+            self.frames.put_nowait(self.snapshot())
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def snapshot(self):
+        now = self.env.now
+        robots = [self.global_robot_list.get(ID) for ID in self.robot_ids]
+        local_tasks = [task for ID in self.robot_ids
+                       for task in self.kb['local_task_list_R' + str(ID)].items]
+        return {'time': now,
+                'positions': np.array([robot.location_at(now) for robot in robots], dtype=float),
+                'statuses': [robot.status for robot in robots],
+                'batteries': [robot.battery_status for robot in robots],
+                'paths': [self.node_indices(robot.path) for robot in robots],
+                'tasks': {GLOBAL_TASK_LIST: self.task_positions(self.kb['global_task_list'].items),
+                          TASKS_EXECUTING: self.task_positions(self.kb['tasks_executing'].items),
+                          LOCAL_TASK_LIST: self.task_positions(local_tasks)}}
+
+    def node_indices(self, node_names):
+        return np.array([self.graph.node_index[name] for name in node_names or []], dtype=int)
+
+    def task_positions(self, tasks):
+        return [str(task.order_number) for task in tasks], self.node_indices([task.pos_A for task in tasks])
+
+    def close(self):
+        # Show the final state, the window stays open until it is closed
+        if self.renderer.is_alive():
+            try:
+                self.frames.put(self.snapshot(), timeout=1)
+                self.frames.put(None, timeout=1)
+            except queue.Full:
+                pass
+        self.frames.cancel_join_thread()
+        self.my_print("Renderer:                Dropped " + str(self.dropped_frames) + " frames")
+
+    def my_print(self, msg):
+        if self.print:
+            print(msg)
+
+
+def render_frames(frames, graph, robot_ids, frame_rate):
+    """
+        Input:
+            - Queue of snapshots, None when the simulation ended
+            - Graph of the layout
+            - IDs of the robots
+            - Frames per second
+        Output:
+            - None, draws the newest snapshot every frame until the simulation ended or the window is closed
+    """
+
+    # Static layout, drawn once
+    figure = plt.figure("agv Simulator", figsize=(9, 7))
+    ax = figure.add_subplot(1, 1, 1)
+    graph.plot(ax)
+
+    # Persistent artists, updated in place every frame
+    colors = plt.cm.rainbow(np.linspace(0, 1, len(robot_ids)))
+    path_lines = [ax.plot([], [], color=color, marker='.', ms=15, lw=3.5)[0] for color in colors]
+    task_markers = {table: ax.plot([], [], marker, ms=7)[0]
+                    for table, marker in ((GLOBAL_TASK_LIST, 'gs'), (TASKS_EXECUTING, 'rs'), (LOCAL_TASK_LIST, 'bs'))}
+    task_labels = []  # Pool of order number labels
+    robot_markers = ax.scatter(np.zeros(len(robot_ids)), np.zeros(len(robot_ids)), s=100, c=colors, zorder=3)
+    robot_labels = [ax.text(0, 0, "") for _ in robot_ids]
+    plt.show(block=False)
+
+    # Loop
+    frame_time = 1 / frame_rate
+    while plt.fignum_exists(figure.number):
+        frame_start = time.monotonic()
+
+        # Newest snapshot, the older ones are skipped
+        snapshot = False
+        try:
+            while True:
+                snapshot = frames.get_nowait()
+                if snapshot is None:
+                    break
+        except queue.Empty:
+            pass
+        if snapshot is None:
+            break
+
+        # Draw
+        if snapshot:
+            draw_snapshot(snapshot, ax, graph, robot_ids, robot_markers, robot_labels, path_lines, task_markers,
+                          task_labels)
+            figure.canvas.draw_idle()
+        plt.pause(max(frame_time - (time.monotonic() - frame_start), 0.001))
+
+    # Keep the final state on screen
+    if plt.fignum_exists(figure.number):
+        ax.set_title(ax.get_title() + " (ended)")
+        plt.show()
+
+
+def draw_snapshot(snapshot, ax, graph, robot_ids, robot_markers, robot_labels, path_lines, task_markers, task_labels):
+
+    # Robots
+    positions = snapshot['positions']
+    robot_markers.set_offsets(positions)
+    for i, ID in enumerate(robot_ids):
+        robot_labels[i].set_position((positions[i, 0] + 0.5, positions[i, 1] + 1.5))
+        robot_labels[i].set_text("agv" + str(ID) + " " + snapshot['statuses'][i] + " " +
+                                 str(round(snapshot['batteries'][i], 1)) + "%")
+        path_positions = np.vstack((positions[i], graph.positions[snapshot['paths'][i]]))
+        path_lines[i].set_data(path_positions[:, 0], path_positions[:, 1])
+
+    # Tasks
+    labels = []
+    for table, (order_numbers, nodes) in snapshot['tasks'].items():
+        task_positions = graph.positions[nodes].reshape(-1, 2)
+        task_markers[table].set_data(task_positions[:, 0], task_positions[:, 1])
+        labels.extend(zip(order_numbers, task_positions))
+
+    # Task labels, reused from the pool
+    while len(task_labels) < len(labels):
+        task_labels.append(ax.text(0, 0, ""))
+    for i, label in enumerate(task_labels):
+        label.set_visible(i < len(labels))
+        if i < len(labels):
+            order_number, position = labels[i]
+            label.set_position((position[0] - 1, position[1] + 1.5))
+            label.set_text(order_number)
+
+    ax.set_title("agv Simulator at " + str(round(snapshot['time'], 1)) + " s")
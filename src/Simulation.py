@@ -1,11 +1,25 @@
+import copy
+
 import simpy
 
 from src.agv.AGV_Main import AGV
+from src.datatypes.SimulationSnapshot import SimulationSnapshot
 from src.Logger import Logger
 from src.MES import MES
 from src.Graph import Graph
 from src.RendererOnline import RendererOnline
+from src.RendererProcess import RendererProcess
+from src.fleetmanagers.AuctionFleetManager import AuctionFleetManager
 from src.fleetmanagers.FleetManager import FleetManager
+from src.fleetmanagers.HungarianFleetManager import HungarianFleetManager
+from src.fleetmanagers.LookaheadFleetManager import LookaheadFleetManager
+from src.fleetmanagers.RoutingFleetManager import RoutingFleetManager
+from src.knowledgebase.ChargerField import ChargerField
+from src.knowledgebase.FleetArrays import FleetArrays
+from src.knowledgebase.MetricsCollector import MetricsCollector
+from src.knowledgebase.Notifier import Notifier
+from src.knowledgebase.RobotRegistry import RobotRegistry
+from src.knowledgebase.TaskTable import TaskTable
 from src.utils.situation_generator import *
 from src.utils.utils import *
 
@@ -15,6 +29,10 @@ class Simulation:
     """
             This is the baseclass for the simulation, the whole simulation is set up and started from here.
     """
+
+    # Fleet managers by name
+    fleet_managers = {'closest': FleetManager, 'hungarian': HungarianFleetManager, 'routing': RoutingFleetManager,
+                      'auction': AuctionFleetManager, 'lookahead': LookaheadFleetManager}
     
     def __init__(self, setup_file_path):
         
@@ -46,14 +64,33 @@ class Simulation:
         self.graph = Graph()
         self.graph.create_nodes(self.node_locations, self.node_names)
         self.graph.create_edges(self.node_names, self.node_neighbors)
+        self.charger_field = ChargerField(self.graph, self.charge_locations)
     
-    def start_simulation(self, order_list, num_robots, render_=True, log_=True, print_=True):
+    def start_simulation(self, order_list, num_robots, render_=True, log_=True, print_=True,
+                         motion_mode='interpolated', fleet_backend='objects', fleet_manager='closest',
+                         log_dir='../logfiles', text_logs_=True, render_mode='inline', real_time_factor=None,
+                         snapshot_time=None, snapshot=None):
+        """
+            Input:
+                - Orders, in any form accepted by an order source
+                - Number of robots
+                - Options of the run
+                - Time to stop at with a snapshot instead of running until all tasks are executed
+                - Snapshot to continue from, see restore_simulation
+            Output:
+                - Simulation result, or the snapshot when a snapshot time is given
+        """
         
-        # Define simulation environment
-        env = simpy.Environment()
+        # Define simulation environment, with a real time factor it runs that many simulated seconds per wall second
+        initial_time = snapshot.time if snapshot else 0
+        if real_time_factor:
+            env = simpy.rt.RealtimeEnvironment(initial_time, factor=1 / real_time_factor, strict=False)
+        else:
+            env = simpy.Environment(initial_time)
         
         # Define knowledge base (SQL database)
-        kb = self.define_knowledge_base(env)
+        kb = self.define_knowledge_base(env, fleet_backend)
+        kb['metrics'] = MetricsCollector(env, num_robots)  # Per robot counters for the simulation result
         
         # Define communication channel between FleetManager and AGVs (These are just the virtual IP adresses)
         fm_to_agv_comm = dict()
@@ -66,9 +103,10 @@ class Simulation:
         mes = MES(env, kb, order_list, print_)
 
         # Define Fleet Manger / Central Auctioneer
-        FleetManager(env, kb, fm_to_agv_comm, agv_to_fm_comm, print_)
+        fleet_manager_agent = self.fleet_managers[fleet_manager](env, kb, fm_to_agv_comm, agv_to_fm_comm, print_)
 
         # Define AGVs
+        agvs = []
         for ID in range(num_robots):
             agv_params = {'ID': ID + 1,
                           'robot_speed': self.robot_speed,
@@ -80,45 +118,127 @@ class Simulation:
                           'max_charging_time': self.max_charging_time,
                           'max_tasks_in_task_list': self.max_tasks_in_task_list,
                           'epsilon': self.epsilon,
-                          'initial_resources': self.initial_resources}
-            AGV(env, agv_params, kb, fm_to_agv_comm[ID + 1], agv_to_fm_comm, print_)
+                          'initial_resources': self.initial_resources,
+                          'motion_mode': motion_mode,
+                          'fleet_backend': fleet_backend}
+            agvs.append(AGV(env, agv_params, kb, fm_to_agv_comm[ID + 1], agv_to_fm_comm, print_))
+
+        # Continue from the snapshot
+        if snapshot:
+            self.restore_snapshot(snapshot, kb, agvs)
+            if snapshot.fleet_manager == fleet_manager:
+                fleet_manager_agent.restore(snapshot.fleet_manager_state)
         
         # Define logger
-        if log_:
-            Logger(env, kb, print_)
+        logger = Logger(env, kb, print_, log_dir, text_logs_) if log_ else None
         
-        # Define online renderer
-        if render_:
+        # Define online renderer, 'inline' draws inside the simulation loop, 'process' in a separate process
+        renderer = None
+        if render_ and render_mode == 'process':
+            renderer = RendererProcess(env, kb, print_)
+        elif render_:
             RendererOnline(env, kb, self.depot_locations, self.charge_locations, print_)
         
-        # Run environment untill all tasks are executed
-        env.run(until=mes.main)
-        simulation_time = env.now - 1  # Correction for last time step
+        # Run environment untill all tasks are executed, or untill the snapshot time
+        if snapshot_time is None:
+            env.run(until=mes.main)
+        else:
+            env.run(until=env.any_of([mes.main, env.timeout(max(snapshot_time - env.now, 0))]))
+        simulation_time = env.now
+        if renderer:
+            renderer.close()
+
+        # Log the final state
+        if logger:
+            logger.log_state()
+            logger.close()
+
+            # Print simulation duration
+            with open(os.path.join(log_dir, "simulation_information.txt"), "w") as file:
+                file.write(str(num_robots) + '\n')
+                file.write(str(simulation_time) + '\n')
 
-        # Print simulation duration
-        with open("../logfiles/simulation_information.txt", "w") as file:
-            file.write(str(num_robots) + '\n')
-            file.write(str(simulation_time) + '\n')
+        # Snapshot of the running simulation
+        if snapshot_time is not None:
+            return SimulationSnapshot(env.now, num_robots, motion_mode, fleet_backend, fleet_manager,
+                                      copy.deepcopy(kb['global_task_list'].items),
+                                      [agv.snapshot() for agv in agvs], fleet_manager_agent.snapshot(),
+                                      kb['metrics'].snapshot(),
+                                      mes.remaining_orders())
 
         # Get simulation summary
-        travel_cost = sum(get_travel_cost_per_robot())
-        charging_cost = sum(get_charging_cost_per_robot())
-        congestions = sum(get_congestions_per_robot()) / 2
+        return kb['metrics'].result()
+
+    def restore_simulation(self, snapshot, num_robots=None, fleet_manager=None, **options):
+        """
+            Input:
+                - Snapshot of a running simulation
+                - Number of robots, robots are added at their start location or removed with their tasks handed
+                  back to the global task list
+                - Fleet manager, the state of the fleet manager in the snapshot (as the warm start routes of
+                  'routing') is only given back to the same fleet manager
+                - Other options of start_simulation
+            Output:
+                - Simulation result of the run continued from the snapshot
+        """
+        options.setdefault('motion_mode', snapshot.motion_mode)
+        options.setdefault('fleet_backend', snapshot.fleet_backend)
+        return self.start_simulation(snapshot.orders, num_robots or snapshot.number_of_robots,
+                                     fleet_manager=fleet_manager or snapshot.fleet_manager, snapshot=snapshot,
+                                     **options)
+
+    def fork_simulation(self, snapshot, variants, **options):
+        """
+            Input:
+                - Snapshot of a running simulation
+                - Variants, dicts of the restore_simulation arguments that differ per variant
+                - Options shared by all variants
+            Output:
+                - Simulation result per variant
+        """
+        return [self.restore_simulation(snapshot, **dict(options, **variant)) for variant in variants]
+
+    def restore_snapshot(self, snapshot, kb, agvs):
+        # Copies, so one snapshot can be restored many times
+        global_tasks, robots = copy.deepcopy((snapshot.global_tasks, snapshot.robots))
+
+        # Robots that are not part of the restored fleet hand their tasks back to the global task list
+        for state in robots[len(agvs):]:
+            tasks = [state['task_executing']] if state['task_executing'] else []
+            for task in tasks + state['local_tasks']:
+                if task.order_number != '000':
+                    task.robot = None
+                    task.picked = False
+                    global_tasks.append(task)
 
-        return simulation_time, travel_cost, charging_cost, congestions
+        # Knowledge base and robots
+        for task in global_tasks:
+            kb['global_task_list'].put(task)
+        for agv, state in zip(agvs, robots):
+            agv.restore(state)
+        kb['metrics'].restore(snapshot.metrics)
 
-    def generate_situation(self, number_of_tasks, orders_file):
-        generate_situation(number_of_tasks, self.setup_file_path, orders_file)
+    def generate_situation(self, number_of_tasks, orders_file, seed=None, arrival_process=None):
+        generate_situation(number_of_tasks, self.setup_file_path, orders_file, seed, arrival_process)
     
     # Creates the central knowledge base
-    def define_knowledge_base(self, env):
-        global_task_list = simpy.FilterStore(env)  # This needs to be a table in SQL database
-        global_robot_list = simpy.FilterStore(env)  # This needs to be a table in SQL database
-        tasks_executing = simpy.FilterStore(env)  # This needs to be a table in SQL database
+    def define_knowledge_base(self, env, fleet_backend='objects'):
+        global_task_list = TaskTable(env)  # This needs to be a table in SQL database
+        if fleet_backend == 'arrays':
+            global_robot_list = FleetArrays(env, self.graph)  # Structure of arrays for large fleets
+        else:
+            global_robot_list = RobotRegistry()  # This needs to be a table in SQL database
+        tasks_executing = TaskTable(env, prioritized=False)  # This needs to be a table in SQL database
         kb = dict()
         kb['global_task_list'] = global_task_list
         kb['global_robot_list'] = global_robot_list
         kb['tasks_executing'] = tasks_executing
+        kb['events'] = Notifier(env)  # Notifications on tasks arriving, collected and done, robot status, battery
         kb['charge_locations'] = self.charge_locations
+        kb['charger_field'] = self.charger_field
+        kb['robot_speed'] = self.robot_speed
+        kb['task_execution_time'] = self.task_execution_time
+        kb['max_tasks_in_task_list'] = self.max_tasks_in_task_list
+        kb['epsilon'] = self.epsilon
         kb['graph'] = self.graph
         return kb
@@ -0,0 +1,230 @@
+import json
+import os
+
+import numpy as np
+
+from src.knowledgebase.FleetArrays import INTEGER_BITS, STATUSES
+
+# Records, written only when the state of a robot or of a task in a table changed
+ROBOT_RECORD = np.dtype([('time', 'f8'), ('ID', 'i4'), ('x', 'f8'), ('y', 'f8'), ('status', 'i1'),
+                         ('battery_status', 'f8'), ('heading_direction', 'f8'), ('node', 'i4'), ('path_start', 'i8'),
+                         ('path_length', 'i4'), ('travelled_time', 'f8'), ('charged_time', 'f8'),
+                         ('congestions', 'i4'), ('integers', 'u1')])
+TASK_RECORD = np.dtype([('time', 'f8'), ('table', 'i1'), ('owner', 'i4'), ('arrival', 'i8'), ('present', '?'),
+                        ('order_number', 'S20'), ('node', 'i4'), ('priority', 'i4'), ('robot', 'i4'),
+                        ('picked', '?')])
+PATH_NODE = np.dtype('i4')  # Paths of all robot records, one after the other
+# Samples with the number of records written up to them, a keyframe sample holds the full state
+TICK = np.dtype([('time', 'f8'), ('robots', 'i8'), ('tasks', 'i8'), ('keyframe', '?')])
+
+# Task tables, the owner of a local task list is its robot
+GLOBAL_TASK_LIST = 0
+TASKS_EXECUTING = 1
+LOCAL_TASK_LIST = 2
+
+
+class TraceFile:
+    """
+            A class containing an append-only binary file of typed records, written in chunks
+    """
+
+    def __init__(self, filename, dtype, chunk_size=4096):
+        self.file = open(filename, 'wb')
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.length = 0  # Number of records, written or buffered
+
+    def append(self, record):
+        self.buffer.append(record)
+        self.length += 1
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, records):
+        self.buffer.extend(records)
+        self.length += len(records)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        np.array(self.buffer, dtype=self.dtype).tofile(self.file)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class TraceWriter:
+    """
+            A class containing the writer of a trace directory, the state of the robots and task tables is stored as
+            change-only records in typed columns
+    """
+
+    def __init__(self, trace_dir, robot_ids, node_names, chunk_size=4096):
+
+        # Files
+        os.makedirs(trace_dir, exist_ok=True)
+        self.trace_dir = trace_dir
+        self.robots = TraceFile(os.path.join(trace_dir, 'robots.bin'), ROBOT_RECORD, chunk_size)
+        self.tasks = TraceFile(os.path.join(trace_dir, 'tasks.bin'), TASK_RECORD, chunk_size)
+        self.paths = TraceFile(os.path.join(trace_dir, 'paths.bin'), PATH_NODE, chunk_size)
+        self.ticks = TraceFile(os.path.join(trace_dir, 'ticks.bin'), TICK, chunk_size)
+
+        # Description of the trace
+        self.meta = {'robot_ids': list(robot_ids), 'node_names': list(node_names), 'statuses': list(STATUSES)}
+
+    def close(self):
+        for trace_file in (self.robots, self.tasks, self.paths, self.ticks):
+            trace_file.close()
+        with open(os.path.join(self.trace_dir, 'trace.json'), 'w') as file:
+            json.dump(self.meta, file)
+
+
+class TraceReader:
+    """
+            A class containing the reader of a trace directory, the records are memory mapped
+    """
+
+    def __init__(self, trace_dir):
+        with open(os.path.join(trace_dir, 'trace.json'), 'r') as file:
+            meta = json.load(file)
+        self.robot_ids = meta['robot_ids']
+        self.node_names = meta['node_names']
+        self.statuses = meta['statuses']
+        self.robots = self.load(os.path.join(trace_dir, 'robots.bin'), ROBOT_RECORD)
+        self.tasks = self.load(os.path.join(trace_dir, 'tasks.bin'), TASK_RECORD)
+        self.paths = self.load(os.path.join(trace_dir, 'paths.bin'), PATH_NODE)
+        self.ticks = self.load(os.path.join(trace_dir, 'ticks.bin'), TICK)
+        self.keyframes = np.flatnonzero(self.ticks['keyframe'])
+
+    @staticmethod
+    def load(filename, dtype):
+        # An empty file cannot be memory mapped
+        if os.path.getsize(filename) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode='r')
+
+    def path(self, record):
+        return [self.node_names[node] for node in self.path_nodes(record)]
+
+    def path_nodes(self, record):
+        return self.paths[record['path_start']:record['path_start'] + record['path_length']]
+
+    def first_records(self, sample):
+        # Index of the first robot and task record of a sample
+        if sample == 0:
+            return 0, 0
+        return self.ticks[sample - 1]['robots'], self.ticks[sample - 1]['tasks']
+
+    def keyframe_before(self, sample):
+        return self.keyframes[np.searchsorted(self.keyframes, sample, side='right') - 1]
+
+
+class TraceCursor:
+    """
+            A class containing the state of a trace at one sample, found by replaying the records from the last
+            keyframe so only a small part of the trace is read
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.sample = -1
+        self.robots = dict()  # ID -> last record
+        self.tables = dict()  # (table, owner) -> {arrival: last record}
+
+    def seek(self, sample):
+        # Replay forward when the sample is close ahead, otherwise start over from the last keyframe
+        keyframe = self.trace.keyframe_before(sample)
+        if not keyframe <= self.sample <= sample:
+            self.robots = dict()
+            self.tables = dict()
+            self.sample = keyframe - 1
+        robot_start, task_start = self.trace.first_records(self.sample + 1)
+        robot_end, task_end = self.trace.ticks[sample]['robots'], self.trace.ticks[sample]['tasks']
+        for record in self.trace.robots[robot_start:robot_end]:
+            self.robots[int(record['ID'])] = record
+        for record in self.trace.tasks[task_start:task_end]:
+            table = self.tables.setdefault((int(record['table']), int(record['owner'])), dict())
+            if record['present']:
+                table[int(record['arrival'])] = record
+            else:
+                table.pop(int(record['arrival']), None)
+        self.sample = sample
+
+    def tasks(self, table, owner=0):
+        # Records of the tasks in a table, in the order of the table
+        records = self.tables.get((table, owner), dict())
+        if table == GLOBAL_TASK_LIST:
+            return [record for _, record in sorted(records.items(), key=lambda item: (item[1]['priority'], item[0]))]
+        return [record for _, record in sorted(records.items())]
+
+
+def format_time(time):
+    # Sample times were logged as integers, only the final state has a fractional time
+    time = float(time)
+    return str(int(time)) if time.is_integer() else str(time)
+
+
+def number_to_log(record, field):
+    # Values that were Python ints in the simulation are written as ints, like the original logfiles
+    if record['integers'] & INTEGER_BITS[field]:
+        return str(int(record[field]))
+    return str(float(record[field]))
+
+
+def robot_to_log(trace, record):
+    path = trace.path(record)
+    path_string = "{" + ",".join(path) + "}"
+    return str(record['ID']) + ";" + number_to_log(record, 'x') + ";" + number_to_log(record, 'y') + ";" + \
+        trace.statuses[record['status']] + ";" + number_to_log(record, 'battery_status') + ";" + \
+        number_to_log(record, 'heading_direction') + ";" + path_string + ";" + \
+        number_to_log(record, 'travelled_time') + ";" + number_to_log(record, 'charged_time') + ";" + \
+        str(record['congestions'])
+
+
+def task_to_log(trace, record):
+    robot = "None" if record['robot'] < 0 else str(record['robot'])
+    return record['order_number'].decode() + ";" + trace.node_names[record['node']] + ";" + "R" + robot + ";" + \
+        str(record['priority']) + ";" + str(int(record['picked']))
+
+
+def export_text_logs(trace_dir, log_dir):
+    """
+        Input:
+            - Directory of a trace
+            - Directory to write the text logs to (global_task_list.txt, local_task_list.txt, tasks_executing.txt
+              and global_robot_list.txt)
+        Output:
+            - None, every sample of the trace becomes one line per logfile
+    """
+
+    # Init
+    trace = TraceReader(trace_dir)
+    cursor = TraceCursor(trace)
+    files = [open(os.path.join(log_dir, filename), 'w') for filename in
+             ('global_task_list.txt', 'local_task_list.txt', 'tasks_executing.txt', 'global_robot_list.txt')]
+    global_task_file, local_task_file, tasks_executing_file, global_robot_file = files
+
+    # Replay the changes up to every sample
+    for sample, tick in enumerate(trace.ticks):
+        cursor.seek(sample)
+        global_tasks = cursor.tasks(GLOBAL_TASK_LIST)
+        tasks_executing = cursor.tasks(TASKS_EXECUTING)
+        local_task_lists = [cursor.tasks(LOCAL_TASK_LIST, ID) for ID in trace.robot_ids]
+
+        # Write lines
+        time = format_time(tick['time'])
+        global_task_file.write(time + "|" + "".join(task_to_log(trace, record) + "|"
+                                                    for record in global_tasks) + "\n")
+        local_task_file.write(time + "|" + "".join("[" + "".join(task_to_log(trace, record) + ":"
+                                                                 for record in local_tasks) + "]|"
+                                                   for local_tasks in local_task_lists) + "\n")
+        tasks_executing_file.write(time + "|" + "".join(task_to_log(trace, record) + "|"
+                                                        for record in tasks_executing) + "\n")
+        global_robot_file.write(time + "|" + "".join(robot_to_log(trace, cursor.robots[ID]) + "|"
+                                                     for ID in sorted(cursor.robots)) + "\n")
+
+    for file in files:
+        file.close()
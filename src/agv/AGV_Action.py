@@ -1,3 +1,4 @@
+from src.datatypes.Motion import Motion
 from src.utils.utils import *
 
 
@@ -7,6 +8,46 @@ class Action:
         self.agv = agv
 
     def move_to_node(self, node):
+        if self.agv.motion_mode == 'event':
+            return self.traverse_edge(node)
+        return self.interpolate_edge(node)
+
+    def traverse_edge(self, node):
+        # Start moving, intermediate positions follow from the motion on demand
+        node_position = self.agv.kb['graph'].nodes[node].pos
+        self.agv.motion = Motion(self.agv.env.now, self.agv.robot_location, node_position, self.agv.robot_speed)
+        self.agv.heading_direction = self.agv.motion.heading_direction
+        self.agv.settled_time = self.agv.env.now
+        self.agv.update_global_robot_list()
+
+        # Split the edge where the battery drops below its threshold, so this is noticed while moving
+        travel_time = self.agv.motion.travel_time
+        drain_rate = self.agv.resource_management.resource_consumption(1)
+        time_to_threshold = (self.agv.battery_status - self.agv.battery_threshold + 0.01) / drain_rate
+        if 0 < time_to_threshold < travel_time:
+            yield self.agv.env.timeout(time_to_threshold)
+            self.consume(time_to_threshold)
+            self.agv.settled_time = self.agv.env.now
+            self.agv.update_global_robot_list()
+            travel_time -= time_to_threshold
+
+        # Move the rest of the edge in one timed event
+        if self.agv.fleet_view is None:
+            yield self.agv.env.timeout(travel_time)
+            self.agv.motion = None
+            self.agv.robot_location = (node_position[0], node_position[1])
+            self.agv.robot_node = node
+            self.consume(travel_time)
+            self.agv.path = self.agv.path[1:]
+        else:
+            # The fleet arrays settle all robots arriving at the same time in one batch, their paths included
+            previous_battery_status = self.agv.battery_status
+            yield self.agv.kb['global_robot_list'].traverse(self.agv.ID, node, travel_time, drain_rate)
+            self.notify_battery_threshold(previous_battery_status)
+        self.agv.slots = self.agv.slots[1:]
+        self.agv.update_global_robot_list()
+
+    def interpolate_edge(self, node):
         # Interpolate path
         iterations = 10
         node_position = self.agv.kb['graph'].nodes[node].pos
@@ -38,12 +79,22 @@ class Action:
         # Move
         yield self.agv.env.timeout(travel_time)
         self.agv.robot_location = (x, y)
-        self.agv.robot_node = min(self.agv.kb['graph'].nodes.values(),
-                                  key=lambda node: calculate_euclidean_distance(node.pos, (x, y))).name
+        self.agv.robot_node = self.agv.kb['graph'].nearest_node(x, y)
+        self.consume(travel_time)
+        self.agv.update_global_robot_list()
+
+    def consume(self, travel_time):
+        previous_battery_status = self.agv.battery_status
         self.agv.battery_status = round(
             (self.agv.battery_status - self.agv.resource_management.resource_consumption(travel_time)), 2)
         self.agv.travelled_time += float(travel_time)
-        self.agv.update_global_robot_list()
+        self.notify_battery_threshold(previous_battery_status)
+
+    def notify_battery_threshold(self, previous_battery_status):
+        # Notify when the battery drops below its threshold
+        if self.agv.battery_status < self.agv.battery_threshold <= previous_battery_status:
+            self.agv.comm.sql_notify(self.agv.kb['events'], ('battery_threshold', self.agv.ID),
+                                     self.agv.battery_status)
 
     def pick(self):
         yield self.agv.env.timeout(self.agv.task_execution_time)
@@ -47,6 +47,18 @@ class Comm:
         # Execute SQL command
         return request.items
 
+    def sql_read_first_task(self, request):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        return request.peek()
+
     def sql_remove_task(self, request, order_number):
         # Get destination ip and port
         src_ip = self.ip
@@ -57,7 +69,7 @@ class Comm:
         message = None
 
         # Execute SQL command
-        request.get(lambda task: task.order_number == order_number)
+        request.remove(order_number)
 
     def sql_remove_robot(self, request, id):
         # Get destination ip and port
@@ -69,4 +81,64 @@ class Comm:
         message = None
 
         # Execute SQL command
-        request.get(lambda robot: robot.ID == id)
+        request.remove(id)
+
+    def sql_update_robot(self, request, id, fields):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        request.update(id, fields)
+
+    def sql_read_idle_robots(self, request):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        return request.idle()
+
+    def sql_read_robot_attribute(self, request, robots, name):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        return request.read(robots, name)
+
+    def sql_notify(self, request, topic, data=None):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        request.notify(topic, data)
+
+    def sql_wait(self, request, topics):
+        # Get destination ip and port
+        src_ip = self.ip
+        dest_ip = None
+        dest_port = None
+
+        # Construct SQL command
+        message = None
+
+        # Execute SQL command
+        return request.wait(topics)
@@ -1,18 +1,57 @@
-import simpy
+import copy
 
 from src.agv.AGV_Action import Action
 from src.agv.AGV_Comm import Comm
 from src.agv.AGV_ResourceManagement import ResourceManagement
 from src.agv.AGV_TaskAllocation import TaskAllocation
 from src.datatypes.Robot import Robot
+from src.knowledgebase.TaskTable import TaskTable
 from src.utils.utils import *
 
 
+class RobotField:
+    """
+            A class containing an AGV state attribute, stored in the row of the fleet arrays when the AGV has one
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, agv, owner):
+        if agv is None:
+            return self
+        fleet_view = agv.__dict__.get('fleet_view')
+        if fleet_view is None:
+            return agv.__dict__[self.name]
+        return getattr(fleet_view, self.name)
+
+    def __set__(self, agv, value):
+        fleet_view = agv.__dict__.get('fleet_view')
+        if fleet_view is None:
+            agv.__dict__[self.name] = value
+        else:
+            setattr(fleet_view, self.name, value)
+
+
 class AGV:
     """
         A class containing the intelligence of the AGV agent
     """
 
+    # State published in the global robot list
+    robot_location = RobotField()
+    robot_node = RobotField()
+    status = RobotField()
+    battery_status = RobotField()
+    travelled_time = RobotField()
+    charged_time = RobotField()
+    heading_direction = RobotField()
+    task_executing = RobotField()
+    path = RobotField()
+    congestions = RobotField()
+    total_path = RobotField()
+    motion = RobotField()
+
     def __init__(self, env, agv_params, kb, fm_to_agv_comm, agv_to_fm_comm, print_):
     
         # Simulation environment
@@ -39,9 +78,15 @@ class AGV:
         self.epsilon = agv_params['epsilon']  # Objective parameter
         self.max_tasks_in_task_list = agv_params['max_tasks_in_task_list']
         self.initial_resources = agv_params['initial_resources']
+        self.motion_mode = agv_params['motion_mode']  # 'interpolated' or 'event'
+
+        # With the fleet arrays backend the state attributes below are a view on the row of this agv
+        self.fleet_view = None
+        if agv_params['fleet_backend'] == 'arrays':
+            self.fleet_view = self.kb['global_robot_list'].allocate(self.ID)
 
         # Local task list
-        self.kb['local_task_list_R' + str(self.ID)] = simpy.FilterStore(self.env)
+        self.kb['local_task_list_R' + str(self.ID)] = TaskTable(self.env, prioritized=False)
 
         # Updated attributes
         self.robot_location = self.kb['graph'].nodes[agv_params['start_location']].pos
@@ -52,10 +97,15 @@ class AGV:
         self.charged_time = 0
         self.heading_direction = 0
         self.task_executing = None
+        self.task_request = None  # Get on the local task list, its task is taken before the main process resumes
         self.path = []
         self.slots = []
         self.congestions = 0
         self.total_path = []
+        self.motion = None
+        self.settled_time = 0  # Time up to which the battery is drained while traversing an edge
+        self.charging_started = None
+        self.published_status = self.status
     
         # AGV tasks
         self.task_allocation = TaskAllocation(self)
@@ -67,23 +117,32 @@ class AGV:
 
         # Initialize
         self.my_print("agv " + str(self.ID) + ":                   Started")
-        self.robot = Robot(self.ID, self.robot_location, self.robot_node, self.heading_direction, self.path,
-                           self.status, self.battery_status, self.travelled_time, self.charged_time, self.congestions,
-                           self.task_executing)
-        self.comm.sql_write(self.kb['global_robot_list'], self.robot)
+        if self.fleet_view is None:
+            self.robot = Robot(self.ID, self.robot_location, self.robot_node, self.heading_direction, self.path,
+                               self.status, self.battery_status, self.travelled_time, self.charged_time,
+                               self.congestions, self.task_executing)
+            self.comm.sql_write(self.kb['global_robot_list'], self.robot)
+        else:
+            self.robot = self.fleet_view
     
     def main(self):
+
+        # A restored agv first finishes the task it was executing
+        if self.task_executing is not None:
+            yield from self.perform_task(resume=True)
     
         while True:
         
             # Wait for an assigned task
             self.my_print("AGV " + str(self.ID) + ":      Waiting for tasks..." + " at " + str(self.env.now))
-            self.task_executing = yield self.kb['local_task_list_R' + str(self.ID)].get()
+            self.task_request = self.kb['local_task_list_R' + str(self.ID)].get()
+            self.task_executing = yield self.task_request
+            self.task_request = None
         
             # Start task
             self.my_print("AGV " + str(self.ID) + ":      Start executing task " + str(self.task_executing.to_string())
                           + " at " + str(self.env.now))
-            if self.status is not 'EMPTY':
+            if self.status != 'EMPTY':
                 self.status = 'BUSY'
             self.update_global_robot_list()
 
@@ -91,30 +150,37 @@ class AGV:
             self.comm.sql_remove_task(self.kb['global_task_list'], self.task_executing.order_number)
             self.task_executing.robot = self.ID
             self.comm.sql_write(self.kb['tasks_executing'], self.task_executing)
+
+            yield from self.perform_task()
+
+    def perform_task(self, resume=False):
                 
-            # Go to task A
-            yield self.env.process(self.execute_task(self.task_executing))
-
-            # Perform task A
-            yield self.env.process(self.action.pick())
-            self.task_executing.picked = True
-            self.my_print("AGV " + str(self.ID) + ":      Picked item of task " + str(self.task_executing.order_number) + " at "
-                  + str(self.env.now))
-
-            # Task executed
-            self.comm.sql_remove_task(self.kb['tasks_executing'], self.task_executing.order_number)
-            self.task_executing = None
-
-            # Set status to IDLE when task is done or when done charging
-            if self.status is not 'EMPTY':
-                self.status = 'IDLE'
-            self.update_global_robot_list()
+        # Go to task A
+        yield self.env.process(self.execute_task(self.task_executing, resume))
+
+        # Perform task A
+        yield self.env.process(self.action.pick())
+        self.task_executing.picked = True
+        self.my_print("AGV " + str(self.ID) + ":      Picked item of task " + str(self.task_executing.order_number) + " at "
+              + str(self.env.now))
+
+        # Task executed
+        self.comm.sql_remove_task(self.kb['tasks_executing'], self.task_executing.order_number)
+        self.comm.sql_notify(self.kb['events'], 'task_done', self.task_executing)
+        self.kb['metrics'].task_done(self.ID, self.task_executing)
+        self.task_executing = None
+
+        # Set status to IDLE when task is done or when done charging
+        if self.status != 'EMPTY':
+            self.status = 'IDLE'
+        self.update_global_robot_list()
 
     # Calculates shortest path with Astar and executes
-    def execute_task(self, task):
+    def execute_task(self, task, resume=False):
     
-        # Compute astar path
-        self.path, _ = find_shortest_path(self.kb['graph'], self.robot_node, task.pos_A)
+        # Compute astar path, a resumed task continues on the path it was on
+        if not resume or not self.path:
+            self.path, _ = find_shortest_path(self.kb['graph'], self.robot_node, task.pos_A)
 
         # Update state
         self.update_global_robot_list()
@@ -129,15 +195,20 @@ class AGV:
             # Compute charging time
             charging_time = (100 - self.battery_status) / self.resource_management.charging_factor
 
-            # Update status
-            self.my_print(
-                "agv " + str(self.ID) + ":      Is charging for " + str(charging_time) + " seconds at " + str(
-                    self.env.now))
-            self.status = 'CHARGING'
-            self.update_global_robot_list()
+            # Update status, a resumed agv continues charging
+            if resume and self.status == 'CHARGING':
+                charging_time_left = charging_time - (self.env.now - self.charging_started)
+            else:
+                self.my_print(
+                    "agv " + str(self.ID) + ":      Is charging for " + str(charging_time) + " seconds at " + str(
+                        self.env.now))
+                self.status = 'CHARGING'
+                self.charging_started = self.env.now
+                charging_time_left = charging_time
+                self.update_global_robot_list()
 
             # Charging
-            yield self.env.timeout(charging_time)
+            yield self.env.timeout(charging_time_left)
 
             # Update robot status
             self.battery_status = self.battery_status + charging_time * self.resource_management.charging_factor
@@ -147,11 +218,55 @@ class AGV:
             self.update_global_robot_list()
 
     def update_global_robot_list(self):
-        self.comm.sql_remove_robot(self.kb['global_robot_list'], self.ID)
-        self.robot = Robot(self.ID, self.robot_location, self.robot_node, self.heading_direction, self.path,
-                           self.status, self.battery_status, self.travelled_time, self.charged_time, self.congestions,
-                           self.task_executing, self.total_path)
-        self.comm.sql_write(self.kb['global_robot_list'], self.robot)
+        # A view on the fleet arrays is already up to date, only the change itself is published
+        fields = dict()
+        if self.fleet_view is None:
+            fields = {'robot_location': self.robot_location, 'robot_node': self.robot_node,
+                      'heading_direction': self.heading_direction, 'path': self.path, 'status': self.status,
+                      'battery_status': self.battery_status, 'travelled_time': self.travelled_time,
+                      'charged_time': self.charged_time, 'congestions': self.congestions,
+                      'task_executing': self.task_executing, 'total_path': self.total_path, 'motion': self.motion}
+        self.comm.sql_update_robot(self.kb['global_robot_list'], self.ID, fields)
+        self.kb['metrics'].update_robot(self.ID, self.status, self.travelled_time, self.charged_time,
+                                        self.congestions)
+
+        # Notify status changes
+        if self.status != self.published_status:
+            self.published_status = self.status
+            self.comm.sql_notify(self.kb['events'], 'robot_status', self.robot)
+            self.comm.sql_notify(self.kb['events'], ('robot_status', self.ID), self.robot)
+
+    def snapshot(self):
+        # State of the agv, an edge being traversed is settled up to now so it is resumed from where the agv is
+        state = {name: getattr(self, name) for name in
+                 ('robot_location', 'robot_node', 'status', 'battery_status', 'travelled_time', 'charged_time',
+                  'heading_direction', 'task_executing', 'path', 'slots', 'congestions', 'total_path',
+                  'charging_started')}
+        if self.motion is not None:
+            # The fleet arrays can settle the end of an edge after the agv reached it
+            unsettled_time = min(self.env.now, self.motion.start_time + self.motion.travel_time) - self.settled_time
+            state['robot_location'] = self.motion.location_at(self.env.now)
+            state['battery_status'] = round(
+                self.battery_status - self.resource_management.resource_consumption(unsettled_time), 2)
+            state['travelled_time'] = self.travelled_time + unsettled_time
+
+        # Tasks assigned to the agv, also the ones pushed to it but not collected yet, announced tasks are not
+        state['local_tasks'] = self.kb['local_task_list_R' + str(self.ID)].items + \
+            [task for task in self.fm_to_agv_comm.items if task.message != 'announce']
+        return copy.deepcopy(state)
+
+    def restore(self, state):
+        # Continue from a snapshot, the main process resumes the task that was being executed
+        for name, value in state.items():
+            if name != 'local_tasks':
+                setattr(self, name, value)
+        self.motion = None
+        self.published_status = self.status
+        if self.task_executing is not None:
+            self.comm.sql_write(self.kb['tasks_executing'], self.task_executing)
+        for task in state['local_tasks']:
+            self.comm.sql_write(self.kb['local_task_list_R' + str(self.ID)], task)
+        self.update_global_robot_list()
 
     def my_print(self, msg):
         if self.print:
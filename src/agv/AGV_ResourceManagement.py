@@ -1,63 +1,65 @@
 from src.datatypes.Task import Task
-from src.solvers.astar_solver import *
 
 
 class ResourceManagement:
     """
             A class containing the intelligence of the Resource Management agent
     """
+
+    # Params, also used by the fleet managers to check if a robot can do a task on its battery
+    resource_scale_factor = 0.3  # % per second of travel
+    charging_factor = 1  # % per second
     
     def __init__(self, agv):
         
         # AGV
         self.agv = agv
 
-        # Params
-        self.resource_scale_factor = 0.3
-        self.charging_factor = 1  # % per second
-
         # Process
         self.status_manager = self.agv.env.process(self.status_manager())
 
     def status_manager(self):
         while True:
-            yield self.agv.env.timeout(0.1)  # Sample time
-            if self.agv.status == 'BUSY':
+
+            # Wait until the battery drops below its threshold or the agv changes status
+            yield self.agv.comm.sql_wait(self.agv.kb['events'], [('battery_threshold', self.agv.ID),
+                                                                  ('robot_status', self.agv.ID)])
+            # A robot already going to charge gets no second charging task
+            task_executing = self.agv.task_executing
+            if self.agv.status == 'BUSY' and not (task_executing and task_executing.order_number == '000'):
                 if self.agv.battery_status < self.agv.battery_threshold:
+                    self.charge()
 
-                    # Update status to empty
-                    self.agv.status = 'EMPTY'
-                    self.agv.update_global_robot_list()
+    def charge(self):
 
-                    # Get start node of robot
-                    start_node = self.agv.task_executing.pos_A if self.agv.task_executing else self.agv.robot_node
+        # Update status to empty
+        self.agv.status = 'EMPTY'
+        self.agv.update_global_robot_list()
 
-                    # Create charging task
-                    closest_charging_station = self.search_closest_charging_station(start_node)
-                    charging_task = Task('000', closest_charging_station, 0)
+        # Get start node of robot
+        start_node = self.agv.task_executing.pos_A if self.agv.task_executing else self.agv.robot_node
 
-                    # Get tasks in new local task list
-                    new_local_task_list = [charging_task] + [task for task in
-                                                             self.agv.kb['local_task_list_R' + str(self.agv.ID)].items]
+        # Create charging task
+        closest_charging_station = self.search_closest_charging_station(start_node)
+        charging_task = Task('000', closest_charging_station, 0)
 
-                    # Delete local task list
-                    for i in range(len(self.agv.kb['local_task_list_R' + str(self.agv.ID)].items)):
-                        self.agv.kb['local_task_list_R' + str(self.agv.ID)].get()
+        # Get tasks in new local task list
+        new_local_task_list = [charging_task] + [task for task in
+                                                 self.agv.kb['local_task_list_R' + str(self.agv.ID)].items]
 
-                    # Put optimal task_sequence in local task list
-                    for task in new_local_task_list:
-                        self.agv.comm.sql_write(self.agv.kb['local_task_list_R' + str(self.agv.ID)], task)
+        # Delete local task list
+        for i in range(len(self.agv.kb['local_task_list_R' + str(self.agv.ID)].items)):
+            self.agv.kb['local_task_list_R' + str(self.agv.ID)].get()
+
+        # Put optimal task_sequence in local task list
+        for task in new_local_task_list:
+            self.agv.comm.sql_write(self.agv.kb['local_task_list_R' + str(self.agv.ID)], task)
 
     def search_closest_charging_station(self, location):
-        closest_point = None
-        min_distance = float('inf')
-        for name in self.agv.depot_locations:
-            _, distance = find_shortest_path(self.agv.kb['graph'], location, name)
-            if distance < min_distance:
-                min_distance = distance
-                closest_point = name
-        return closest_point
-
-    def resource_consumption(self, travel_time):
-        charge_loss = self.resource_scale_factor * travel_time
+        # Looked up in the charger field of the knowledge base
+        return self.agv.kb['charger_field'].nearest(location)
+
+    @classmethod
+    def resource_consumption(cls, travel_time):
+        charge_loss = cls.resource_scale_factor * travel_time
         return charge_loss
@@ -1,25 +1,150 @@
+from src.datatypes.Bid import Bid
+
+
 class TaskAllocation:
     """
             A class containing the intelligence of the Task Allocation agent
     """
-    
+
     def __init__(self, agv):
-        
+
         # AGV
         self.agv = agv
-        
+
         # Process
         self.task_collector = self.agv.env.process(self.task_collector())
-    
+
     # Executes tasks when assigned from FleetManager
     def task_collector(self):
-    
+
         while True:
-            
+
             # Wait for fleetmanager to announce or assign a task
             task = yield self.agv.fm_to_agv_comm.get()
-            
-            # Add assigned task to local task list
+
+            # Answer an announced task with a bid
+            if task.message == 'announce':
+                self.agv.comm.tcp_write(self.agv.agv_to_fm_comm, self.get_bid(task))
+                continue
+
+            # Add assigned task to local task list, an awarded task at the position it was bid for
             self.agv.my_print("AGV " + str(self.agv.ID) + ":      Added task " + task.to_string() + " to local task list at "
                       + str(self.agv.env.now))
-            self.agv.comm.sql_write(self.agv.kb['local_task_list_R' + str(self.agv.ID)], task)
+            if task.message == 'award':
+                self.insert_task(task)
+            else:
+                self.agv.comm.sql_write(self.agv.kb['local_task_list_R' + str(self.agv.ID)], task)
+            self.agv.comm.sql_notify(self.agv.kb['events'], 'task_collected', task)
+
+    def get_bid(self, task):
+        # A robot with a full local task list does not bid, a task that does not fit on the battery costs inf
+        local_tasks = self.agv.comm.sql_read(self.agv.kb['local_task_list_R' + str(self.agv.ID)])
+        if len(local_tasks) >= self.agv.max_tasks_in_task_list:
+            return Bid(self.agv.ID, task.order_number)
+        _, cost = self.get_insertion(task, local_tasks)
+        return Bid(self.agv.ID, task.order_number, cost)
+
+    def get_task_executing(self):
+        # A task taken from the local task list is executing, also before the main process resumes with it
+        if self.agv.task_executing is None and self.agv.task_request is not None and self.agv.task_request.triggered:
+            return self.agv.task_request.value
+        return self.agv.task_executing
+
+    def get_insertion(self, task, local_tasks):
+        """
+            Input:
+                - Announced task
+                - Tasks in the local task list
+            Output:
+                - Position in the local task list with the lowest cost, None if the task does not fit on the battery
+                - Cost, (1 - epsilon) * extra travel time + epsilon * time until the local task list is done
+        """
+
+        # Route of the agv, from where it is over the task it executes and its local task list
+        task_executing = self.get_task_executing()
+        route_tasks = [None] + ([task_executing] if task_executing is not None else []) + list(local_tasks)
+        stops = [self.agv.robot_node] + [route_task.pos_A for route_task in route_tasks[1:]]
+        stop_times = [0] + [self.get_stop_time(route_task) for route_task in route_tasks[1:]]
+        fixed_stops = len(stops) - len(local_tasks)
+        travel_times = self.agv.kb['graph'].cost_matrix(stops + [task.pos_A], stops + [task.pos_A],
+                                                        self.agv.robot_speed)
+        legs = [travel_times[i, i + 1] for i in range(len(stops) - 1)]
+        new = len(stops)
+        route_time = sum(legs) + sum(stop_times)
+
+        # The task is not inserted before the task being executed or a charging task, after which the battery is full
+        charging_stops = [i for i, route_task in enumerate(route_tasks)
+                          if route_task is not None and route_task.order_number == '000']
+        first = max([fixed_stops] + [i + 1 for i in charging_stops])
+        start = charging_stops[-1] if charging_stops else 0
+        battery_status = 100 if charging_stops else self.agv.battery_status
+
+        # Cheapest insertion after stop i - 1
+        best_position, best_cost = None, float('inf')
+        for i in range(first, len(stops) + 1):
+            route = list(range(len(stops)))
+            route.insert(i, new)
+            if not self.fits_on_battery(battery_status, route[start:], travel_times, stops + [task.pos_A]):
+                continue
+            extra_time = travel_times[i - 1, new] + self.agv.task_execution_time
+            if i < len(stops):
+                extra_time += travel_times[new, i] - travel_times[i - 1, i]
+            cost = (1 - self.agv.epsilon) * extra_time + self.agv.epsilon * (route_time + extra_time)
+            if cost < best_cost:
+                best_position, best_cost = i - fixed_stops, cost
+        return best_position, best_cost
+
+    def fits_on_battery(self, battery_status, route, travel_times, locations):
+        """
+            Input:
+                - Battery status at the start of the route
+                - Route, indices of the stops in the travel time matrix
+                - Travel time matrix between the stops
+                - Node of every stop
+            Output:
+                - True when the agv can reach a charger after every stop, the agv goes charging after the task
+                  during which its battery drops below the threshold
+        """
+
+        # A full battery cannot do better for a single task, a stop without a reachable charger only counts the
+        # travel to it
+        if battery_status >= 100 and len(route) <= 2:
+            return True
+        travel_time = 0
+        for previous_stop, stop in zip(route, route[1:]):
+            travel_time += travel_times[previous_stop, stop]
+            charger_time = self.agv.kb['charger_field'].distance(locations[stop]) / self.agv.robot_speed
+            if charger_time == float('inf'):
+                charger_time = 0
+            if self.agv.resource_management.resource_consumption(travel_time + charger_time) > battery_status:
+                return False
+        return True
+
+    def get_stop_time(self, task):
+        # Charging tasks take the time to charge fully
+        if task.order_number == '000':
+            return (100 - self.agv.battery_status) / self.agv.resource_management.charging_factor
+        return self.agv.task_execution_time
+
+    def insert_task(self, task):
+        local_task_list = self.agv.kb['local_task_list_R' + str(self.agv.ID)]
+        local_tasks = list(self.agv.comm.sql_read(local_task_list))
+        position, _ = self.get_insertion(task, local_tasks)
+
+        # The route changed since the bid and the task does not fit anymore, it is auctioned again
+        if position is None:
+            task.message = None
+            self.agv.comm.sql_write(self.agv.kb['global_task_list'], task)
+            self.agv.comm.sql_notify(self.agv.kb['events'], 'task_arrival', task)
+            return
+        if position >= len(local_tasks):
+            self.agv.comm.sql_write(local_task_list, task)
+            return
+
+        # Delete local task list
+        for _ in range(len(local_tasks)):
+            local_task_list.get()
+
+        # Put the new task sequence in local task list
+        for local_task in local_tasks[:position] + [task] + local_tasks[position:]:
+            self.agv.comm.sql_write(local_task_list, local_task)
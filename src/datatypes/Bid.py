@@ -0,0 +1,14 @@
+class Bid:
+    """
+            A class containing the Bid representation, the answer of a robot to an announced task
+    """
+
+    __slots__ = ('robot', 'order_number', 'cost')
+
+    def __init__(self, robot, order_number, cost=float('inf')):
+        self.robot = robot  # ID of the bidding robot
+        self.order_number = order_number  # Order number of the announced task
+        self.cost = cost  # Marginal cost of the task for the robot, inf when the robot cannot take it
+
+    def to_string(self):
+        return '[R' + str(self.robot) + ", " + str(self.order_number) + ", " + str(self.cost) + ']'
@@ -0,0 +1,28 @@
+import math
+
+
+class Motion:
+    """
+            A class containing the representation of a robot traversing one edge at constant speed
+    """
+
+    def __init__(self, start_time, start_location, end_location, speed):
+        self.start_time = start_time
+        self.start_location = start_location
+        self.end_location = end_location
+        self.speed = speed
+        self.heading_direction = math.atan2((end_location[1] - start_location[1]),
+                                            (end_location[0] - start_location[0]))
+        self.travel_time = math.sqrt(math.pow(end_location[0] - start_location[0], 2) +
+                                     math.pow(end_location[1] - start_location[1], 2)) / speed
+
+    def location_at(self, time):
+        # Position from edge start time, speed and heading, clipped to the edge
+        elapsed_time = min(max(time - self.start_time, 0), self.travel_time)
+        travelled_distance = self.speed * elapsed_time
+        return (round(self.start_location[0] + travelled_distance * math.cos(self.heading_direction), 2),
+                round(self.start_location[1] + travelled_distance * math.sin(self.heading_direction), 2))
+
+    def to_string(self):
+        return '[' + str(self.start_time) + ", " + str(self.start_location) + ", " + str(self.end_location) + ", " + \
+               str(self.speed) + ']'
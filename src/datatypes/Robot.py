@@ -3,9 +3,12 @@ class Robot:
             A class containing the Robot representation
     """
 
+    __slots__ = ('ID', 'robot_location', 'robot_node', 'status', 'battery_status', 'travelled_time', 'charged_time',
+                 'heading_direction', 'task_executing', 'path', 'congestions', 'total_path', 'motion')
+
     def __init__(self, id_number, robot_location, robot_node, heading_direction=0, path=None, status='IDLE',
                  battery_status=100,
-                 travelled_time=0, charged_time=0, congestions=0, task_executing=None, total_path=None):
+                 travelled_time=0, charged_time=0, congestions=0, task_executing=None, total_path=None, motion=None):
 
         self.ID = id_number
         self.robot_location = robot_location
@@ -19,8 +22,21 @@ class Robot:
         self.path = path
         self.congestions = congestions
         self.total_path = total_path
+        self.motion = motion
+
+    def copy(self):
+        return Robot(self.ID, self.robot_location, self.robot_node, self.heading_direction, self.path, self.status,
+                     self.battery_status, self.travelled_time, self.charged_time, self.congestions,
+                     self.task_executing, self.total_path, self.motion)
+
+    def location_at(self, time):
+        # Robots moving in event-driven mode only store the edge they are traversing
+        if self.motion is None:
+            return self.robot_location
+        return self.motion.location_at(time)
 
-    def to_log(self):
+    def to_log(self, time=None):
+        robot_location = self.robot_location if time is None else self.location_at(time)
         if self.path:
             path_string = "{"
             for node in self.path:
@@ -29,7 +45,7 @@ class Robot:
             path_string += "}"
         else:
             path_string = "{}"
-        return str(self.ID) + ";" + str(self.robot_location[0]) + ";" + str(self.robot_location[1]) + ";" + str(
+        return str(self.ID) + ";" + str(robot_location[0]) + ";" + str(robot_location[1]) + ";" + str(
             self.status) + ";" + str(self.battery_status) \
                + ";" + str(self.heading_direction) + ";" + path_string + ";" + str(self.travelled_time) \
                + ";" + str(self.charged_time) + ";" + str(self.congestions)
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class SimulationResult:
+    """
+            A class containing the summary of a simulation run, totals and per robot counters (index 0 is robot 1)
+    """
+
+    __slots__ = ('simulation_time', 'travel_cost_per_robot', 'charging_cost_per_robot', 'congestions_per_robot',
+                 'tasks_done_per_robot', 'idle_time_per_robot', 'decision_times',
+                 'auction_messages', 'auction_latencies', 'lead_times')
+
+    def __init__(self, simulation_time, travel_cost_per_robot, charging_cost_per_robot, congestions_per_robot,
+                 tasks_done_per_robot, idle_time_per_robot, decision_times=None,
+                 auction_messages=None, auction_latencies=None, lead_times=None):
+        self.simulation_time = simulation_time
+        self.travel_cost_per_robot = travel_cost_per_robot
+        self.charging_cost_per_robot = charging_cost_per_robot
+        self.congestions_per_robot = congestions_per_robot
+        self.tasks_done_per_robot = tasks_done_per_robot
+        self.idle_time_per_robot = idle_time_per_robot
+        self.decision_times = np.zeros(0) if decision_times is None else decision_times  # Seconds per decision
+        self.auction_messages = np.zeros(0, dtype=int) if auction_messages is None else auction_messages
+        self.auction_latencies = np.zeros(0) if auction_latencies is None else auction_latencies  # Seconds
+        self.lead_times = np.zeros(0) if lead_times is None else lead_times  # Seconds from arrival until done
+
+    @property
+    def number_of_robots(self):
+        return len(self.travel_cost_per_robot)
+
+    @property
+    def travel_cost(self):
+        return float(self.travel_cost_per_robot.sum())
+
+    @property
+    def charging_cost(self):
+        return float(self.charging_cost_per_robot.sum())
+
+    @property
+    def congestions(self):
+        # A congestion is counted by both robots involved
+        return float(self.congestions_per_robot.sum()) / 2
+
+    @property
+    def tasks_done(self):
+        return int(self.tasks_done_per_robot.sum())
+
+    @property
+    def idle_time(self):
+        return float(self.idle_time_per_robot.sum())
+
+    @property
+    def lead_time(self):
+        # Mean time from the arrival of a task until it is done
+        return float(self.lead_times.mean()) if len(self.lead_times) else 0.0
+
+    @property
+    def decision_time(self):
+        # Wall-clock time the fleet manager spent on its decisions
+        return float(self.decision_times.sum())
+
+    @property
+    def messages(self):
+        # Messages sent in the auctions of a contract net fleet manager
+        return int(self.auction_messages.sum())
+
+    @property
+    def auction_latency(self):
+        # Mean wall-clock time from announcement to award
+        return float(self.auction_latencies.mean()) if len(self.auction_latencies) else 0.0
+
+    def to_string(self):
+        return '[' + str(self.simulation_time) + ", " + str(self.travel_cost) + ", " + str(self.charging_cost) + \
+               ", " + str(self.congestions) + ", " + str(self.tasks_done) + ", " + str(self.idle_time) + ']'
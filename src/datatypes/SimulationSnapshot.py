@@ -0,0 +1,34 @@
+import pickle
+
+
+class SimulationSnapshot:
+    """
+            A class containing the state of a running simulation at one moment: the clock, the tasks in the global
+            task list, the state and tasks of every robot, the state of the fleet manager, the counters of the run and
+            the orders the MES did not spawn yet
+    """
+
+    __slots__ = ('time', 'number_of_robots', 'motion_mode', 'fleet_backend', 'fleet_manager', 'global_tasks',
+                 'robots', 'fleet_manager_state', 'metrics', 'orders')
+
+    def __init__(self, time, number_of_robots, motion_mode, fleet_backend, fleet_manager, global_tasks, robots,
+                 fleet_manager_state, metrics, orders):
+        self.time = time
+        self.number_of_robots = number_of_robots
+        self.motion_mode = motion_mode
+        self.fleet_backend = fleet_backend
+        self.fleet_manager = fleet_manager
+        self.global_tasks = global_tasks  # Tasks in the order they are served
+        self.robots = robots  # State per robot, sorted by ID
+        self.fleet_manager_state = fleet_manager_state  # State of the fleet manager, None when it has none
+        self.metrics = metrics  # Counters per robot of the MetricsCollector
+        self.orders = orders  # Order source of the orders that are not spawned yet
+
+    def save(self, filename):
+        with open(filename, 'wb') as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(filename):
+        with open(filename, 'rb') as file:
+            return pickle.load(file)
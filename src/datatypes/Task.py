@@ -3,6 +3,8 @@ class Task:
             A class containing the Task representation
     """
 
+    __slots__ = ('order_number', 'pos_A', 'priority', 'robot', 'picked', 'message')
+
     def __init__(self, order_number, pos_a, priority=0):
         self.order_number = order_number
         self.pos_A = pos_a
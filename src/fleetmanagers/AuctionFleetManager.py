@@ -0,0 +1,137 @@
+import copy
+import time
+
+from src.fleetmanagers.FleetManager import FleetManager
+from src.utils.utils import *
+
+
+class AuctionFleetManager(FleetManager):
+    """
+            A class containing a Fleetmanager that allocates tasks with a contract net. Open tasks are announced to
+            the robots, each robot bids the marginal cost of inserting the task in its own local task list and the
+            task is awarded to the lowest bid. The bids are computed by the robots, the auctioneer only compares
+            them. A bid stands until its robot changes, so a task is only announced again to the robots that changed
+            since they bid on it. Tasks no robot can take stay in the global task list, idle robots that cannot take
+            any of them are sent to charge by the auctioneer.
+    """
+
+    # Simulated seconds the auctioneer waits for the bids of robots that do not answer
+    bid_timeout = 1
+
+    def __init__(self, env, kb, agv_fm_comm, agv_to_fm_comm, print_):
+
+        # Standing bids by robot ID and order number, with the state of the robot they were made in
+        self.bids = dict()
+        self.bid_states = dict()
+
+        super().__init__(env, kb, agv_fm_comm, agv_to_fm_comm, print_)
+
+    def main(self):
+
+        self.my_print("\n")
+        while True:
+
+            # Notifications during the auctions are not missed
+            events = self.comm.sql_wait(self.kb['events'], ['task_arrival', 'robot_status', 'task_done'])
+
+            # Auction the open tasks in the order they are served, a task no robot can take yet does not block the
+            # tasks after it
+            winners = set()
+            unawarded_tasks = []
+            for task in self.get_tasks_to_assign():
+                winner = yield from self.auction(task)
+                if winner is None:
+                    unawarded_tasks.append(task)
+                else:
+                    winners.add(winner)
+
+            # Idle robots that cannot take any of the remaining tasks on their battery go charging
+            if unawarded_tasks:
+                idle_robots = [robot for robot in self.get_idle_robots() if robot.ID not in winners
+                               and not self.kb['local_task_list_R' + str(robot.ID)].items]
+                feasible = self.get_feasible(idle_robots, unawarded_tasks) if idle_robots else []
+                self.send_to_charge([robot for i, robot in enumerate(idle_robots) if not feasible[i].any()])
+
+            # Wait for a new task, a robot changing status or a robot finishing a task
+            yield events
+
+    def auction(self, task):
+        """
+            Input:
+                - Task to auction
+            Output:
+                - ID of the robot the task is awarded to, None when no robot can take it
+        """
+
+        # Announce the task to the robots without a standing bid on it
+        start = time.perf_counter()
+        self.update_bids()
+        bidders = [ID for ID in self.agv_fm_comm if task.order_number not in self.bids[ID]]
+        task.message = 'announce'
+        for ID in bidders:
+            self.comm.tcp_write(self.agv_fm_comm[ID], task)
+        messages = len(bidders)
+        decision_time = time.perf_counter() - start
+
+        # Collect the bids until every robot announced to answered or the bidding time is over
+        answers = 0
+        deadline = self.env.timeout(self.bid_timeout)
+        while answers < len(bidders):
+            bid = self.agv_to_fm_comm.get(lambda message: message.order_number == task.order_number)
+            yield bid | deadline
+            if not bid.triggered:
+                bid.cancel()
+                break
+            self.bids[bid.value.robot][task.order_number] = bid.value
+            answers += 1
+        messages += answers
+
+        # Award the task to the lowest bid, ties go to the lowest robot ID
+        award_start = time.perf_counter()
+        bids = [robot_bids[task.order_number] for robot_bids in self.bids.values() if task.order_number in robot_bids]
+        bids = [bid for bid in bids if bid.cost < float('inf')]
+        winner = None
+        if bids:
+            winner = min(bids, key=lambda bid: (bid.cost, bid.robot))
+            task.message = 'award'
+            self.comm.tcp_write(self.agv_fm_comm[winner.robot], task)
+            self.comm.sql_remove_task(self.kb['global_task_list'], task.order_number)
+            messages += 1
+            self.my_print("Fleet manager:           Awarded task " + task.to_string() + " to AGV " +
+                          str(winner.robot) + " at " + str(self.env.now))
+
+            # The task is closed and the bids of the winner lapse, its route changes
+            for robot_bids in self.bids.values():
+                robot_bids.pop(task.order_number, None)
+            self.bids[winner.robot] = dict()
+            self.bid_states[winner.robot] = None
+        else:
+            task.message = None
+        end = time.perf_counter()
+
+        # Only the announcement and the comparison of the bids are computed by the auctioneer
+        self.kb['metrics'].decision(decision_time + end - award_start)
+        self.kb['metrics'].auction(messages, end - start)
+        return winner.robot if winner else None
+
+    def update_bids(self):
+        # The standing bids of a robot lapse when what it bid from changed
+        for robot in self.comm.sql_read(self.kb['global_robot_list']):
+            state = self.get_bid_state(robot)
+            if self.bid_states.get(robot.ID) != state:
+                self.bid_states[robot.ID] = state
+                self.bids[robot.ID] = dict()
+
+    def get_bid_state(self, robot):
+        # A bid depends on where the robot is, its battery and the tasks it executes and has planned
+        local_tasks = self.comm.sql_read(self.kb['local_task_list_R' + str(robot.ID)])
+        return (robot.status, robot.robot_node, robot.battery_status,
+                None if robot.task_executing is None else robot.task_executing.order_number,
+                tuple(task.order_number for task in local_tasks))
+
+    def snapshot(self):
+        # A restored run asks the same robots for bids as the run it was taken from
+        return copy.deepcopy((self.bids, self.bid_states))
+
+    def restore(self, state):
+        self.bids, self.bid_states = copy.deepcopy(state)
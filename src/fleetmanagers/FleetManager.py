@@ -1,4 +1,8 @@
+import time
+
 from src.agv.AGV_Comm import Comm
+from src.agv.AGV_ResourceManagement import ResourceManagement
+from src.datatypes.Task import Task
 from src.utils.utils import *
 
 
@@ -23,6 +27,9 @@ class FleetManager:
         self.agv_to_fm_comm = agv_to_fm_comm
         self.comm = Comm(self.ip)
 
+        # Tasks pushed to a robot that did not start them yet
+        self.pending_tasks = dict()
+
         # Process
         self.main = self.env.process(self.main())
 
@@ -34,41 +41,110 @@ class FleetManager:
         self.my_print("\n")
         while True:
 
-            # Timeout
-            yield self.env.timeout(1)  # Sample time
-
-            # Define current status
+            # Define current status, a restored simulation can start with tasks to assign
             idle_robots = self.get_idle_robots()
-            tasks_to_assign = self.get_tasks_to_assign()
-
-            # If there are idle robots and tasks to execute, assign closest task
-            if not len(tasks_to_assign) == 0 and not len(idle_robots) == 0:
-                # Pick first task
-                task = tasks_to_assign[0]
-
-                # Get closest robot
-                robot = self.get_closest_robot(task, idle_robots)
-
-                # Assign task to agv task lists
-                task.message = 'push'
-                self.comm.tcp_write(self.agv_fm_comm[robot.ID], task)
-
-                # Remove task from global task list
-                self.comm.sql_remove_task(self.kb['global_task_list'], task.order_number)
+            task = self.get_next_task()
+
+            # As long as there are idle robots and tasks to execute, assign the first task to the closest robot
+            if task is not None and not len(idle_robots) == 0:
+                start = time.perf_counter()
+                while task is not None and not len(idle_robots) == 0:
+
+                    # Get closest robot that can do the task on its battery
+                    feasible = self.get_feasible(idle_robots, [task])[:, 0]
+                    if not feasible.any():
+                        break
+                    robot = self.get_closest_robot(task, [idle_robots[i] for i in np.flatnonzero(feasible)])
+
+                    # Assign task to agv task lists
+                    self.assign_task(robot, task)
+                    idle_robots = [idle_robot for idle_robot in idle_robots if idle_robot.ID != robot.ID]
+                    task = self.get_next_task()
+
+                # Idle robots that cannot do the first task go charging
+                if task is not None:
+                    self.send_to_charge(idle_robots)
+                self.kb['metrics'].decision(time.perf_counter() - start)
+
+            # Wait for a new task or a robot changing status
+            yield self.comm.sql_wait(self.kb['events'], ['task_arrival', 'robot_status'])
+
+    def assign_task(self, robot, task):
+
+        # Assign task to agv task lists
+        task.message = 'push'
+        self.comm.tcp_write(self.agv_fm_comm[robot.ID], task)
+        self.pending_tasks[robot.ID] = task
+
+        # Remove task from global task list
+        self.comm.sql_remove_task(self.kb['global_task_list'], task.order_number)
+
+    def send_to_charge(self, robots):
+        # A charging task to the closest charge location, robots with a full battery do not need it
+        for robot in robots:
+            if robot.battery_status < 100:
+                self.assign_task(robot, Task('000', self.kb['charger_field'].nearest(robot.robot_node), 0))
+
+    def get_feasible(self, robots, tasks, locations=None, battery_status=None):
+        """
+            Input:
+                - Robots
+                - Tasks
+                - Nodes the robots leave from, where they are by default
+                - Battery status of the robots when they leave, their current battery status by default
+            Output:
+                - Matrix with a row per robot and a column per task, True when the robot can drive to the task and
+                  on to the closest charge location of the task on its battery
+        """
+        if locations is None:
+            locations = self.get_robot_nodes(robots)
+        if battery_status is None:
+            battery_status = self.get_robot_battery_status(robots)
+
+        # Travel time to the task and from there to a charger, tasks without a reachable charger only count the first
+        task_locations = [task.pos_A for task in tasks]
+        travel_times = self.kb['graph'].cost_matrix(locations, task_locations, self.kb['robot_speed'])
+        charger_times = self.kb['charger_field'].distances_of(task_locations) / self.kb['robot_speed']
+        charger_times = np.where(np.isfinite(charger_times), charger_times, 0)
+
+        # A robot with a full battery is never held back, charging would not help it
+        battery_status = np.array(battery_status, dtype=float)[:, None]
+        consumption = ResourceManagement.resource_consumption(travel_times + charger_times)
+        return (consumption <= battery_status) | (battery_status >= 100)
 
     def get_idle_robots(self):
-        robots = np.copy(self.comm.sql_read(self.kb['global_robot_list']))
-        robots = list(filter(lambda robot: robot.status == 'IDLE', robots))
-        robots = sorted(robots, key=lambda robot_: robot_.ID)
+        # A robot is not idle while a task pushed to it is not started yet (the agv sets task.robot on start)
+        self.pending_tasks = {ID: task for ID, task in self.pending_tasks.items() if task.robot is None}
+        robots = self.comm.sql_read_idle_robots(self.kb['global_robot_list'])
+        robots = [robot for robot in robots if robot.ID not in self.pending_tasks]
         return robots
 
     def get_tasks_to_assign(self):
-        tasks = np.copy(self.comm.sql_read(self.kb['global_task_list']))
+        tasks = list(self.comm.sql_read(self.kb['global_task_list']))
         return tasks
 
+    def get_next_task(self):
+        # Task with the highest priority that arrived first
+        return self.comm.sql_read_first_task(self.kb['global_task_list'])
+
     def get_closest_robot(self, task, idle_robots):
-        return min(idle_robots,
-                   key=lambda robot: calculate_astar_distance(self.kb['graph'], robot.robot_node, task.pos_A))
+        distances = self.kb['graph'].cost_matrix(self.get_robot_nodes(idle_robots), [task.pos_A])
+        return idle_robots[int(np.argmin(distances[:, 0]))]
+
+    def get_robot_nodes(self, robots):
+        # Read for all robots at once, the fleet arrays gather it from a column
+        return self.comm.sql_read_robot_attribute(self.kb['global_robot_list'], robots, 'robot_node')
+
+    def get_robot_battery_status(self, robots):
+        return self.comm.sql_read_robot_attribute(self.kb['global_robot_list'], robots, 'battery_status')
+
+    def snapshot(self):
+        # State the fleet manager plans with beyond the knowledge base, for a snapshot of the simulation
+        return None
+
+    def restore(self, state):
+        # Continue from the state of a snapshot
+        pass
 
     def my_print(self, msg):
         if self.print:
@@ -0,0 +1,61 @@
+import time
+
+from src.fleetmanagers.FleetManager import FleetManager
+from src.solvers.hungarian_solver import linear_sum_assignment
+from src.utils.utils import *
+
+
+class HungarianFleetManager(FleetManager):
+    """
+            A class containing a Fleetmanager that assigns all idle robots and open tasks at once. Every decision
+            solves the minimum cost assignment on the travel time matrix, a task costs an extra priority_cost seconds
+            per priority level so the most urgent tasks are served first when there are more tasks than robots. A
+            robot is not assigned a task it cannot do on its battery.
+    """
+
+    # Seconds of travel time that one priority level is worth
+    priority_cost = 60
+
+    def main(self):
+
+        self.my_print("\n")
+        while True:
+
+            # Define current status, a restored simulation can start with tasks to assign
+            idle_robots = self.get_idle_robots()
+            tasks = self.get_tasks_to_assign()
+
+            # Assign the optimal task to every idle robot in one decision
+            if tasks and idle_robots:
+                start = time.perf_counter()
+                feasible = self.get_feasible(idle_robots, tasks)
+                assignment = self.get_assignment(idle_robots, tasks, feasible)
+                for robot, task in assignment:
+                    self.assign_task(robot, task)
+
+                # Idle robots that cannot do any open task go charging
+                self.send_to_charge([robot for i, robot in enumerate(idle_robots) if not feasible[i].any()])
+                decision_time = time.perf_counter() - start
+                self.kb['metrics'].decision(decision_time)
+                self.my_print("Fleet manager:           Assigned " + str(len(assignment)) +
+                              " tasks in " + str(round(decision_time * 1000, 3)) + " ms at " + str(self.env.now))
+
+            # Wait for a new task or a robot changing status
+            yield self.comm.sql_wait(self.kb['events'], ['task_arrival', 'robot_status'])
+
+    def get_assignment(self, idle_robots, tasks, feasible):
+        """
+            Input:
+                - Idle robots
+                - Open tasks
+                - Matrix of the pairs a robot can do on its battery, see get_feasible
+            Output:
+                - List of (robot, task) pairs with minimal total travel time and priority cost, without the pairs
+                  a robot cannot do on its battery
+        """
+        travel_times = self.kb['graph'].cost_matrix(self.get_robot_nodes(idle_robots),
+                                                    [task.pos_A for task in tasks], self.kb['robot_speed'])
+        priorities = np.array([task.priority for task in tasks], dtype=float)
+        costs = np.where(feasible, travel_times + self.priority_cost * priorities, np.inf)
+        robot_indices, task_indices = linear_sum_assignment(costs)
+        return [(idle_robots[i], tasks[j]) for i, j in zip(robot_indices.tolist(), task_indices.tolist())]
@@ -0,0 +1,100 @@
+import time
+
+from src.agv.AGV_ResourceManagement import ResourceManagement
+from src.fleetmanagers.FleetManager import FleetManager
+from src.utils.utils import *
+
+
+class LookaheadFleetManager(FleetManager):
+    """
+            A class containing a Fleetmanager that also looks at robots about to finish their task. The first task
+            in the global task list goes to the robot that can be there first, an idle robot by its travel time or a
+            busy robot by the estimated time to finish its task plus the travel time from there. A busy robot gets
+            at most one task pushed ahead, which it starts once its current task is done. Robots only get tasks they
+            can do on their battery.
+    """
+
+    def main(self):
+
+        self.my_print("\n")
+        while True:
+
+            # Define current status, a restored simulation can start with tasks to assign
+            idle_robots = self.get_idle_robots()
+            busy_robots = self.get_busy_robots()
+            task = self.get_next_task()
+
+            # As long as there are robots and tasks to execute, assign the first task to the robot there first
+            if task is not None and (idle_robots or busy_robots):
+                start = time.perf_counter()
+                finish_times = {robot.ID: self.get_finish_time(robot) for robot in busy_robots}
+                while task is not None and (idle_robots or busy_robots):
+
+                    # Get the robot that can be at the task first
+                    robot = self.get_first_robot(task, idle_robots, busy_robots, finish_times)
+                    if robot is None:
+                        break
+
+                    # Assign task to agv task lists, for a busy robot ahead of finishing its current task
+                    self.assign_task(robot, task)
+                    idle_robots = [idle_robot for idle_robot in idle_robots if idle_robot.ID != robot.ID]
+                    busy_robots = [busy_robot for busy_robot in busy_robots if busy_robot.ID != robot.ID]
+                    task = self.get_next_task()
+
+                # Idle robots that cannot do the first task go charging
+                if task is not None:
+                    self.send_to_charge(idle_robots)
+                self.kb['metrics'].decision(time.perf_counter() - start)
+
+            # Wait for a new task or a robot changing status
+            yield self.comm.sql_wait(self.kb['events'], ['task_arrival', 'robot_status'])
+
+    def get_busy_robots(self):
+        # Robots executing a task with nothing planned after it, robots going to charge are not taken
+        robots = self.comm.sql_read(self.kb['global_robot_list'])
+        return [robot for robot in robots if robot.status == 'BUSY' and robot.task_executing is not None
+                and robot.task_executing.order_number != '000' and robot.ID not in self.pending_tasks
+                and not self.kb['local_task_list_R' + str(robot.ID)].items and not self.agv_fm_comm[robot.ID].items]
+
+    def get_finish_time(self, robot):
+        """
+            Input:
+                - Busy robot
+            Output:
+                - Estimated seconds until the robot is done with its task, the rest of its path and the pick
+        """
+        location = robot.motion.location_at(self.env.now) if robot.motion is not None else robot.robot_location
+
+        # A robot at its task may already be picking, the full pick is an upper bound
+        return self.get_remaining_travel_time(robot, location) + self.kb['task_execution_time']
+
+    def get_remaining_travel_time(self, robot, location):
+        # Travel time to the next node of the path from the location, then along the path
+        graph = self.kb['graph']
+        speed = self.kb['robot_speed']
+        if robot.path:
+            return calculate_euclidean_distance(location, graph.nodes[robot.path[0]].pos) / speed + \
+                calculate_path_traveltime(graph, robot.path, speed)
+        return graph.cost_matrix([robot.robot_node], [robot.task_executing.pos_A], speed)[0, 0]
+
+    def get_battery_status_at_finish(self, robot):
+        # The battery is settled up to the published robot location, the start of the edge being traversed
+        travel_time = self.get_remaining_travel_time(robot, robot.robot_location)
+        return robot.battery_status - ResourceManagement.resource_consumption(travel_time)
+
+    def get_first_robot(self, task, idle_robots, busy_robots, finish_times):
+        # Idle robots leave from where they are, busy robots from their task once it is done, ties go to idle robots
+        robots = idle_robots + busy_robots
+        locations = self.get_robot_nodes(idle_robots) + \
+                    [robot.task_executing.pos_A for robot in busy_robots]
+        ready_times = np.array([0.0] * len(idle_robots) + [finish_times[robot.ID] for robot in busy_robots])
+        travel_times = self.kb['graph'].cost_matrix(locations, [task.pos_A], self.kb['robot_speed'])[:, 0]
+        arrival_times = ready_times + travel_times
+
+        # Only robots that can do the task on their battery, None if there is no such robot
+        battery_status = self.get_robot_battery_status(idle_robots) + \
+                         [self.get_battery_status_at_finish(robot) for robot in busy_robots]
+        feasible = self.get_feasible(robots, [task], locations, battery_status)[:, 0]
+        if not feasible.any():
+            return None
+        return robots[int(np.argmin(np.where(feasible, arrival_times, np.inf)))]
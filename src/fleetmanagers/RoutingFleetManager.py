@@ -0,0 +1,237 @@
+import copy
+import time
+
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from src.agv.AGV_ResourceManagement import ResourceManagement
+from src.fleetmanagers.FleetManager import FleetManager
+from src.utils.utils import *
+
+
+class RoutingFleetManager(FleetManager):
+    """
+            A class containing a Fleetmanager that plans the open tasks as a vehicle routing problem. Every decision
+            the tasks in the global task list and the tasks not started yet in the local task lists are routed over
+            the robots that can take tasks, each robot gets a sequence of at most max_tasks_in_task_list tasks in its
+            local task list. The previous routes warm start the solver, which stops after time_limit seconds. Routes
+            are cut before the first task after which the robot could not reach a charger on its battery.
+    """
+
+    # Solver parameters
+    time_limit = 0.1  # Seconds per decision
+    drop_penalty = 10000  # Seconds, divided by the priority, paid for every task left in the global task list
+    cost_scale = 100  # Travel times are rounded to 1 / cost_scale seconds
+
+    def __init__(self, env, kb, agv_fm_comm, agv_to_fm_comm, print_):
+
+        # Objective, epsilon weighs the longest route (makespan) against the total travel time
+        self.max_tasks_in_task_list = int(kb['max_tasks_in_task_list'])
+        self.epsilon = kb['epsilon']
+
+        # Routes of the previous decision by robot ID, lists of order numbers
+        self.routes = dict()
+
+        super().__init__(env, kb, agv_fm_comm, agv_to_fm_comm, print_)
+
+    def main(self):
+
+        self.my_print("\n")
+        while True:
+
+            # Define current status, a restored simulation can start with tasks to assign
+            robots = self.get_available_robots()
+            skipped_robots = self.get_skipped_robots()
+            tasks = self.get_tasks_to_assign() + [task for robot in robots for task in self.get_planned_tasks(robot)]
+
+            # Route all open tasks over the available robots
+            if tasks and robots:
+                start = time.perf_counter()
+                routes = self.get_routes(robots, tasks)
+                for robot, route in zip(robots, routes):
+                    self.assign_route(robot, route)
+
+                # Idle robots that cannot do any open task go charging
+                idle_robots = [robot for robot, route in zip(robots, routes) if robot.status == 'IDLE' and not route]
+                feasible = self.get_feasible(idle_robots, tasks) if idle_robots else []
+                self.send_to_charge([robot for i, robot in enumerate(idle_robots) if not feasible[i].any()])
+                decision_time = time.perf_counter() - start
+                self.kb['metrics'].decision(decision_time)
+                self.my_print("Fleet manager:           Routed " + str(len(tasks)) + " tasks in " +
+                              str(round(decision_time * 1000, 3)) + " ms at " + str(self.env.now))
+
+            # Wait for a new task or a robot changing status, robots skipped for their pushed tasks are routed again
+            # once they collected them
+            topics = ['task_arrival', 'robot_status']
+            if skipped_robots:
+                topics.append('task_collected')
+            yield self.comm.sql_wait(self.kb['events'], topics)
+
+    def get_available_robots(self):
+        # Robots going to charge keep their tasks, robots with pushed tasks not collected yet are skipped this time
+        robots = self.comm.sql_read(self.kb['global_robot_list'])
+        return [robot for robot in robots if robot.status in ('IDLE', 'BUSY') and not self.agv_fm_comm[robot.ID].items]
+
+    def get_skipped_robots(self):
+        robots = self.comm.sql_read(self.kb['global_robot_list'])
+        return [robot for robot in robots if robot.status in ('IDLE', 'BUSY') and self.agv_fm_comm[robot.ID].items]
+
+    def get_planned_tasks(self, robot):
+        # Tasks in the local task list that are not started yet, charging tasks stay where they are
+        local_task_list = self.kb['local_task_list_R' + str(robot.ID)]
+        return [task for task in self.comm.sql_read(local_task_list) if task.order_number != '000']
+
+    def get_routes(self, robots, tasks):
+        """
+            Input:
+                - Robots that can take tasks
+                - Open tasks
+            Output:
+                - List of tasks to execute in order per robot, tasks that do not fit stay unassigned
+        """
+
+        # Nodes are the robots (at the task they execute or where they are), a common end and the tasks
+        number_of_robots = len(robots)
+        start_locations = [robot.task_executing.pos_A if robot.task_executing else robot.robot_node
+                           for robot in robots]
+        locations = start_locations + [task.pos_A for task in tasks]
+        travel_times = self.kb['graph'].cost_matrix(locations, locations, self.kb['robot_speed'])
+        travel_times = np.round(travel_times * self.cost_scale).astype(np.int64)
+        travel_times = np.insert(travel_times, number_of_robots, 0, axis=0)  # Routes end anywhere
+        travel_times = np.insert(travel_times, number_of_robots, 0, axis=1).tolist()
+        end = number_of_robots
+
+        # Routing model
+        manager = pywrapcp.RoutingIndexManager(len(travel_times), number_of_robots, list(range(number_of_robots)),
+                                               [end] * number_of_robots)
+        routing = pywrapcp.RoutingModel(manager)
+
+        # Cost, (1 - epsilon) * total travel time + epsilon * longest route
+        travel_costs = (np.array(travel_times) * round((1 - self.epsilon) * 100)).tolist()
+        routing.SetArcCostEvaluatorOfAllVehicles(self.register_matrix(routing, manager, travel_costs))
+        routing.AddDimension(self.register_matrix(routing, manager, travel_times), 0, 2 ** 62, True, 'time')
+        routing.GetDimensionOrDie('time').SetGlobalSpanCostCoefficient(round(self.epsilon * 100))
+
+        # At most max_tasks_in_task_list tasks per robot
+        demands = [0] * (end + 1) + [1] * len(tasks)
+        if hasattr(routing, 'RegisterUnaryTransitVector'):
+            demand = routing.RegisterUnaryTransitVector(demands)
+        else:
+            demand = routing.RegisterUnaryTransitCallback(lambda index: demands[manager.IndexToNode(index)])
+        routing.AddDimensionWithVehicleCapacity(demand, 0, [self.max_tasks_in_task_list] * number_of_robots, True,
+                                                'tasks')
+
+        # A robot only starts with a task it can reach on its battery, so a route is never cut before its first task
+        # while the robot can take one of the tasks
+        start_battery_status = self.get_start_battery_status(robots, start_locations)
+        first_tasks = self.get_feasible(robots, tasks, start_locations, start_battery_status)
+        for vehicle in range(number_of_robots):
+            infeasible = [manager.NodeToIndex(end + 1 + i) for i in np.flatnonzero(~first_tasks[vehicle])]
+            routing.NextVar(routing.Start(vehicle)).RemoveValues(infeasible)
+
+        # Tasks may be left unassigned, urgent tasks at a higher cost
+        for i, task in enumerate(tasks):
+            penalty = self.drop_penalty * self.cost_scale * 100 / max(task.priority, 1)
+            routing.AddDisjunction([manager.NodeToIndex(end + 1 + i)], int(penalty))
+
+        # Solve, starting from the routes of the previous decision
+        parameters = pywrapcp.DefaultRoutingSearchParameters()
+        parameters.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+        parameters.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GREEDY_DESCENT
+        parameters.time_limit.FromMilliseconds(int(self.time_limit * 1000))
+        routing.CloseModelWithParameters(parameters)
+        initial_routes = [[manager.NodeToIndex(node) for node in route]
+                          for route in self.get_initial_routes(robots, tasks, end)]
+        initial_solution = routing.ReadAssignmentFromRoutes(initial_routes, True)
+        if initial_solution is not None:
+            solution = routing.SolveFromAssignmentWithParameters(initial_solution, parameters)
+        else:
+            solution = routing.SolveWithParameters(parameters)
+
+        # Routes
+        routes = [[] for _ in robots]
+        if solution is None:
+            return routes
+        for vehicle in range(number_of_robots):
+            index = solution.Value(routing.NextVar(routing.Start(vehicle)))
+            while not routing.IsEnd(index):
+                routes[vehicle].append(tasks[manager.IndexToNode(index) - end - 1])
+                index = solution.Value(routing.NextVar(index))
+            routes[vehicle] = self.cut_route(robots[vehicle], start_locations[vehicle], routes[vehicle])
+        self.routes = {robot.ID: [task.order_number for task in route] for robot, route in zip(robots, routes)}
+        return routes
+
+    def cut_route(self, robot, start_location, route):
+        """
+            Input:
+                - Robot
+                - Node the route starts from, the task the robot executes or where it is
+                - Tasks in order
+            Output:
+                - Tasks up to the first one after which the robot could not reach a charger on its battery, the agv
+                  goes charging after the task during which its battery drops below the threshold
+        """
+        if not route:
+            return route
+        speed = self.kb['robot_speed']
+
+        # Battery left at the start of the route
+        battery_status = self.get_start_battery_status([robot], [start_location])[0]
+
+        # Travel time up to every task and from there to a charger
+        locations = [start_location] + [task.pos_A for task in route]
+        travel_times = np.diag(self.kb['graph'].cost_matrix(locations[:-1], locations[1:], speed))
+        charger_times = self.kb['charger_field'].distances_of(locations[1:]) / speed
+        charger_times = np.where(np.isfinite(charger_times), charger_times, 0)
+        consumption = ResourceManagement.resource_consumption(np.cumsum(travel_times) + charger_times)
+
+        # A full battery cannot do better for the first task
+        fits = consumption <= battery_status
+        fits[0] |= battery_status >= 100
+        return route[:len(route) if fits.all() else int(np.argmin(fits))]
+
+    def get_start_battery_status(self, robots, start_locations):
+        # Battery left when the robots reach the node their route starts from
+        travel_times = np.diag(self.kb['graph'].cost_matrix([robot.robot_node for robot in robots], start_locations,
+                                                            self.kb['robot_speed']))
+        return [robot.battery_status - ResourceManagement.resource_consumption(travel_time)
+                for robot, travel_time in zip(robots, travel_times)]
+
+    @staticmethod
+    def register_matrix(routing, manager, matrix):
+        # Matrices are evaluated inside the solver where OR-Tools supports it, else through a callback
+        if hasattr(routing, 'RegisterTransitMatrix'):
+            return routing.RegisterTransitMatrix(matrix)
+        return routing.RegisterTransitCallback(
+            lambda from_index, to_index: matrix[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)])
+
+    def snapshot(self):
+        # The routes warm start the next decision, a restored run without them plans differently
+        return copy.deepcopy(self.routes)
+
+    def restore(self, state):
+        self.routes = copy.deepcopy(state)
+
+    def get_initial_routes(self, robots, tasks, end):
+        # Previous routes of the robots without the tasks that are started or done
+        nodes = {task.order_number: end + 1 + i for i, task in enumerate(tasks)}
+        return [[nodes[order_number] for order_number in self.routes.get(robot.ID, []) if order_number in nodes]
+                [:self.max_tasks_in_task_list] for robot in robots]
+
+    def assign_route(self, robot, route):
+
+        # Nothing changes when the planned tasks are already in this order
+        planned_tasks = self.get_planned_tasks(robot)
+        if [task.order_number for task in planned_tasks] == [task.order_number for task in route]:
+            return
+
+        # Take back the planned tasks, the ones not routed again return to the global task list
+        routed = {order_number for order_numbers in self.routes.values() for order_number in order_numbers}
+        for task in planned_tasks:
+            self.comm.sql_remove_task(self.kb['local_task_list_R' + str(robot.ID)], task.order_number)
+            if task.order_number not in routed:
+                task.message = None
+                self.comm.sql_write(self.kb['global_task_list'], task)
+
+        # Assign task to agv task lists in order
+        for task in route:
+            self.assign_task(robot, task)
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+class ChargerField:
+    """
+            A class containing the distance from every node to its closest charge location and that location,
+            computed once with one search from all charge locations over the reversed layout graph, so finding a
+            charger is a lookup
+    """
+
+    def __init__(self, graph, charge_locations):
+
+        # Layout
+        self.graph = graph
+        self.charge_locations = charge_locations
+
+        # Field over the node ids
+        self.distances, self.nearest_ids = graph.distances_to(charge_locations)
+
+    def distance(self, node):
+        # Distance in meters from the node to its closest charge location
+        return self.distances[self.graph.node_index[node]]
+
+    def nearest(self, node):
+        # Closest charge location of the node, None if no charge location is reachable
+        nearest_id = self.nearest_ids[self.graph.node_index[node]]
+        return self.graph.node_names[nearest_id] if nearest_id >= 0 else None
+
+    def distances_of(self, nodes):
+        # Distances of a list of nodes at once
+        return self.distances[np.array([self.graph.node_index[node] for node in nodes], dtype=np.int64)]
@@ -0,0 +1,370 @@
+import math
+from operator import attrgetter
+
+import numpy as np
+
+from src.datatypes.Motion import Motion
+from src.datatypes.Robot import Robot
+
+# Status codes of the status column
+STATUSES = ('IDLE', 'BUSY', 'EMPTY', 'CHARGING')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Columns of the numeric Robot attributes
+ROBOT_COLUMNS = {'battery_status': 'battery', 'travelled_time': 'travelled_time', 'charged_time': 'charged_time',
+                 'heading_direction': 'heading', 'congestions': 'congestions'}
+
+# Bits of the integers column, set when the attribute holds a Python int so it is read and logged as one
+INTEGER_BITS = {'x': 1, 'y': 2, 'battery_status': 4, 'heading_direction': 8, 'travelled_time': 16, 'charged_time': 32}
+ALL_INTEGER_BITS = sum(INTEGER_BITS.values())
+
+
+def set_integer(fleet, row, bit, value):
+    if isinstance(value, int):
+        fleet.integers[row] |= bit
+    else:
+        fleet.integers[row] &= ALL_INTEGER_BITS ^ bit
+
+
+def column(name, convert, bit=0):
+    # Robot attribute read from and written to one column of the fleet arrays, ints stay ints when it has a bit
+    def getter(view):
+        value = getattr(view.fleet, name)[view.row]
+        return int(value) if view.fleet.integers[view.row] & bit else convert(value)
+
+    def setter(view, value):
+        getattr(view.fleet, name)[view.row] = value
+        if bit:
+            set_integer(view.fleet, view.row, bit, value)
+
+    return property(getter, setter)
+
+
+def identity(value):
+    return value
+
+
+class RobotView(Robot):
+    """
+            A class containing the Robot representation as a thin view on one row of the fleet arrays
+    """
+
+    __slots__ = ('fleet', 'row')
+
+    def __init__(self, fleet, row, robot_id):
+        self.fleet = fleet
+        self.row = row
+        self.ID = robot_id  # Fixed while the robot owns the row, so kept on the view
+
+    battery_status = column('battery', float, INTEGER_BITS['battery_status'])
+    travelled_time = column('travelled_time', float, INTEGER_BITS['travelled_time'])
+    charged_time = column('charged_time', float, INTEGER_BITS['charged_time'])
+    heading_direction = column('heading', float, INTEGER_BITS['heading_direction'])
+    congestions = column('congestions', int)
+    total_path = column('total_path', identity)
+    task_executing = column('task_executing', identity)
+
+    @property
+    def robot_location(self):
+        integers = self.fleet.integers[self.row]
+        x, y = self.fleet.x[self.row], self.fleet.y[self.row]
+        return (int(x) if integers & INTEGER_BITS['x'] else float(x),
+                int(y) if integers & INTEGER_BITS['y'] else float(y))
+
+    @robot_location.setter
+    def robot_location(self, location):
+        self.fleet.x[self.row] = location[0]
+        self.fleet.y[self.row] = location[1]
+        set_integer(self.fleet, self.row, INTEGER_BITS['x'], location[0])
+        set_integer(self.fleet, self.row, INTEGER_BITS['y'], location[1])
+
+    @property
+    def robot_node(self):
+        return self.fleet.node_names[self.fleet.node[self.row]]
+
+    @robot_node.setter
+    def robot_node(self, node):
+        self.fleet.node[self.row] = self.fleet.node_index[node]
+
+    @property
+    def path(self):
+        return self.fleet.path[self.row]
+
+    @path.setter
+    def path(self, path):
+        # Paths are compared by their version, not element by element
+        self.fleet.path[self.row] = path
+        self.fleet.path_version[self.row] += 1
+
+    @property
+    def status(self):
+        return STATUSES[self.fleet.status[self.row]]
+
+    @status.setter
+    def status(self, status):
+        self.fleet.status[self.row] = STATUS_CODES[status]
+
+    @property
+    def motion(self):
+        if not self.fleet.moving[self.row]:
+            return None
+        return Motion(float(self.fleet.motion_start_time[self.row]),
+                      (float(self.fleet.motion_start_x[self.row]), float(self.fleet.motion_start_y[self.row])),
+                      (float(self.fleet.motion_end_x[self.row]), float(self.fleet.motion_end_y[self.row])),
+                      float(self.fleet.motion_speed[self.row]))
+
+    @motion.setter
+    def motion(self, motion):
+        self.fleet.moving[self.row] = motion is not None
+        if motion is not None:
+            self.fleet.motion_start_time[self.row] = motion.start_time
+            self.fleet.motion_start_x[self.row], self.fleet.motion_start_y[self.row] = motion.start_location
+            self.fleet.motion_end_x[self.row], self.fleet.motion_end_y[self.row] = motion.end_location
+            self.fleet.motion_speed[self.row] = motion.speed
+
+
+class FleetArrays:
+    """
+            A class containing the fleet state table of the knowledge base as a structure of arrays. Every robot owns
+            one row of contiguous NumPy columns, the Robot API is a thin view on that row. All robots finishing an
+            edge at the same time are settled in one vectorized batch, so both fleet backends give the same results.
+            The logger and the fleet manager read whole columns at once. Status transitions stay decisions of the
+            agv processes, and only the 'event' motion mode is batched.
+    """
+
+    # Robots reaching the end of an edge wait up to this many seconds for the batch they are settled in, this delays
+    # them and changes the results, with 0 only robots arriving at exactly the same time share a batch
+    settle_quantum = 0
+
+    # Columns and their types, rows are added by doubling the capacity
+    columns = {'ids': np.int64, 'x': float, 'y': float, 'heading': float, 'node': np.int32, 'status': np.int8,
+               'battery': float, 'travelled_time': float, 'charged_time': float, 'congestions': np.int64,
+               'moving': bool, 'motion_start_time': float, 'motion_start_x': float, 'motion_start_y': float,
+               'motion_end_x': float, 'motion_end_y': float, 'motion_speed': float, 'target_node': np.int32,
+               'settle_duration': float, 'drain_rate': float, 'path_version': np.int64, 'integers': np.uint8,
+               'path': object, 'total_path': object, 'task_executing': object}
+
+    def __init__(self, env, graph, capacity=16):
+
+        # Simulation environment
+        self.env = env
+        self.graph = graph
+        self.node_names = graph.node_names
+        self.node_index = graph.node_index
+        self.node_name_array = np.zeros(0, dtype=object)  # Node names to gather by node id
+        self.node_integers = np.zeros(0, dtype=np.uint8)  # Bits of the node positions given as ints, by node id
+
+        # Columns
+        self.size = 0  # Number of rows in use, including removed rows
+        for name, dtype in self.columns.items():
+            setattr(self, name, self.__empty_column(name, dtype, capacity))
+
+        # Rows by ID
+        self.rows = dict()
+        self.views = []
+        self.free_rows = []
+        self.version = 0  # Incremented on every change
+
+        # Pending edge ends, rows and events per quantum
+        self.arrivals = dict()
+
+        # Cached reads
+        self.__items = None
+        self.__snapshot = None
+        self.__snapshot_version = -1
+
+    @property
+    def items(self):
+        # Robot views sorted by ID
+        if self.__items is None:
+            self.__items = [self.views[self.rows[ID]] for ID in sorted(self.rows)]
+        return self.__items
+
+    def allocate(self, robot_id):
+        # Row of the robot, created when the robot is new
+        if robot_id in self.rows:
+            return self.views[self.rows[robot_id]]
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.views[row].ID = robot_id
+        else:
+            if self.size == len(self.ids):
+                self.__grow()
+            row = self.size
+            self.size += 1
+            self.views.append(RobotView(self, row, robot_id))
+        self.ids[row] = robot_id
+        self.rows[robot_id] = row
+        self.__changed(True)
+        return self.views[row]
+
+    def put(self, robot):
+        view = self.allocate(robot.ID)
+        for key in ('robot_location', 'robot_node', 'heading_direction', 'path', 'status', 'battery_status',
+                    'travelled_time', 'charged_time', 'congestions', 'task_executing', 'total_path', 'motion'):
+            setattr(view, key, getattr(robot, key))
+        self.__changed(False)
+
+    def remove(self, robot_id):
+        row = self.rows.pop(robot_id, None)
+        if row is None:
+            return None
+        robot = self.views[row].copy()
+        self.ids[row] = -1
+        self.status[row] = -1
+        self.path[row] = self.total_path[row] = self.task_executing[row] = None
+        self.free_rows.append(row)
+        self.__changed(True)
+        return robot
+
+    def update(self, robot_id, fields):
+        view = self.views[self.rows[robot_id]]
+        for key, value in fields.items():
+            setattr(view, key, value)
+        self.__changed(False)
+
+    def get(self, robot_id):
+        row = self.rows.get(robot_id)
+        return None if row is None else self.views[row]
+
+    def read(self, robots, name):
+        # One attribute of many robots, gathered from its column instead of through every view
+        try:
+            rows = np.fromiter(map(attrgetter('row'), robots), np.int64, len(robots))
+        except AttributeError:
+            rows = np.array([self.rows[robot.ID] for robot in robots], dtype=np.int64)
+        if name == 'robot_node':
+            if len(self.node_name_array) != len(self.node_names):
+                self.node_name_array = np.array(self.node_names, dtype=object)
+            return self.node_name_array[self.node[rows]].tolist()
+        return getattr(self, ROBOT_COLUMNS[name])[rows].tolist()
+
+    def idle(self):
+        # Idle robots sorted by ID, selected on the status column
+        return self.__select(self.status[:self.size] == STATUS_CODES['IDLE'])
+
+    def at_node(self, node):
+        return self.__select((self.node[:self.size] == self.node_index[node]) & (self.ids[:self.size] >= 0))
+
+    def snapshot(self):
+        # Copies of all robots that stay consistent while the fleet moves on, rebuilt only after a change
+        if self.__snapshot_version != self.version:
+            self.__snapshot = tuple(view.copy() for view in self.items)
+            self.__snapshot_version = self.version
+        return self.__snapshot
+
+    def traverse(self, robot_id, node, travel_time, drain_rate):
+        """
+            Input:
+                - ID of a robot moving to a neighbouring node, with its motion already set
+                - Name of the node at the end of the edge
+                - Time left to the end of the edge
+                - Battery drain in % per second
+            Output:
+                - Event triggered when the robot is settled on the node
+        """
+
+        # Init
+        row = self.rows[robot_id]
+        self.target_node[row] = self.node_index[node]
+        self.settle_duration[row] = travel_time
+        self.drain_rate[row] = drain_rate
+        event = self.env.event()
+
+        # Join the robots arriving in the same quantum, the first one schedules the settlement at its end
+        arrival_time = self.env.now + travel_time
+        if self.settle_quantum:
+            quantum = math.ceil(round(arrival_time / self.settle_quantum, 9))
+            arrival_time = max(quantum * self.settle_quantum, arrival_time)
+        else:
+            quantum = arrival_time
+        if quantum not in self.arrivals:
+            self.arrivals[quantum] = ([], [])
+            self.env.timeout(arrival_time - self.env.now).callbacks.append(lambda _: self.__settle(quantum))
+        rows, events = self.arrivals[quantum]
+        rows.append(row)
+        events.append(event)
+        return event
+
+    def locations_at(self, rows, time):
+        """
+            Input:
+                - Rows of the fleet arrays
+                - Time
+            Output:
+                - x and y coordinates of the robots at the time, moving robots along their edge as in Motion
+        """
+        x, y = self.x[rows], self.y[rows]
+        moving = self.moving[rows]
+        if moving.any():
+            rows = rows[moving]
+            delta_x = self.motion_end_x[rows] - self.motion_start_x[rows]
+            delta_y = self.motion_end_y[rows] - self.motion_start_y[rows]
+            travel_time = np.sqrt(delta_x ** 2 + delta_y ** 2) / self.motion_speed[rows]
+            elapsed_time = np.minimum(np.maximum(time - self.motion_start_time[rows], 0), travel_time)
+            heading = np.arctan2(delta_y, delta_x)
+            travelled_distance = self.motion_speed[rows] * elapsed_time
+            x[moving] = np.round(self.motion_start_x[rows] + travelled_distance * np.cos(heading), 2)
+            y[moving] = np.round(self.motion_start_y[rows] + travelled_distance * np.sin(heading), 2)
+        return x, y
+
+    def sorted_rows(self):
+        # Rows in use, sorted by robot ID
+        return self.__sorted_rows(np.flatnonzero(self.ids[:self.size] >= 0))
+
+    def __settle(self, quantum):
+        rows, events = self.arrivals.pop(quantum)
+        rows = np.array(rows)
+
+        # Advance positions, drain batteries and stop all arriving robots at once
+        duration = self.settle_duration[rows]
+        self.x[rows] = self.motion_end_x[rows]
+        self.y[rows] = self.motion_end_y[rows]
+        self.node[rows] = self.target_node[rows]
+        self.battery[rows] = np.round(self.battery[rows] - self.drain_rate[rows] * duration, 2)
+        self.travelled_time[rows] += duration
+        self.moving[rows] = False
+
+        # The robots take over the position of their node, the battery and travelled time become floats
+        if len(self.node_integers) != len(self.node_names):
+            positions = [self.graph.nodes[name].pos for name in self.node_names]
+            self.node_integers = np.array([INTEGER_BITS['x'] * isinstance(x, int) + INTEGER_BITS['y'] * isinstance(y, int)
+                                           for x, y in positions], dtype=np.uint8)
+        keep = ALL_INTEGER_BITS ^ (INTEGER_BITS['x'] | INTEGER_BITS['y'] | INTEGER_BITS['battery_status'] |
+                                   INTEGER_BITS['travelled_time'])
+        self.integers[rows] = self.integers[rows] & keep | self.node_integers[self.node[rows]]
+
+        # The node reached leaves the paths
+        for row in rows.tolist():
+            self.path[row] = self.path[row][1:]
+        self.path_version[rows] += 1
+        self.__changed(False)
+
+        # Resume the robots
+        for event in events:
+            event.succeed()
+
+    def __select(self, mask):
+        return [self.views[row] for row in self.__sorted_rows(np.flatnonzero(mask)).tolist()]
+
+    def __sorted_rows(self, rows):
+        return rows[np.argsort(self.ids[rows], kind='stable')]
+
+    def __grow(self):
+        capacity = 2 * len(self.ids)
+        for name, dtype in self.columns.items():
+            grown = self.__empty_column(name, dtype, capacity)
+            grown[:self.size] = getattr(self, name)
+            setattr(self, name, grown)
+
+    @staticmethod
+    def __empty_column(name, dtype, capacity):
+        # Unused rows have no ID and no status, object columns hold None
+        if dtype is object:
+            return np.full(capacity, None, dtype=object)
+        return np.full(capacity, -1 if name in ('ids', 'status') else 0, dtype=dtype)
+
+    def __changed(self, membership_changed):
+        self.version += 1
+        if membership_changed:
+            self.__items = None
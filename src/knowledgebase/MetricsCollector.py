@@ -0,0 +1,97 @@
+import copy
+
+import numpy as np
+
+from src.datatypes.SimulationResult import SimulationResult
+
+
+class MetricsCollector:
+    """
+            A class containing the per robot counters of a run, fed by the AGVs on every state change so the summary
+            does not depend on the logfiles
+    """
+
+    def __init__(self, env, number_of_robots):
+
+        # Simulation environment
+        self.env = env
+
+        # Counters per robot, index 0 is robot 1
+        self.travelled_time = np.zeros(number_of_robots)
+        self.charged_time = np.zeros(number_of_robots)
+        self.congestions = np.zeros(number_of_robots, dtype=int)
+        self.tasks_done = np.zeros(number_of_robots, dtype=int)
+        self.idle_time = np.zeros(number_of_robots)
+
+        # Wall-clock seconds of every fleet manager decision
+        self.decision_times = []
+
+        # Messages and wall-clock seconds from announcement to award of every auction
+        self.auction_messages = []
+        self.auction_latencies = []
+
+        # Arrival time of every open task by order number, seconds from arrival until done of every task
+        self.arrival_times = dict()
+        self.lead_times = []
+
+        # Orders spawned by the MES and executed, the run ends when they are equal
+        self.orders_spawned = 0
+        self.orders_done = 0
+
+        # Robots start idle
+        self.idle_since = np.full(number_of_robots, float(env.now))
+
+    def update_robot(self, robot_id, status, travelled_time, charged_time, congestions):
+        i = robot_id - 1
+        self.travelled_time[i] = travelled_time
+        self.charged_time[i] = charged_time
+        self.congestions[i] = congestions
+
+        # Idle time is added when the robot leaves the idle status
+        idle = status == 'IDLE'
+        if idle and np.isnan(self.idle_since[i]):
+            self.idle_since[i] = self.env.now
+        elif not idle and not np.isnan(self.idle_since[i]):
+            self.idle_time[i] += self.env.now - self.idle_since[i]
+            self.idle_since[i] = np.nan
+
+    def task_arrival(self, task):
+        self.orders_spawned += 1
+        self.arrival_times[task.order_number] = self.env.now
+
+    def task_done(self, robot_id, task):
+        # Charging tasks are not counted
+        if task.order_number != '000':
+            self.orders_done += 1
+            self.tasks_done[robot_id - 1] += 1
+            if task.order_number in self.arrival_times:
+                self.lead_times.append(self.env.now - self.arrival_times.pop(task.order_number))
+
+    def decision(self, duration):
+        self.decision_times.append(duration)
+
+    def auction(self, messages, latency):
+        self.auction_messages.append(messages)
+        self.auction_latencies.append(latency)
+
+    def snapshot(self):
+        return {name: copy.copy(getattr(self, name)) for name in
+                ('travelled_time', 'charged_time', 'congestions', 'tasks_done', 'idle_time', 'idle_since',
+                 'arrival_times', 'lead_times', 'orders_spawned', 'orders_done')}
+
+    def restore(self, state):
+        # Counters of the robots in both fleets are taken over, added robots keep fresh counters
+        for name, values in state.items():
+            if not isinstance(values, np.ndarray):
+                setattr(self, name, copy.copy(values))
+                continue
+            number_of_robots = min(len(values), len(getattr(self, name)))
+            getattr(self, name)[:number_of_robots] = values[:number_of_robots]
+
+    def result(self):
+        # Summary at the current simulation time, robots idle at the end count as idle up to now
+        idle_time = self.idle_time + np.nan_to_num(self.env.now - self.idle_since)
+        return SimulationResult(self.env.now, self.travelled_time.copy(), self.charged_time.copy(),
+                                self.congestions.copy(), self.tasks_done.copy(), idle_time,
+                                np.array(self.decision_times), np.array(self.auction_messages, dtype=int),
+                                np.array(self.auction_latencies), np.array(self.lead_times))
@@ -0,0 +1,31 @@
+class Notifier:
+    """
+            A class containing the event-driven notifications of the knowledge base. Agents wait on a topic instead
+            of polling the knowledge base, the first notification on that topic wakes all of them up.
+    """
+
+    def __init__(self, env):
+
+        # Simulation environment
+        self.env = env
+
+        # Pending event per topic
+        self.events = dict()
+
+    def wait(self, topics):
+        # Event that is triggered by the next notification on any of the topics
+        events = [self.event(topic) for topic in topics]
+        if len(events) == 1:
+            return events[0]
+        return self.env.any_of(events)
+
+    def event(self, topic):
+        if topic not in self.events:
+            self.events[topic] = self.env.event()
+        return self.events[topic]
+
+    def notify(self, topic, data=None):
+        # Nobody waits on a topic without a pending event
+        event = self.events.pop(topic, None)
+        if event is not None:
+            event.succeed(data)
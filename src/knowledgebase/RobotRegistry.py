@@ -0,0 +1,88 @@
+class RobotRegistry:
+    """
+            A class containing the fleet state table of the knowledge base. Robots are keyed by ID and updated in
+            place, secondary indexes keep track of the idle robots and of the robots per node.
+    """
+
+    def __init__(self):
+
+        # Robots by ID
+        self.robots = dict()
+        self.version = 0  # Incremented on every change
+
+        # Secondary indexes
+        self.idle_robots = set()
+        self.robots_by_node = dict()
+
+        # Cached reads
+        self.__items = None
+        self.__snapshot = None
+        self.__snapshot_version = -1
+
+    @property
+    def items(self):
+        # Live robot entries sorted by ID
+        if self.__items is None:
+            self.__items = [self.robots[ID] for ID in sorted(self.robots)]
+        return self.__items
+
+    def put(self, robot):
+        self.remove(robot.ID)
+        self.robots[robot.ID] = robot
+        if robot.status == 'IDLE':
+            self.idle_robots.add(robot.ID)
+        self.robots_by_node.setdefault(robot.robot_node, set()).add(robot.ID)
+        self.__changed(True)
+
+    def remove(self, robot_id):
+        robot = self.robots.pop(robot_id, None)
+        if robot is not None:
+            self.idle_robots.discard(robot_id)
+            self.robots_by_node[robot.robot_node].discard(robot_id)
+            self.__changed(True)
+        return robot
+
+    def update(self, robot_id, fields):
+        robot = self.robots[robot_id]
+
+        # Secondary indexes
+        if 'status' in fields:
+            if fields['status'] == 'IDLE':
+                self.idle_robots.add(robot_id)
+            else:
+                self.idle_robots.discard(robot_id)
+        if 'robot_node' in fields and fields['robot_node'] != robot.robot_node:
+            self.robots_by_node[robot.robot_node].discard(robot_id)
+            self.robots_by_node.setdefault(fields['robot_node'], set()).add(robot_id)
+
+        # Update in place
+        for key, value in fields.items():
+            setattr(robot, key, value)
+        self.__changed(False)
+
+    def get(self, robot_id):
+        return self.robots.get(robot_id)
+
+    @staticmethod
+    def read(robots, name):
+        # One attribute of many robots
+        return [getattr(robot, name) for robot in robots]
+
+    def idle(self):
+        # Idle robots sorted by ID
+        return [self.robots[ID] for ID in sorted(self.idle_robots)]
+
+    def at_node(self, node):
+        return [self.robots[ID] for ID in sorted(self.robots_by_node.get(node, ()))]
+
+    def snapshot(self):
+        # Copies of all robots that stay consistent while the fleet moves on, rebuilt only after a change
+        if self.__snapshot_version != self.version:
+            self.__snapshot = tuple(robot.copy() for robot in self.items)
+            self.__snapshot_version = self.version
+        return self.__snapshot
+
+    def __changed(self, membership_changed):
+        self.version += 1
+        if membership_changed:
+            self.__items = None
@@ -0,0 +1,107 @@
+import bisect
+
+from simpy.core import BoundClass
+from simpy.resources.base import BaseResource
+from simpy.resources.store import StoreGet, StorePut
+
+
+class TaskTable(BaseResource):
+    """
+            A class containing a task table of the knowledge base. Tasks are indexed by order number and kept in a list
+            ordered by (priority, arrival), a lower priority value is served first. Without prioritization tasks are
+            served in order of arrival. Like a simpy store, get() returns an event that blocks until a task is
+            available.
+    """
+
+    put = BoundClass(StorePut)
+    get = BoundClass(StoreGet)
+
+    def __init__(self, env, prioritized=True):
+        super().__init__(env, float('inf'))
+
+        # Ordering, a task is inserted at its place found by bisection so the order is never sorted again
+        self.prioritized = prioritized
+        self.keys = []  # (priority, arrival) of the tasks in order
+        self.tasks = []  # Tasks in order
+        self.arrivals = 0
+        self.version = 0  # Incremented on every change
+        self.changes = None  # Arrivals of the tasks put or removed since they were last taken, when tracked
+
+        # Index
+        self.entries = dict()  # Arrival -> (key, task)
+        self.order_numbers = dict()  # Order number -> arrivals of tasks with that order number
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    @property
+    def items(self):
+        # Tasks in the order they are served, the list is updated in place on every change
+        return self.tasks
+
+    def track_changes(self):
+        self.changes = set()
+
+    def take_changes(self):
+        # Arrivals changed since the previous call, tracking starts again from here
+        changes, self.changes = self.changes, set()
+        return changes
+
+    def peek(self):
+        # Next task to be served without removing it
+        return self.tasks[0] if self.tasks else None
+
+    def find(self, order_number):
+        arrivals = self.order_numbers.get(order_number)
+        return self.entries[arrivals[0]][1] if arrivals else None
+
+    def remove(self, order_number):
+        # Remove the first task with this order number
+        arrivals = self.order_numbers.get(order_number)
+        if not arrivals:
+            return None
+        arrival = arrivals.pop(0)
+        if not arrivals:
+            del self.order_numbers[order_number]
+        key, task = self.entries.pop(arrival)
+        index = bisect.bisect_left(self.keys, key)
+        del self.keys[index]
+        del self.tasks[index]
+        self.changed(arrival)
+        return task
+
+    def _do_put(self, event):
+        task = event.item
+        key = (task.priority if self.prioritized else 0, self.arrivals)
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.tasks.insert(index, task)
+        self.entries[self.arrivals] = (key, task)
+        self.order_numbers.setdefault(task.order_number, []).append(self.arrivals)
+        self.changed(self.arrivals)
+        self.arrivals += 1
+        event.succeed()
+
+    def _do_get(self, event):
+        if self.tasks:
+            event.succeed(self.__pop())
+        return None
+
+    def __pop(self):
+        # Remove the first task
+        _, arrival = self.keys.pop(0)
+        task = self.tasks.pop(0)
+        del self.entries[arrival]
+        self.order_numbers[task.order_number].remove(arrival)
+        if not self.order_numbers[task.order_number]:
+            del self.order_numbers[task.order_number]
+        self.changed(arrival)
+        return task
+
+    def changed(self, arrival):
+        self.version += 1
+        if self.changes is not None:
+            self.changes.add(arrival)
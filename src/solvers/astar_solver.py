@@ -1,6 +1,9 @@
+import heapq
 import math
 from copy import deepcopy
 
+import numpy as np
+
 
 def find_shortest_path(graph, start_node, end_node):
     """
@@ -16,6 +19,96 @@ def find_shortest_path(graph, start_node, end_node):
             - None
     """
 
+    # Answer from the precomputed all-pairs table when the graph keeps one
+    if graph.has_path_table():
+        return graph.shortest_path(start_node, end_node)
+
+    return astar_search(graph, start_node, end_node)
+
+
+def astar_search(graph, start_node, end_node):
+    """
+        Input:
+            - Total layout graph
+            - Start node name
+            - End node name
+        Output:
+            - Shortest path names
+            - Total distance in meters
+        Default output:
+            - None
+            - None
+        The search state lives in per-query lists indexed by node id and the open set is a binary heap,
+        the graph itself is never copied nor modified.
+    """
+
+    # Get node ids from node names
+    node_names = graph.node_names
+    start = graph.node_index[start_node]
+    end = graph.node_index[end_node]
+
+    # Compressed sparse row view of the graph
+    indptr = graph.indptr
+    indices = graph.indices
+    weights = graph.weights
+    positions = graph.positions
+
+    # Heuristic of all nodes at once
+    h = np.sqrt(np.sum(np.square(positions - positions[end]), axis=1)).tolist()
+
+    # Init
+    number_of_nodes = len(node_names)
+    g = [math.inf] * number_of_nodes
+    parent = [-1] * number_of_nodes
+    parent_length = [0] * number_of_nodes
+    closed = [False] * number_of_nodes
+    g[start] = 0
+    openset = [(h[start], 0, start)]
+    counter = 1
+
+    # Loop
+    while openset:
+
+        # Take node with least cost as next node
+        _, _, current = heapq.heappop(openset)
+        if closed[current]:
+            continue
+
+        # End criterium
+        if current == end:
+            path = []
+            distance = 0
+            while parent[current] >= 0:
+                path.append(node_names[current])
+                distance += parent_length[current]
+                current = parent[current]
+            path.append(node_names[current])
+            return path[::-1], distance
+
+        # Move to next node
+        closed[current] = True
+
+        # Explore neighbors
+        first, last = indptr[current], indptr[current + 1]
+        for neighbor, length in zip(indices[first:last].tolist(), weights[first:last].tolist()):
+            if closed[neighbor]:
+                continue
+            new_g = g[current] + length
+            if new_g < g[neighbor]:
+                g[neighbor] = new_g
+                parent[neighbor] = current
+                parent_length[neighbor] = length
+                heapq.heappush(openset, (new_g + h[neighbor], counter, neighbor))
+                counter += 1
+    return None, None
+
+
+def astar_search_deepcopy(graph, start_node, end_node):
+    """
+        Original Astar implementation storing its search state on a deepcopy of the graph,
+        kept as a reference for the benchmarks.
+    """
+
     # Tak deepcopy of graph
     graph = deepcopy(graph)
 
@@ -69,4 +162,8 @@ def find_shortest_path(graph, start_node, end_node):
 
 
 def heuristic(node_a, node_b):
-    return math.sqrt(math.pow(node_a.pos[0] - node_b.pos[0], 2) + math.pow(node_a.pos[1] - node_b.pos[1], 2))
+    return heuristic_pos(node_a.pos, node_b.pos)
+
+
+def heuristic_pos(pos_a, pos_b):
+    return math.sqrt(math.pow(pos_a[0] - pos_b[0], 2) + math.pow(pos_a[1] - pos_b[1], 2))
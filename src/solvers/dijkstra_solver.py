@@ -0,0 +1,178 @@
+import heapq
+import math
+
+import numpy as np
+
+
+def single_source_distances(indptr, indices, weights, source):
+    """
+        Input:
+            - Compressed sparse row arrays of the graph (indptr, indices, weights)
+            - Source node id
+        Output:
+            - Shortest distance in meters from the source to every node (inf if unreachable)
+    """
+
+    # Init
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    weights = weights.tolist()
+    distances = [math.inf] * (len(indptr) - 1)
+    distances[source] = 0
+    openset = [(0, source)]
+
+    # Loop
+    while openset:
+        distance, current = heapq.heappop(openset)
+        if distance > distances[current]:
+            continue
+        for k in range(indptr[current], indptr[current + 1]):
+            new_distance = distance + weights[k]
+            if new_distance < distances[indices[k]]:
+                distances[indices[k]] = new_distance
+                heapq.heappush(openset, (new_distance, indices[k]))
+
+    return np.array(distances)
+
+
+def single_target_tree(reversed_indptr, reversed_indices, reversed_weights, target, tolerance=1e-9):
+    """
+        Input:
+            - Compressed sparse row arrays of the reversed graph, as lists
+            - Target node id
+            - Tolerance below which two distances are considered equal
+        Output:
+            - Shortest distance in meters from every node to the target (inf if the target is unreachable)
+            - Next hop of every node on its shortest path to the target (-1 if unreachable)
+        Equally long paths are resolved in favour of the path with the least edges.
+    """
+
+    # Init
+    number_of_nodes = len(reversed_indptr) - 1
+    distances = [math.inf] * number_of_nodes
+    hops = [0] * number_of_nodes
+    next_hop = [-1] * number_of_nodes
+    distances[target] = 0
+    next_hop[target] = target
+    openset = [(0, 0, target)]
+
+    # Loop, grown backwards from the target so the node a search comes from is the next hop
+    while openset:
+        distance, hop, current = heapq.heappop(openset)
+        if distance != distances[current] or hop != hops[current]:
+            continue
+        for k in range(reversed_indptr[current], reversed_indptr[current + 1]):
+            node = reversed_indices[k]
+            new_distance = reversed_weights[k] + distance
+            if new_distance < distances[node] - tolerance or \
+                    (new_distance <= distances[node] + tolerance and hop + 1 < hops[node]):
+                distances[node] = new_distance
+                hops[node] = hop + 1
+                next_hop[node] = current
+                heapq.heappush(openset, (new_distance, hop + 1, node))
+
+    return distances, next_hop
+
+
+def all_pairs_next_hops(reversed_indptr, reversed_indices, reversed_weights, tolerance=1e-9):
+    """
+        Input:
+            - Compressed sparse row arrays of the reversed graph
+            - Tolerance below which two distances are considered equal
+        Output:
+            - All-pairs shortest distance matrix
+            - Next-hop matrix, next_hop[i, j] is the node after i on the shortest path to j (-1 if unreachable)
+        One search per target, O(N E log N) instead of the O(N^3) of Floyd-Warshall.
+    """
+
+    # Init
+    number_of_nodes = len(reversed_indptr) - 1
+    reversed_indptr = reversed_indptr.tolist()
+    reversed_indices = reversed_indices.tolist()
+    reversed_weights = reversed_weights.tolist()
+    distances = np.empty((number_of_nodes, number_of_nodes))
+    next_hop = np.empty((number_of_nodes, number_of_nodes), dtype=np.int32)
+
+    # A column per target
+    for target in range(number_of_nodes):
+        distances[:, target], next_hop[:, target] = single_target_tree(reversed_indptr, reversed_indices,
+                                                                       reversed_weights, target, tolerance)
+
+    return distances, next_hop
+
+
+def multi_source_distances(indptr, indices, weights, sources):
+    """
+        Input:
+            - Compressed sparse row arrays of the graph (indptr, indices, weights)
+            - Source node ids
+        Output:
+            - Shortest distance in meters from the closest source to every node (inf if unreachable)
+            - Id of that closest source per node (-1 if unreachable), ties go to the source listed first
+    """
+
+    # Init, all sources start at distance 0
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    weights = weights.tolist()
+    distances = [math.inf] * (len(indptr) - 1)
+    ranks = [len(sources)] * (len(indptr) - 1)  # Position of the closest source in the list of sources
+    openset = []
+    for rank, source in enumerate(sources):
+        if rank < ranks[source]:
+            distances[source] = 0
+            ranks[source] = rank
+            heapq.heappush(openset, (0, rank, source))
+
+    # Loop, one search that grows from all sources at once
+    while openset:
+        distance, rank, current = heapq.heappop(openset)
+        if (distance, rank) > (distances[current], ranks[current]):
+            continue
+        for k in range(indptr[current], indptr[current + 1]):
+            new_distance = distance + weights[k]
+            if (new_distance, rank) < (distances[indices[k]], ranks[indices[k]]):
+                distances[indices[k]] = new_distance
+                ranks[indices[k]] = rank
+                heapq.heappush(openset, (new_distance, rank, indices[k]))
+
+    # Source ids
+    nearest = np.array([sources[rank] if rank < len(sources) else -1 for rank in ranks], dtype=np.int64)
+    return np.array(distances), nearest
+
+
+def many_source_distances(indptr, indices, weights, sources):
+    """
+        Input:
+            - Compressed sparse row arrays of the graph (indptr, indices, weights)
+            - Source node ids
+        Output:
+            - Matrix of shortest distances in meters with a row per source and a column per node (inf if unreachable)
+        All searches run at once as vectorized rounds, every round relaxes the outgoing edges of the (source, node)
+        pairs whose distance improved in the round before, until no distance improves.
+    """
+
+    # Init, the matrix is flat with index source * number of nodes + node
+    number_of_nodes = len(indptr) - 1
+    distances = np.full(len(sources) * number_of_nodes, np.inf)
+    frontier = np.arange(len(sources), dtype=np.int64) * number_of_nodes + np.asarray(sources, dtype=np.int64)
+    distances[frontier] = 0
+
+    # Loop
+    while len(frontier):
+
+        # Outgoing edges of every pair in the frontier
+        rows, nodes = np.divmod(frontier, number_of_nodes)
+        starts = indptr[nodes]
+        degrees = indptr[nodes + 1] - starts
+        owners = np.repeat(np.arange(len(frontier)), degrees)
+        edges = np.arange(owners.size) - np.repeat(np.cumsum(degrees) - degrees, degrees) + starts[owners]
+
+        # Relax, the pairs that improved make up the next frontier
+        targets = rows[owners] * number_of_nodes + indices[edges]
+        new_distances = distances[frontier][owners] + weights[edges]
+        improved = new_distances < distances[targets]
+        np.minimum.at(distances, targets[improved], new_distances[improved])
+        frontier = np.unique(targets[improved])
+
+    return distances.reshape(len(sources), number_of_nodes)
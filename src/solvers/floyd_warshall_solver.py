@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def floyd_warshall(weights, tolerance=1e-9):
+    """
+        Input:
+            - Dense weight matrix with edge lengths, inf where there is no edge and 0 on the diagonal
+            - Tolerance below which two distances are considered equal
+        Output:
+            - All-pairs shortest distance matrix
+            - Next-hop matrix, next_hop[i, j] is the node after i on the shortest path to j (-1 if unreachable)
+        Equally long paths are resolved in favour of the path with the least edges.
+    """
+
+    # Init
+    number_of_nodes = len(weights)
+    distances = np.array(weights, dtype=float)
+    reachable = np.isfinite(distances)
+    next_hop = np.where(reachable, np.arange(number_of_nodes, dtype=np.int32), -1).astype(np.int32)
+    hops = np.where(reachable, 1, 0).astype(np.int32)
+    np.fill_diagonal(hops, 0)
+
+    # Relax all pairs over every intermediate node k at once
+    for k in range(number_of_nodes):
+        via_k = distances[:, k, np.newaxis] + distances[np.newaxis, k, :]
+        hops_via_k = hops[:, k, np.newaxis] + hops[np.newaxis, k, :]
+        improved = (via_k < distances - tolerance) | ((via_k <= distances + tolerance) & (hops_via_k < hops))
+        distances[improved] = via_k[improved]
+        hops[improved] = hops_via_k[improved]
+        next_hop = np.where(improved, next_hop[:, k, np.newaxis], next_hop)
+
+    return distances, next_hop
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def linear_sum_assignment(cost):
+    """
+        Input:
+            - Cost matrix with a row per worker and a column per job, rectangular matrices are allowed and inf marks
+              a pair that cannot be assigned
+        Output:
+            - Row indices and column indices of the assigned pairs with minimal total cost, sorted by row. Every row
+              is assigned when there are at least as many columns as rows, else every column. Pairs with an inf cost
+              are left out.
+    """
+
+    # Init, the shortest augmenting path method below needs at most as many rows as columns
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    number_of_rows, number_of_columns = cost.shape
+    if number_of_rows == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # Impossible pairs get a cost higher than any assignment of possible pairs
+    feasible = np.isfinite(cost)
+    finite_cost = np.where(feasible, cost, 0)
+    big_cost = (np.abs(finite_cost).max() + 1) * (number_of_rows + 1)
+    finite_cost = np.where(feasible, finite_cost, big_cost)
+
+    # Potentials of the rows and columns, column 0 is a virtual column holding the row being added
+    row_potentials = np.zeros(number_of_rows + 1)
+    column_potentials = np.zeros(number_of_columns + 1)
+    column_rows = np.zeros(number_of_columns + 1, dtype=int)  # Row assigned to a column (1-based), 0 if none
+    previous_columns = np.zeros(number_of_columns + 1, dtype=int)  # Alternating path back to the virtual column
+
+    # Loop, add the rows one by one along a shortest augmenting path
+    for row in range(1, number_of_rows + 1):
+        column_rows[0] = row
+        column = 0
+        path_costs = np.full(number_of_columns + 1, np.inf)
+        visited = np.zeros(number_of_columns + 1, dtype=bool)
+        while True:
+
+            # Relax all unvisited columns from the row assigned to the current column at once
+            visited[column] = True
+            current_row = column_rows[column]
+            unvisited = ~visited[1:]
+            reduced_costs = finite_cost[current_row - 1] - row_potentials[current_row] - column_potentials[1:]
+            improved = unvisited & (reduced_costs < path_costs[1:])
+            path_costs[1:][improved] = reduced_costs[improved]
+            previous_columns[1:][improved] = column
+
+            # Closest unvisited column, the potentials are shifted by its path cost
+            candidate_costs = np.where(unvisited, path_costs[1:], np.inf)
+            next_column = int(np.argmin(candidate_costs)) + 1
+            delta = candidate_costs[next_column - 1]
+            row_potentials[column_rows[visited]] += delta
+            column_potentials[visited] -= delta
+            path_costs[1:][unvisited] -= delta
+            column = next_column
+            if column_rows[column] == 0:
+                break
+
+        # Augment along the path
+        while column:
+            previous_column = previous_columns[column]
+            column_rows[column] = column_rows[previous_column]
+            column = previous_column
+
+    # Assigned pairs
+    columns = np.flatnonzero(column_rows[1:])
+    rows = column_rows[1:][columns] - 1
+    keep = feasible[rows, columns]
+    rows, columns = rows[keep], columns[keep]
+    if transposed:
+        rows, columns = columns, rows
+    order = np.argsort(rows)
+    return rows[order], columns[order]
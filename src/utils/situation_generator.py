@@ -1,54 +1,31 @@
 import ast
 import configparser
-from random import *
+import math
 
 import numpy as np
 
+from src.OrderSource import ORDER, encode_positions
 
-def generate_situation(num_tasks, setup_file, order_list_file):
-    # Setup
-    setup = configparser.ConfigParser()
-    setup.read(setup_file)
-
-    # Set params
-    max_arrival_interval = int(setup['SITUATION_GENERATOR']['max_arrival_interval'])
-    priorities = ast.literal_eval(setup['SITUATION_GENERATOR']['priorities'])
-    task_locations = ast.literal_eval(setup['LAYOUT']['task_locations'])
-
-    # Init
-    order_list = []
-    order_numbers = []
-    entering_time = 0
-
-    # Shuffle task locations
-    index_list = np.arange(0, len(task_locations))
-    shuffle(index_list)
-
-    for i in range(num_tasks):
-
-        # New order
-        order = list()
+# Shift profiles of the arrival rate, periods of (duration in seconds, relative rate) repeated over the scenario
+ARRIVAL_PROFILES = {'bursty': ((300, 4.0), (900, 0.25)),
+                    'ramp': tuple((1800, rate) for rate in (0.25, 0.5, 1.0, 1.5, 2.0, 1.0))}
 
-        # Generate entering time
-        entering_time += randint(0, max_arrival_interval)
-        order.append(entering_time)
 
-        # Generate random order number of four digits
-        order_number = randint(0, 9) * 1000 + randint(0, 9) * 100 + randint(0, 9) * 10 + randint(0, 9)
-        while order_number in order_numbers:
-            order_number = randint(0, 9) * 1000 + randint(0, 9) * 100 + randint(0, 9) * 10 + randint(0, 9)
-        order.append(order_number)
+def generate_situation(num_tasks, setup_file, order_list_file, seed=None, arrival_process=None, demand_weights=None):
+    """
+        Input:
+            - Number of tasks
+            - Setup file
+            - Order file to write, a .npy file is written as binary order records
+            - Random seed
+            - Arrival process, 'uniform', 'poisson', 'bursty' or 'ramp', read from the setup file if not given
+            - Relative demand of every task location, also given in the setup file
+        Output:
+            - None
+    """
 
-        # Generate random task priority
-        priority = priorities[randint(0, 2)]
-        order.append(priority)
-
-        # Generate two task locations from the layout
-        pos_a = task_locations[index_list[i]]
-        order.append(pos_a)
-
-        # Append order
-        order_list.append(order)
+    # Generate
+    order_list = generate_orders(num_tasks, setup_file, seed, arrival_process, demand_weights)
 
     # Save situation
     save_situation(order_list, order_list_file)
@@ -57,11 +34,105 @@ def generate_situation(num_tasks, setup_file, order_list_file):
     print("\nOrder list with " + str(num_tasks) + " tasks created in file '" + str(order_list_file) + "'.")
 
 
-def save_situation(order_list, order_list_file):
-    file1 = open(order_list_file, "w")
-    for order in order_list:
-        file1.write(str(order[0]) + ",")
-        file1.write(str(order[1]) + ",")
-        file1.write(str(order[2]) + ",")
-        file1.write(str(order[3]) + ",\n")
-    file1.close()
+def generate_orders(num_tasks, setup_file, seed=None, arrival_process=None, demand_weights=None):
+    """
+        Input:
+            - Number of tasks
+            - Setup file
+            - Random seed
+            - Arrival process, 'uniform', 'poisson', 'bursty' or 'ramp', read from the setup file if not given
+            - Relative demand of every task location, also given in the setup file
+        Output:
+            - Array of ORDER records sorted on arrival time
+    """
+
+    # Setup
+    setup = configparser.ConfigParser()
+    setup.read(setup_file)
+
+    # Set params
+    max_arrival_interval = int(setup['SITUATION_GENERATOR']['max_arrival_interval'])
+    priorities = ast.literal_eval(setup['SITUATION_GENERATOR']['priorities'])
+    task_locations = ast.literal_eval(setup['LAYOUT']['task_locations'])
+    if arrival_process is None:
+        arrival_process = setup['SITUATION_GENERATOR'].get('arrival_process', 'uniform')
+    if demand_weights is None and 'demand_weights' in setup['SITUATION_GENERATOR']:
+        demand_weights = ast.literal_eval(setup['SITUATION_GENERATOR']['demand_weights'])
+
+    # Init
+    rng = np.random.default_rng(seed)
+    order_list = np.empty(num_tasks, dtype=ORDER)
+
+    # Generate entering times
+    order_list['time'] = generate_arrival_times(rng, num_tasks, max_arrival_interval, arrival_process)
+
+    # Generate unique order numbers, four digits as long as there are enough of them
+    number_of_digits = max(4, math.ceil(math.log10(max(num_tasks, 1))) + 1)
+    order_list['order_number'] = rng.choice(10 ** number_of_digits, num_tasks, replace=False)
+
+    # Generate random task priorities
+    order_list['priority'] = rng.choice(priorities, num_tasks)
+
+    # Generate task locations, every location once if possible, else drawn by demand
+    if demand_weights is None and num_tasks <= len(task_locations):
+        location_indices = rng.permutation(len(task_locations))[:num_tasks]
+    else:
+        if demand_weights is None:
+            demand_weights = np.ones(len(task_locations))
+        demand_weights = np.asarray(demand_weights, dtype=float)
+        if len(demand_weights) != len(task_locations):
+            raise ValueError("Need one demand weight per task location")
+        location_indices = rng.choice(len(task_locations), num_tasks, p=demand_weights / demand_weights.sum())
+    order_list['pos_A'] = encode_positions(task_locations)[location_indices]
+
+    return order_list
+
+
+def generate_arrival_times(rng, num_tasks, max_arrival_interval, arrival_process):
+    """
+        Input:
+            - Random generator
+            - Number of tasks
+            - Maximal interval between two arrivals, the mean interval is half of it for every arrival process
+            - Arrival process, 'uniform', 'poisson' or a name in ARRIVAL_PROFILES
+        Output:
+            - Sorted integer arrival times
+    """
+
+    # Uniform intervals
+    if arrival_process == 'uniform':
+        return np.cumsum(rng.integers(0, max_arrival_interval, num_tasks, endpoint=True))
+    if arrival_process != 'poisson' and arrival_process not in ARRIVAL_PROFILES:
+        raise ValueError("Unknown arrival process '" + str(arrival_process) + "'")
+
+    # Poisson arrivals at the mean rate
+    arrival_times = np.cumsum(rng.exponential(max_arrival_interval / 2, num_tasks))
+
+    # Time varying rate, the arrivals of the mean rate are stretched through the inverse of the cumulative rate
+    if arrival_process in ARRIVAL_PROFILES:
+        durations, rates = np.array(ARRIVAL_PROFILES[arrival_process], dtype=float).T
+        rates = rates * durations.sum() / (durations * rates).sum()  # Mean rate over a cycle stays the same
+        cycle = durations.sum()
+        period_starts = np.concatenate(([0], np.cumsum(durations)[:-1]))
+        period_ends_rated = np.cumsum(durations * rates)
+        cycles, rated_time = np.divmod(arrival_times, cycle)
+        periods = np.minimum(np.searchsorted(period_ends_rated, rated_time, side='right'), len(durations) - 1)
+        period_starts_rated = period_ends_rated[periods] - durations[periods] * rates[periods]
+        arrival_times = cycles * cycle + period_starts[periods] + (rated_time - period_starts_rated) / rates[periods]
+
+    return np.rint(arrival_times).astype(np.int64)
+
+
+def save_situation(order_list, order_list_file, chunk_size=65536):
+    # Written in chunks of lines, or as binary order records for a .npy file
+    if order_list_file.endswith('.npy'):
+        np.save(order_list_file, np.asarray(order_list, dtype=ORDER))
+        return
+    with open(order_list_file, "w") as file:
+        for start in range(0, len(order_list), chunk_size):
+            orders = order_list[start:start + chunk_size]
+            if isinstance(orders, np.ndarray):
+                orders = zip(orders['time'].tolist(), orders['order_number'].tolist(), orders['priority'].tolist(),
+                             orders['pos_A'].astype(str).tolist())
+            file.write("".join(str(order[0]) + "," + str(order[1]) + "," + str(order[2]) + "," + str(order[3]) +
+                               ",\n" for order in orders))
@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 
 from src.solvers.astar_solver import *
@@ -29,8 +31,8 @@ def calculate_path_traveltime(graph, path, speed):
     return path_travel_time
 
 
-def get_travel_cost_per_robot():
-    f = open("../logfiles/global_robot_list.txt", "r")
+def get_travel_cost_per_robot(log_dir='../logfiles'):
+    f = open(os.path.join(log_dir, "global_robot_list.txt"), "r")
     lines = f.readlines()
     last_line = lines[-1]
     global_robot_list = last_line.split('|')[1:-1]
@@ -43,8 +45,8 @@ def get_travel_cost_per_robot():
     return travel_cost_per_robot
 
 
-def get_charging_cost_per_robot():
-    f = open("../logfiles/global_robot_list.txt", "r")
+def get_charging_cost_per_robot(log_dir='../logfiles'):
+    f = open(os.path.join(log_dir, "global_robot_list.txt"), "r")
     lines = f.readlines()
     last_line = lines[-1]
     global_robot_list = last_line.split('|')[1:-1]
@@ -57,8 +59,8 @@ def get_charging_cost_per_robot():
     return charging_cost_per_robot
 
 
-def get_congestions_per_robot():
-    f = open("../logfiles/global_robot_list.txt", "r")
+def get_congestions_per_robot(log_dir='../logfiles'):
+    f = open(os.path.join(log_dir, "global_robot_list.txt"), "r")
     lines = f.readlines()
     last_line = lines[-1]
     global_robot_list = last_line.split('|')[1:-1]
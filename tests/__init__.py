@@ -0,0 +1,6 @@
+import os
+
+# Test vectors of the repository, found from the tests folder so the tests run from any directory
+TEST_VECTORS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_vectors')
+SETUP_FILE = os.path.join(TEST_VECTORS, 'setup.ini')
+ORDERS_FILE = os.path.join(TEST_VECTORS, 'orders.txt')
@@ -0,0 +1,72 @@
+import itertools
+import math
+
+import numpy as np
+
+from src.Graph import Graph
+
+
+def random_graph(rng, number_of_nodes, edges_per_node=2, max_path_table_nodes=Graph.max_path_table_nodes):
+    """
+        Input:
+            - Numpy random generator
+            - Number of nodes
+            - Number of outgoing edges per node, to random other nodes so not every node is reachable
+            - Number of nodes above which the graph keeps no all-pairs table
+        Output:
+            - Directed graph with nodes at random positions and edges as long as the distance between their nodes
+    """
+    names = ['N' + str(i) for i in range(number_of_nodes)]
+    locations = [tuple(location) for location in rng.uniform(0, 50, (number_of_nodes, 2)).round(2).tolist()]
+    neighbors = [[names[j] for j in rng.choice(np.delete(np.arange(number_of_nodes), i),
+                                                min(edges_per_node, number_of_nodes - 1), replace=False)]
+                 for i in range(number_of_nodes)]
+    graph = Graph()
+    graph.max_path_table_nodes = max_path_table_nodes
+    graph.create_nodes(locations, names)
+    graph.create_edges(names, neighbors)
+    return graph
+
+
+def bellman_ford(graph, source):
+    # Distances from the source to all node names, relaxing every edge until nothing improves
+    distances = {name: math.inf for name in graph.node_names}
+    distances[source] = 0
+    for _ in range(len(distances)):
+        improved = False
+        for (start, end), edge in graph.edges.items():
+            if distances[start] + edge.length < distances[end] - 1e-12:
+                distances[end] = distances[start] + edge.length
+                improved = True
+        if not improved:
+            break
+    return distances
+
+
+def all_pairs(graph):
+    # Matrix of shortest distances between all node ids
+    return np.array([[bellman_ford(graph, source)[target] for target in graph.node_names]
+                     for source in graph.node_names])
+
+
+def path_length(graph, path):
+    # Length of a path of node names, every step has to be an edge of the graph
+    return sum(graph.edges[start, end].length for start, end in zip(path, path[1:]))
+
+
+def exhaustive_assignment(cost):
+    """
+        Input:
+            - Cost matrix, inf marks a pair that cannot be assigned
+        Output:
+            - Number of pairs that cannot be assigned and total cost of the assigned pairs, minimal over all
+              assignments of every row (or every column when there are less columns than rows)
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.shape[0] > cost.shape[1]:
+        cost = cost.T
+    best = (math.inf, math.inf)
+    for columns in itertools.permutations(range(cost.shape[1]), cost.shape[0]):
+        pairs = cost[np.arange(cost.shape[0]), list(columns)]
+        best = min(best, (int(np.isinf(pairs).sum()), float(pairs[np.isfinite(pairs)].sum())))
+    return best
@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.Graph import Graph
+from src.solvers.astar_solver import astar_search, find_shortest_path
+from src.solvers.dijkstra_solver import many_source_distances, single_source_distances
+from src.solvers.floyd_warshall_solver import floyd_warshall
+from tests.oracles import all_pairs, bellman_ford, path_length, random_graph
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_path_table_matches_bellman_ford(seed):
+    graph = random_graph(np.random.default_rng(seed), 30)
+    assert graph.has_path_table()
+    expected = all_pairs(graph)
+    for i, start in enumerate(graph.node_names):
+        for j, end in enumerate(graph.node_names):
+            path, distance = graph.shortest_path(start, end)
+            if math.isinf(expected[i, j]):
+                assert path is None and distance is None
+            else:
+                assert path[0] == start and path[-1] == end
+                assert distance == pytest.approx(expected[i, j])
+                assert path_length(graph, path) == pytest.approx(expected[i, j])
+
+
+def test_path_table_prefers_the_least_edges():
+    # Two equally long routes from A to D, over one or over two intermediate nodes
+    graph = Graph()
+    graph.create_nodes([(0, 0), (1, 0), (2, 0), (3, 0), (0, 3)], ['A', 'B', 'C', 'D', 'E'])
+    graph.create_edges(['A', 'B', 'C'], [['B', 'D'], ['C'], ['D']])
+    assert graph.shortest_path('A', 'D') == (['A', 'D'], 3)
+    assert graph.shortest_path('D', 'A') == (None, None)
+    assert graph.shortest_path('E', 'E') == (['E'], 0)
+
+
+def test_floyd_warshall_next_hops_walk_shortest_paths():
+    rng = np.random.default_rng(0)
+    weights = np.where(rng.random((12, 12)) < 0.3, rng.uniform(1, 10, (12, 12)), np.inf)
+    np.fill_diagonal(weights, 0)
+    distances, next_hop = floyd_warshall(weights)
+    for i in range(12):
+        for j in range(12):
+            if math.isinf(distances[i, j]):
+                assert next_hop[i, j] == -1
+                continue
+            length, current = 0, i
+            while current != j:
+                length += weights[current, next_hop[current, j]]
+                current = next_hop[current, j]
+            assert length == pytest.approx(distances[i, j])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_astar_matches_bellman_ford(seed):
+    graph = random_graph(np.random.default_rng(seed), 40, max_path_table_nodes=0)
+    assert not graph.has_path_table()  # Queries go to Astar
+    for start in graph.node_names[:10]:
+        expected = bellman_ford(graph, start)
+        for end in graph.node_names:
+            path, distance = astar_search(graph, start, end)
+            if math.isinf(expected[end]):
+                assert path is None and distance is None
+            else:
+                assert path[0] == start and path[-1] == end
+                assert distance == pytest.approx(expected[end])
+                assert path_length(graph, path) == pytest.approx(expected[end])
+                assert find_shortest_path(graph, start, end)[1] == pytest.approx(expected[end])
+
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_nearest_node_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    graph = random_graph(rng, 200)
+    positions = graph.positions
+
+    # Random points inside and outside the layout, and the nodes themselves
+    queries = np.concatenate((rng.uniform(-20, 70, (500, 2)), positions))
+    for x, y in queries.tolist():
+        expected = int(np.argmin(np.hypot(positions[:, 0] - x, positions[:, 1] - y)))
+        assert graph.nearest_node(x, y) == graph.node_names[expected]
+
+
+def test_nearest_node_resolves_ties_to_first_node():
+    graph = Graph()
+    graph.create_nodes([(0, 0), (2, 0), (1, 5), (0, 0)], ['A', 'B', 'C', 'D'])
+    assert graph.nearest_node(1, 0) == 'A'
+    assert graph.nearest_node(0.1, -0.1) == 'A'
+    assert graph.nearest_node(1, 4) == 'C'
+
+
+@pytest.mark.parametrize('max_path_table_nodes', [0, 100])
+def test_cost_matrix_matches_bellman_ford(max_path_table_nodes):
+    graph = random_graph(np.random.default_rng(1), 25, max_path_table_nodes=max_path_table_nodes)
+    sources = ['N0', 'N3', 'N0', 'N7']  # A repeated source gets the same row
+    targets = ['N1', 'N2', 'N24', 'N3']
+    expected = all_pairs(graph)[np.ix_([graph.node_index[name] for name in sources],
+                                       [graph.node_index[name] for name in targets])]
+    np.testing.assert_allclose(graph.cost_matrix(sources, targets), expected)
+    np.testing.assert_allclose(graph.cost_matrix(sources, targets, speed=2), expected / 2)
+    assert graph.cost_matrix([], targets).shape == (0, 4) and graph.cost_matrix(sources, []).shape == (4, 0)
+
+
+def test_source_cache_is_bounded():
+    graph = random_graph(np.random.default_rng(2), 30, max_path_table_nodes=0)
+    graph.source_cache_size = 3
+    expected = all_pairs(graph)
+    for _ in range(2):
+        for i, name in enumerate(graph.node_names):
+            np.testing.assert_allclose(graph.distances_from(name), expected[i])
+        np.testing.assert_allclose(graph.cost_matrix(graph.node_names[::-1], graph.node_names), expected[::-1])
+        assert len(graph._Graph__source_distances) == 3
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_many_source_distances_match_single_source(seed):
+    graph = random_graph(np.random.default_rng(seed), 60, edges_per_node=3, max_path_table_nodes=0)
+    sources = [5, 0, 5, 59]
+    distances = many_source_distances(graph.indptr, graph.indices, graph.weights, sources)
+    for row, source in zip(distances, sources):
+        np.testing.assert_array_equal(row, single_source_distances(graph.indptr, graph.indices, graph.weights, source))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_distances_to_matches_closest_target(seed):
+    graph = random_graph(np.random.default_rng(seed), 30)
+    targets = ['N2', 'N11', 'N20']
+    pairs = all_pairs(graph)
+    target_ids = [graph.node_index[name] for name in targets]
+    distances, nearest_ids = graph.distances_to(targets)
+    np.testing.assert_allclose(distances, pairs[:, target_ids].min(axis=1))
+    for node_id, (distance, nearest_id) in enumerate(zip(distances, nearest_ids)):
+        if math.isinf(distance):
+            assert nearest_id == -1
+        else:
+            assert nearest_id in target_ids
+            assert pairs[node_id, nearest_id] == pytest.approx(distance)
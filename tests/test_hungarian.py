@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.solvers.hungarian_solver import linear_sum_assignment
+from tests.oracles import exhaustive_assignment
+
+
+def assignment_key(cost, rows, columns):
+    # Number of pairs left out and total cost of an assignment, as in exhaustive_assignment
+    cost = np.asarray(cost, dtype=float)
+    return min(cost.shape) - len(rows), float(cost[rows, columns].sum())
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (3, 3), (5, 5), (2, 5), (5, 2), (4, 6), (6, 4)])
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_exhaustive_search(shape, seed):
+    cost = np.random.default_rng(seed).integers(0, 20, shape).astype(float)
+    rows, columns = linear_sum_assignment(cost)
+    assert list(rows) == sorted(rows)
+    assert len(set(rows)) == len(rows) == min(shape) and len(set(columns)) == len(columns)
+    missing, total = exhaustive_assignment(cost)
+    assert assignment_key(cost, rows, columns) == (missing, pytest.approx(total))
+
+
+@pytest.mark.parametrize('shape', [(4, 4), (3, 5), (5, 3)])
+@pytest.mark.parametrize('seed', range(5))
+def test_infeasible_pairs_are_left_out(shape, seed):
+    rng = np.random.default_rng(seed)
+    cost = np.where(rng.random(shape) < 0.4, np.inf, rng.uniform(0, 10, shape))
+    rows, columns = linear_sum_assignment(cost)
+    assert np.isfinite(cost[rows, columns]).all()
+    missing, total = exhaustive_assignment(cost)
+    assert assignment_key(cost, rows, columns) == (missing, pytest.approx(total))
+
+
+def test_empty_and_all_infeasible():
+    rows, columns = linear_sum_assignment(np.zeros((0, 3)))
+    assert len(rows) == len(columns) == 0
+    rows, columns = linear_sum_assignment(np.full((2, 2), np.inf))
+    assert len(rows) == len(columns) == 0
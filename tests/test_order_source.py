@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from src.OrderSource import *
+from src.utils.situation_generator import generate_orders, save_situation
+from tests import ORDERS_FILE, SETUP_FILE
+
+
+def read_all(source):
+    chunks = list(source.chunks())
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=ORDER)
+
+
+def read_lines(filename):
+    # Brute-force parse of the order file, line by line
+    with open(filename) as file:
+        return [(int(time), int(order_number), int(priority), pos_a)
+                for time, order_number, priority, pos_a, _ in (line.strip().split(',') for line in file if line.strip())]
+
+
+def as_tuples(orders):
+    return [(int(order['time']), int(order['order_number']), int(order['priority']), order['pos_A'].decode())
+            for order in orders]
+
+
+@pytest.mark.parametrize('block_size', [7, 64, 1 << 20])
+def test_csv_source_matches_line_parser(block_size):
+    assert as_tuples(read_all(CsvOrderSource(ORDERS_FILE, block_size))) == read_lines(ORDERS_FILE)
+
+
+def test_sources_agree(tmp_path):
+    expected = read_lines(ORDERS_FILE)
+    orders = read_all(CsvOrderSource(ORDERS_FILE))
+    save_orders(ORDERS_FILE, str(tmp_path / 'orders.npy'))
+    sources = [order_source(ORDERS_FILE), order_source(orders), order_source(expected),
+               order_source(str(tmp_path / 'orders.npy')), IteratorOrderSource(expected, chunk_size=3),
+               ArrayOrderSource(orders, chunk_size=4)]
+    for source in sources:
+        assert as_tuples(read_all(source)) == expected
+
+
+@pytest.mark.parametrize('count', [0, 1, 4, 10, 12])
+def test_remaining(tmp_path, count):
+    expected = read_lines(ORDERS_FILE)
+    save_orders(ORDERS_FILE, str(tmp_path / 'orders.npy'))
+    for source in (CsvOrderSource(ORDERS_FILE, 16), ArrayOrderSource(read_all(CsvOrderSource(ORDERS_FILE)), 3),
+                   BinaryOrderSource(str(tmp_path / 'orders.npy'), 3), IteratorOrderSource(expected, 3)):
+        assert as_tuples(read_all(source.remaining(count))) == expected[count:]
+        assert as_tuples(read_all(source.remaining(count).remaining(1))) == expected[count + 1:]
+
+
+def test_one_shot_iterator_cannot_be_snapshot():
+    source = IteratorOrderSource(iter(read_lines(ORDERS_FILE)))
+    with pytest.raises(ValueError):
+        source.remaining(1)
+
+
+def test_long_node_name_raises():
+    with pytest.raises(ValueError, match='pos_A'):
+        encode_positions(['pos_1', 'x' * 21])
+    with pytest.raises(ValueError, match='pos_A'):
+        read_all(IteratorOrderSource([(0, 1, 1, 'x' * 21)]))
+    assert encode_positions(['x' * 20, b'pos_2 ']).tolist() == [b'x' * 20, b'pos_2']
+
+
+def test_order_source_is_abstract():
+    with pytest.raises(TypeError):
+        OrderSource()
+
+    class ChunksOnly(OrderSource):
+        def chunks(self):
+            yield np.zeros(0, dtype=ORDER)
+
+    with pytest.raises(TypeError):
+        ChunksOnly()
+
+
+@pytest.mark.parametrize('arrival_process', ['uniform', 'poisson', 'bursty', 'ramp'])
+def test_generator_is_seeded_and_sorted(arrival_process):
+    orders = generate_orders(200, SETUP_FILE, 3, arrival_process)
+    assert np.array_equal(orders, generate_orders(200, SETUP_FILE, 3, arrival_process))
+    assert not np.array_equal(orders, generate_orders(200, SETUP_FILE, 4, arrival_process))
+    assert orders.dtype == ORDER and len(orders) == 200
+    assert (np.diff(orders['time']) >= 0).all()
+    assert len(np.unique(orders['order_number'])) == 200
+
+
+def test_generated_orders_round_trip(tmp_path):
+    orders = generate_orders(50, SETUP_FILE, 0)
+    for filename in ('orders.txt', 'orders.npy'):
+        save_situation(orders, str(tmp_path / filename))
+        assert np.array_equal(read_all(order_source(str(tmp_path / filename))), orders)
@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.Simulation import Simulation
+from src.utils.situation_generator import generate_orders
+from tests import ORDERS_FILE, SETUP_FILE
+
+
+@pytest.fixture(scope='module')
+def simulation():
+    return Simulation(SETUP_FILE)
+
+
+def run(simulation, orders, number_of_robots, **options):
+    random.seed(0)
+    np.random.seed(0)
+    return simulation.start_simulation(orders, number_of_robots, render_=False, log_=False, print_=False, **options)
+
+
+@pytest.mark.parametrize('motion_mode', ['event', 'interpolated'])
+@pytest.mark.parametrize('fleet_manager', ['closest', 'hungarian', 'lookahead', 'auction'])
+@pytest.mark.parametrize('seed', [1, 2, 3, 5])
+def test_every_spawned_order_is_executed(simulation, fleet_manager, motion_mode, seed):
+    # One robot, so tasks are often handed from a local task list right after a charging task
+    orders = generate_orders(50, SETUP_FILE, seed)
+    result = run(simulation, orders, 1, fleet_manager=fleet_manager, motion_mode=motion_mode)
+    assert result.tasks_done == len(orders)
+    assert len(result.lead_times) == len(orders)
+
+
+@pytest.mark.parametrize('motion_mode', ['event', 'interpolated'])
+@pytest.mark.parametrize('fleet_manager', ['closest', 'hungarian', 'lookahead', 'routing', 'auction'])
+def test_fleet_backends_give_the_same_results(simulation, fleet_manager, motion_mode):
+    results = [run(simulation, ORDERS_FILE, 3, fleet_manager=fleet_manager, motion_mode=motion_mode,
+                   fleet_backend=fleet_backend) for fleet_backend in ('objects', 'arrays')]
+    assert results[0].simulation_time == results[1].simulation_time
+    np.testing.assert_array_equal(results[0].travel_cost_per_robot, results[1].travel_cost_per_robot)
+    np.testing.assert_array_equal(results[0].tasks_done_per_robot, results[1].tasks_done_per_robot)
+
+
+@pytest.mark.parametrize('number_of_robots', [1, 2])
+@pytest.mark.parametrize('seed', range(6))
+def test_routing_executes_every_order(simulation, number_of_robots, seed):
+    # Robots low on battery, or skipped for pushed tasks they did not collect yet, are routed again later
+    orders = generate_orders(50, SETUP_FILE, seed)
+    result = run(simulation, orders, number_of_robots, fleet_manager='routing', motion_mode='event')
+    assert result.tasks_done == len(orders)
+
+
+def test_auction_bids_stand_until_the_robot_changes(simulation):
+    # Every auction would take an announcement and a bid per robot and the award when all bids were asked again
+    orders = generate_orders(100, SETUP_FILE, 0)
+    result = run(simulation, orders, 3, fleet_manager='auction', motion_mode='event')
+    assert result.tasks_done == len(orders)
+    assert result.auction_messages.sum() < len(result.auction_messages) * (2 * 3 + 1) / 2
@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.Simulation import Simulation
+from tests import ORDERS_FILE, SETUP_FILE
+
+options = {'render_': False, 'log_': False, 'print_': False, 'motion_mode': 'event'}
+
+
+@pytest.fixture(scope='module')
+def simulation():
+    return Simulation(SETUP_FILE)
+
+
+def run(simulation, fleet_manager, fleet_backend, **arguments):
+    random.seed(0)
+    np.random.seed(0)
+    return simulation.start_simulation(ORDERS_FILE, 3, fleet_manager=fleet_manager, fleet_backend=fleet_backend,
+                                       **options, **arguments)
+
+
+@pytest.mark.parametrize('fleet_backend', ['objects', 'arrays'])
+@pytest.mark.parametrize('fleet_manager, tolerance', [('hungarian', 0), ('routing', 0), ('auction', 0),
+                                                      # A restored robot between two nodes is placed at a rounded
+                                                      # location, so its remaining edge differs slightly
+                                                      ('closest', 0.1), ('lookahead', 0.1)])
+def test_restore_continues_the_run(simulation, fleet_manager, fleet_backend, tolerance):
+    result = run(simulation, fleet_manager, fleet_backend)
+    snapshot = run(simulation, fleet_manager, fleet_backend, snapshot_time=100)
+    assert snapshot.time == 100
+    restored = simulation.restore_simulation(snapshot, **options)
+    assert restored.tasks_done == result.tasks_done
+    assert restored.simulation_time == pytest.approx(result.simulation_time, abs=tolerance)
+    assert restored.travel_cost == pytest.approx(result.travel_cost, abs=tolerance * 3)
+
+
+def test_restore_does_not_change_the_snapshot(simulation):
+    snapshot = run(simulation, 'closest', 'objects', snapshot_time=100)
+    first = simulation.restore_simulation(snapshot, **options)
+    second = simulation.restore_simulation(snapshot, **options)
+    assert (first.simulation_time, first.travel_cost) == (second.simulation_time, second.travel_cost)
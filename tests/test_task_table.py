@@ -0,0 +1,96 @@
+import random
+
+import simpy
+
+from src.datatypes.Task import Task
+from src.knowledgebase.TaskTable import TaskTable
+
+
+def create_table(tasks, prioritized=True):
+    env = simpy.Environment()
+    table = TaskTable(env, prioritized)
+    for task in tasks:
+        table.put(task)
+    return env, table
+
+
+def order_numbers(tasks):
+    return [task.order_number for task in tasks]
+
+
+def test_items_in_priority_then_arrival_order():
+    _, table = create_table([Task('1', 'A', 2), Task('2', 'B', 1), Task('3', 'C', 2), Task('4', 'D', 1)])
+    assert order_numbers(table.items) == ['2', '4', '1', '3']
+    assert table.peek().order_number == '2'
+    assert len(table) == 4
+
+
+def test_items_in_arrival_order_without_prioritization():
+    _, table = create_table([Task('1', 'A', 2), Task('2', 'B', 1), Task('3', 'C', 3)], prioritized=False)
+    assert order_numbers(table.items) == ['1', '2', '3']
+
+
+def test_get_serves_in_order_and_blocks_when_empty():
+    env, table = create_table([Task('1', 'A', 3), Task('2', 'B', 1)])
+    served = []
+
+    def consumer():
+        while True:
+            task = yield table.get()
+            served.append((env.now, task.order_number))
+
+    def producer():
+        yield env.timeout(5)
+        yield table.put(Task('3', 'C', 2))
+
+    env.process(consumer())
+    env.process(producer())
+    env.run(until=10)
+    assert served == [(0, '2'), (0, '1'), (5, '3')]
+    assert len(table) == 0 and table.peek() is None
+
+
+def test_remove_and_find():
+    _, table = create_table([Task('000', 'A', 0), Task('1', 'B', 1), Task('000', 'C', 0), Task('2', 'D', 2)])
+    version = table.version
+
+    # Only the first task with an order number is removed, as the charging tasks all have order number '000'
+    assert table.remove('000').pos_A == 'A'
+    assert table.find('000').pos_A == 'C'
+    assert order_numbers(table.items) == ['000', '1', '2']
+    assert table.version > version
+    assert table.remove('3') is None and table.find('3') is None
+
+    # A removed task is not served, even when it was on top of the heap
+    assert table.remove('000').pos_A == 'C'
+    assert table.peek().order_number == '1'
+    assert table.find('000') is None
+    assert order_numbers(table.items) == ['1', '2']
+
+
+def test_items_match_a_sorted_copy():
+    # Random puts, gets and removes against a list sorted on (priority, arrival)
+    rng = random.Random(0)
+    env, table = create_table([])
+    expected = []
+    for arrival in range(500):
+        operation = rng.random()
+        if operation < 0.6:
+            task = Task(str(rng.randint(0, 50)), 'A', rng.randint(1, 3))
+            table.put(task)
+            expected.append((task.priority, arrival, task))
+        elif operation < 0.8 and expected:
+            order_number = rng.choice(expected)[2].order_number
+            removed = table.remove(order_number)
+            first = min((entry for entry in expected if entry[2].order_number == order_number),
+                        key=lambda entry: entry[1])
+            assert removed is first[2]
+            expected.remove(first)
+        elif expected:
+            get = table.get()
+            env.run()
+            first = min(expected, key=lambda entry: entry[:2])
+            assert get.value is first[2]
+            expected.remove(first)
+        assert table.items == [task for _, _, task in sorted(expected, key=lambda entry: entry[:2])]
+        assert list(table) == table.items and len(table) == len(expected)
@@ -0,0 +1,125 @@
+import os
+import random
+
+import numpy as np
+
+from src.knowledgebase.FleetArrays import INTEGER_BITS, STATUS_CODES
+from src.Simulation import Simulation
+from src.Trace import *
+from tests import ORDERS_FILE, SETUP_FILE
+
+
+def robot_record(time, ID, x, y, status, node, path_start=0, path_length=0):
+    integers = INTEGER_BITS['x'] | INTEGER_BITS['y'] | INTEGER_BITS['heading_direction'] | \
+        INTEGER_BITS['travelled_time'] | INTEGER_BITS['charged_time']
+    return time, ID, x, y, STATUS_CODES[status], 50.0, 0, node, path_start, path_length, 0, 0, 0, integers
+
+
+def task_record(time, table, owner, arrival, order_number=b'', node=-1, robot=-1, present=True):
+    return time, table, owner, arrival, present, order_number, node, 1, robot, False
+
+
+def write_trace(trace_dir):
+    # Two robots on nodes A, B, C, robot 1 takes task 17 at sample 1
+    writer = TraceWriter(trace_dir, [1, 2], ['A', 'B', 'C'])
+    writer.robots.extend([robot_record(1, 1, 0, 0, 'IDLE', 0), robot_record(1, 2, 5, 0, 'IDLE', 1)])
+    writer.tasks.extend([task_record(1, GLOBAL_TASK_LIST, 0, 0, b'17', 2),
+                         task_record(1, GLOBAL_TASK_LIST, 0, 1, b'18', 1)])
+    writer.ticks.append((1, writer.robots.length, writer.tasks.length, True))
+    writer.paths.extend([1, 2])
+    writer.robots.append(robot_record(2, 1, 1, 0, 'BUSY', 0, 0, 2))
+    writer.tasks.extend([task_record(2, GLOBAL_TASK_LIST, 0, 0, present=False),
+                         task_record(2, TASKS_EXECUTING, 0, 0, b'17', 2, robot=1)])
+    writer.ticks.append((2, writer.robots.length, writer.tasks.length, False))
+    writer.ticks.append((2.5, writer.robots.length, writer.tasks.length, False))
+    writer.close()
+
+
+def test_cursor_replays_records(tmp_path):
+    write_trace(str(tmp_path))
+    trace = TraceReader(str(tmp_path))
+    cursor = TraceCursor(trace)
+    assert trace.robot_ids == [1, 2] and list(trace.keyframes) == [0]
+
+    cursor.seek(2)
+    assert trace.path(cursor.robots[1]) == ['B', 'C']
+    assert trace.statuses[cursor.robots[1]['status']] == 'BUSY'
+    assert [record['order_number'] for record in cursor.tasks(GLOBAL_TASK_LIST)] == [b'18']
+    assert [record['robot'] for record in cursor.tasks(TASKS_EXECUTING)] == [1]
+
+    # Seeking back starts over from the keyframe
+    cursor.seek(0)
+    assert trace.path(cursor.robots[1]) == []
+    assert [record['order_number'] for record in cursor.tasks(GLOBAL_TASK_LIST)] == [b'17', b'18']
+    assert cursor.tasks(TASKS_EXECUTING) == []
+
+
+def test_export_text_logs(tmp_path):
+    write_trace(str(tmp_path))
+    export_text_logs(str(tmp_path), str(tmp_path))
+    with open(os.path.join(tmp_path, 'global_task_list.txt')) as file:
+        assert file.read().splitlines() == ['1|17;C;RNone;1;0|18;B;RNone;1;0|', '2|18;B;RNone;1;0|',
+                                           '2.5|18;B;RNone;1;0|']
+    with open(os.path.join(tmp_path, 'tasks_executing.txt')) as file:
+        assert file.read().splitlines() == ['1|', '2|17;C;R1;1;0|', '2.5|17;C;R1;1;0|']
+    with open(os.path.join(tmp_path, 'local_task_list.txt')) as file:
+        assert file.read().splitlines() == ['1|[]|[]|', '2|[]|[]|', '2.5|[]|[]|']
+    with open(os.path.join(tmp_path, 'global_robot_list.txt')) as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 3
+    assert lines[0] == '1|1;0;0;IDLE;50.0;0;{};0;0;0|2;5;0;IDLE;50.0;0;{};0;0;0|'
+    assert lines[1].split('|')[1].split(';')[3] == 'BUSY' and lines[1].split('|')[1].split(';')[6] == '{B,C}'
+    assert lines[1].split('|')[2] == lines[0].split('|')[2]
+
+
+def run_logged(log_dir, fleet_backend, motion_mode='event'):
+    random.seed(0)
+    np.random.seed(0)
+    return Simulation(SETUP_FILE).start_simulation(ORDERS_FILE, 3, render_=False, log_=True, print_=False,
+                                                   motion_mode=motion_mode, fleet_backend=fleet_backend,
+                                                   log_dir=str(log_dir))
+
+
+def test_simulation_trace_round_trip(tmp_path):
+    results = [run_logged(tmp_path / fleet_backend, fleet_backend) for fleet_backend in ('objects', 'arrays')]
+    assert results[0].simulation_time == results[1].simulation_time
+
+    # One line per sample, the last sample is the final state with every task done
+    for fleet_backend in ('objects', 'arrays'):
+        trace = TraceReader(str(tmp_path / fleet_backend / 'trace'))
+        assert len(trace.ticks) == int(results[0].simulation_time) + 1
+        cursor = TraceCursor(trace)
+        cursor.seek(len(trace.ticks) - 1)
+        assert sorted(cursor.robots) == [1, 2, 3]
+        assert cursor.tasks(GLOBAL_TASK_LIST) == [] and cursor.tasks(TASKS_EXECUTING) == []
+
+    # The text logs exported from both traces are the same
+    for filename in ('global_task_list.txt', 'local_task_list.txt', 'tasks_executing.txt', 'global_robot_list.txt'):
+        with open(tmp_path / 'objects' / filename) as objects_file, open(tmp_path / 'arrays' / filename) as arrays_file:
+            assert objects_file.read() == arrays_file.read()
+
+
+def test_text_logs_keep_the_original_number_format(tmp_path):
+    # Values given as ints stay ints, positions between nodes and drained batteries are floats
+    for fleet_backend in ('objects', 'arrays'):
+        run_logged(tmp_path / fleet_backend, fleet_backend, 'interpolated')
+        with open(tmp_path / fleet_backend / 'global_robot_list.txt') as file:
+            lines = file.read().splitlines()
+        assert lines[0] == '1|1;10;30;IDLE;50.0;0;{};0;0;0|2;10;50;IDLE;50.0;0;{};0;0;0|3;10;70;IDLE;50.0;0;{};0;0;0|'
+        assert lines[39].startswith('40|1;30.0;30.0;BUSY;44.0;0.0;{pos_5};20.0;0;0|2;36.0;50.0;BUSY;42.2;0.0;')
+
+
+def test_only_changed_tasks_are_written(tmp_path):
+    run_logged(tmp_path, 'objects')
+    trace = TraceReader(str(tmp_path / 'trace'))
+
+    # Between keyframes every task record is a task put in or removed from a table, each written once
+    written = set()
+    for sample in range(1, len(trace.ticks)):
+        if trace.ticks[sample]['keyframe']:
+            continue
+        first, last = trace.first_records(sample)[1], trace.ticks[sample]['tasks']
+        for record in trace.tasks[first:last]:
+            key = (record['table'], record['owner'], record['arrival'], record['present'])
+            assert key not in written
+            written.add(key)